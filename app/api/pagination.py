@@ -0,0 +1,48 @@
+"""
+Cursor pagination helpers shared by the list endpoints.
+
+Lists are ordered newest-first. The cursor is an opaque, URL-safe encoding of
+the sort key ``(updatedAt, seq, id)`` of the last item of the previous page,
+passed back as ``after``; the next page resumes strictly after that key, so
+editing or deleting the item does not move or break the cursor.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from typing import List, TypeVar
+
+from fastapi import HTTPException, Response
+
+from app.services.store_backends import Page, PageKey
+
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+T = TypeVar("T")
+
+
+def encode_cursor(key: PageKey) -> str:
+    raw = json.dumps(list(key), ensure_ascii=False, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(after: str | None) -> PageKey | None:
+    """Sort key encoded in ``after``; raises a 400 for anything we did not issue."""
+    if after is None:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(after + "=" * (-len(after) % 4))
+        updated_at, seq, ident = json.loads(raw)
+        if not (isinstance(updated_at, str) and isinstance(seq, int) and isinstance(ident, str)):
+            raise ValueError(after)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid cursor '{after}'.") from None
+    return PageKey(updated_at, seq, ident)
+
+
+def paginate(response: Response, page: Page[T], limit: int | None) -> List[T]:
+    """Advertise the cursor for the next page when the page is full."""
+    if limit is not None and len(page.items) == limit and page.last_key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(page.last_key)
+    return page.items
@@ -6,19 +6,24 @@ from __future__ import annotations
 import logging
 from typing import Dict, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
+from app.api.pagination import MAX_PAGE_SIZE, decode_cursor, paginate
+from app.core import metrics
 from app.schemas.common import Contribution, Score
 from app.schemas.idea import (
     Idea,
     IdeaCreate,
     Reaction,
+    ReactionStats,
     SimulationRequest,
     SimulationResult,
 )
 from app.schemas.project import Project, ProjectCreate
-from app.services import gpt_adapter, simulate, statkit, store
+from app.schemas.usage import ProjectUsage
+from app.services import scoring, simulate, store, usage
 
 log = logging.getLogger(__name__)
 
@@ -30,9 +35,20 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@router.get("/metrics", tags=["system"], response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    """Prometheus scrape target for this worker process."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @router.get("/projects", response_model=List[Project])
-def list_projects() -> List[Project]:
-    return store.list_projects()
+def list_projects(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = None,
+) -> List[Project]:
+    projects = store.page_projects(limit=limit, after=decode_cursor(after))
+    return paginate(response, projects, limit)
 
 
 @router.post("/projects", response_model=Project, status_code=status.HTTP_201_CREATED)
@@ -40,12 +56,23 @@ def create_project(payload: ProjectCreate) -> Project:
     return store.create_project(payload.name)
 
 
+@router.get("/projects/{project_id}/usage", response_model=ProjectUsage)
+def project_usage(project_id: str) -> ProjectUsage:
+    """GPT tokens and estimated cost charged to a project, with its budget."""
+    if store.get_project(project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found.")
+    return usage.project_usage(project_id)
+
+
 @router.get("/ideas", response_model=List[Idea])
-def list_ideas(projectId: str | None = None) -> List[Idea]:
-    ideas = store.list_ideas()
-    if projectId:
-        ideas = [idea for idea in ideas if idea.projectId == projectId]
-    return ideas
+def list_ideas(
+    response: Response,
+    projectId: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = None,
+) -> List[Idea]:
+    ideas = store.page_ideas(project_id=projectId or None, limit=limit, after=decode_cursor(after))
+    return paginate(response, ideas, limit)
 
 
 @router.post("/ideas", response_model=Idea, status_code=status.HTTP_201_CREATED)
@@ -53,8 +80,11 @@ def create_idea(payload: IdeaCreate) -> Idea:
     return store.create_idea(payload)
 
 
+MAX_SCORE_BATCH = 200
+
+
 class ScoreRequest(BaseModel):
-    ideaIds: List[str]
+    ideaIds: List[str] = Field(..., max_length=MAX_SCORE_BATCH)
 
 
 @router.post("/ideas/score", response_model=List[Dict[str, object]])
@@ -62,37 +92,8 @@ def score_ideas(request: ScoreRequest) -> List[Dict[str, object]]:
     if not request.ideaIds:
         raise HTTPException(status_code=400, detail="ideaIds must not be empty.")
 
-    results: List[Dict[str, object]] = []
-
-    for idea_id in request.ideaIds:
-        idea = store.get_idea(idea_id)
-        if not idea:
-            log.info("Idea not found for scoring id=%s", idea_id)
-            continue
-
-        insight = gpt_adapter.react(idea)
-        score, contribution = statkit.compute_score(idea_id, insight, idea.projectId, idea.version)
-        store.create_reaction(
-            idea_id,
-            {
-                "projectId": idea.projectId,
-                "version": idea.version,
-                "personaId": "persona-gpt",
-                "text": insight.get("reaction", ""),
-                "likelihood": score.p_apply[1],
-                "intent_to_try": insight.get("intent_to_try", 0.5),
-                "segment": idea.target,
-            },
-        )
-        results.append(
-            {
-                "projectId": idea.projectId,
-                "version": idea.version,
-                **score.model_dump(),
-                "factors": [factor.model_dump() for factor in contribution.factors],
-            }
-        )
-
+    with usage.attribute(endpoint="/ideas/score"):
+        results = scoring.score_ideas(request.ideaIds)
     if not results:
         raise HTTPException(status_code=404, detail="No ideas scored.")
 
@@ -107,8 +108,27 @@ def list_reactions(idea_id: str, limit: int = Query(20, ge=1, le=50)) -> List[Re
     return store.list_reactions(idea_id, limit=limit)
 
 
+@router.get("/ideas/{idea_id}/stats", response_model=ReactionStats)
+def reaction_stats(idea_id: str) -> ReactionStats:
+    if not store.get_idea(idea_id):
+        raise HTTPException(status_code=404, detail="Idea not found.")
+    return store.reaction_stats(idea_id)
+
+
 @router.post("/simulate", response_model=List[SimulationResult])
 def run_simulation(payload: SimulationRequest) -> List[SimulationResult]:
     if not payload.ideaIds:
         raise HTTPException(status_code=400, detail="At least one ideaId required.")
-    return simulate.simulate(payload)
+    with usage.attribute(endpoint="/simulate"):
+        return simulate.simulate(payload)
+
+
+@router.post("/simulate/stream", response_class=StreamingResponse)
+def stream_simulation(payload: SimulationRequest) -> StreamingResponse:
+    """NDJSON stream of SimulationStreamEvent lines, one per persona reaction then a summary."""
+    if not payload.ideaIds:
+        raise HTTPException(status_code=400, detail="At least one ideaId required.")
+    with usage.attribute(endpoint="/simulate/stream"):
+        events = usage.bind(simulate.iter_simulation(payload))
+    lines = (event.model_dump_json() + "\n" for event in events)
+    return StreamingResponse(lines, media_type="application/x-ndjson")
@@ -0,0 +1,48 @@
+"""
+HTTP endpoints for background simulation jobs.
+"""
+from __future__ import annotations
+
+from typing import List
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.schemas.idea import SimulationRequest, SimulationResult
+from app.schemas.job import SimulationJob
+from app.services import jobs
+
+router = APIRouter(prefix="/simulate/jobs", tags=["Simulation jobs"])
+
+
+def _require_job(job_id: str) -> SimulationJob:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@router.post("", response_model=SimulationJob, status_code=status.HTTP_202_ACCEPTED)
+def submit_job(payload: SimulationRequest) -> SimulationJob:
+    return jobs.submit(payload)
+
+
+@router.get("/{job_id}", response_model=SimulationJob)
+def get_job(job_id: str) -> SimulationJob:
+    return _require_job(job_id)
+
+
+@router.get("/{job_id}/result", response_model=List[SimulationResult])
+def get_job_result(job_id: str) -> List[SimulationResult]:
+    job = _require_job(job_id)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}; no result available.")
+    return jobs.results(job_id) or []
+
+
+@router.post("/{job_id}/cancel", response_model=SimulationJob)
+def cancel_job(job_id: str) -> SimulationJob:
+    _require_job(job_id)
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
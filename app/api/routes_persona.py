@@ -5,8 +5,9 @@ from __future__ import annotations
 
 from typing import List
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, Response, status
 
+from app.api.pagination import MAX_PAGE_SIZE, decode_cursor, paginate
 from app.schemas.persona import Persona, PersonaCreate
 from app.services import store
 
@@ -14,8 +15,13 @@ router = APIRouter(prefix="/personas", tags=["Personas"])
 
 
 @router.get("/", response_model=List[Persona])
-def list_personas() -> List[Persona]:
-    return store.list_personas()
+def list_personas(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = None,
+) -> List[Persona]:
+    personas = store.page_personas(limit=limit, after=decode_cursor(after))
+    return paginate(response, personas, limit)
 
 
 @router.post("/", response_model=Persona, status_code=status.HTTP_201_CREATED)
@@ -5,7 +5,7 @@ Keep configuration minimal and environment driven so the backend can be
 deployed alongside the Next.js frontend without code changes.
 """
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -21,8 +21,30 @@ class Settings(BaseSettings):
     cors_origins: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
     model_chat: str = "gpt-4o-mini"
     openai_api_key: str | None = None
+    openai_base_url: str | None = None
     reaction_cache_size: int = 50
+    store_backend: Literal["memory", "sqlite"] = "memory"
+    store_path: str = ".data/store.sqlite3"
+    llm_cache_backend: Literal["memory", "sqlite"] = "memory"
+    llm_cache_path: str = ".cache/llm_cache.sqlite3"
+    llm_cache_max_entries: int = 20000
+    llm_cache_ttl_seconds: float | None = 7 * 24 * 3600
     request_rate_limit_per_minute: int = 60
+    token_rate_limit_per_minute: int = 200_000
+    rate_limit_max_wait_seconds: float = 30.0
+    simulation_concurrency: int = 8
+    simulation_batch_size: int = 1
+    gpt_stream_early_stop: bool = False
+    persona_comment_max_chars: int = 120
+    summary_chunk_tokens: int = 1500
+    summary_mode: Literal["llm", "extractive"] = "llm"
+    ci_method: Literal["normal", "wilson", "bootstrap"] = "normal"
+    bootstrap_resamples: int = 10_000
+    duplicate_similarity_threshold: float | None = None
+    project_token_budgets: Dict[str, int] = {}
+    default_project_token_budget: int | None = None
+    simulation_job_workers: int = 2
+    simulation_job_retention_seconds: float = 3600.0
     backend_url: str | None = None
 
 
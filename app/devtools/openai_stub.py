@@ -0,0 +1,331 @@
+"""
+Local stand-in for the OpenAI chat-completions endpoint.
+
+Point ``gpt_adapter.client`` at it (``OPENAI_BASE_URL=http://127.0.0.1:8001/v1``)
+to exercise the real request path — rate limiter, retries, JSON parsing and
+caching — without the network. Three modes:
+
+- ``synthetic``: deterministic bodies derived from a hash of the request,
+  shaped after the JSON schema quoted in the prompt.
+- ``record``: forward to a real upstream and append each response to a
+  JSONL cassette keyed by the same request hash.
+- ``replay``: answer only from a cassette; unknown requests get a 404.
+
+Latency, server errors and 429s are injected in every mode from a seeded
+RNG, so a load-test run is reproducible. Requests with ``stream: true`` get
+the same answer as server-sent events, a few characters per chunk.
+
+Run with ``python -m app.devtools.openai_stub --port 8001 --latency-ms 400``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from app.services.rate_limiter import estimate_tokens
+
+StubMode = Literal["synthetic", "record", "replay"]
+LatencyDistribution = Literal["fixed", "uniform", "lognormal"]
+
+DEFAULT_UPSTREAM = "https://api.openai.com/v1"
+SYNTHETIC_COMMENTS = [
+    "使ってみたいが価格次第",
+    "課題には共感できる",
+    "導入の手間が少なければ試したい",
+    "類似サービスとの違いが分かりにくい",
+    "毎日使う場面が想像できる",
+]
+NUMERIC_KEY = re.compile(r'"(\w+)"\s*:\s*(-?\d|")')
+PERSONA_ID = re.compile(r"personaId:\s*(\S+)")
+
+
+@dataclass
+class StubConfig:
+    mode: StubMode = "synthetic"
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    latency_distribution: LatencyDistribution = "fixed"
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+    seed: int = 0
+    cassette_path: Optional[str] = None
+    upstream_base_url: str = DEFAULT_UPSTREAM
+    upstream_api_key: Optional[str] = None
+    stream_chunk_chars: int = 4
+    stream_chunk_delay_ms: float = 0.0
+
+
+def request_key(payload: Dict[str, Any]) -> str:
+    """Stable hash of the parts of a request that determine its answer."""
+    material = {
+        "model": payload.get("model"),
+        "messages": payload.get("messages"),
+        "response_format": payload.get("response_format"),
+    }
+    encoded = json.dumps(material, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _user_prompt(payload: Dict[str, Any]) -> str:
+    messages = payload.get("messages") or []
+    return "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "user")
+
+
+def _synthetic_object(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    if '"reactions"' in prompt:
+        return {
+            "reactions": [
+                {
+                    "personaId": persona_id,
+                    "comment": rng.choice(SYNTHETIC_COMMENTS),
+                    "intent_to_try": round(rng.uniform(0.1, 0.9), 2),
+                    "price_acceptance": round(rng.uniform(0.1, 0.9), 2),
+                }
+                for persona_id in PERSONA_ID.findall(prompt)
+            ]
+        }
+    body: Dict[str, Any] = {}
+    for key, first in NUMERIC_KEY.findall(prompt):
+        if key in body:
+            continue
+        body[key] = rng.choice(SYNTHETIC_COMMENTS) if first == '"' else round(rng.uniform(0.1, 0.9), 2)
+    return body or {"comment": rng.choice(SYNTHETIC_COMMENTS)}
+
+
+def synthetic_completion(payload: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Chat-completion body that depends only on the request contents."""
+    rng = random.Random(int(key[:16], 16))
+    prompt = _user_prompt(payload)
+    if (payload.get("response_format") or {}).get("type") == "json_object":
+        content = json.dumps(_synthetic_object(prompt, rng), ensure_ascii=False)
+    else:
+        content = "。".join(rng.sample(SYNTHETIC_COMMENTS, 3)) + "。"
+
+    system = "\n".join(str(m.get("content", "")) for m in payload.get("messages") or [] if m.get("role") == "system")
+    prompt_tokens = estimate_tokens(system, prompt)
+    completion_tokens = estimate_tokens(content)
+    return {
+        "id": f"chatcmpl-stub-{key[:24]}",
+        "object": "chat.completion",
+        "created": 0,
+        "model": payload.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _stream_events(body: Dict[str, Any], include_usage: bool, chunk_chars: int) -> Iterator[Dict[str, Any]]:
+    """Split a completion body into chat.completion.chunk events."""
+    content = body["choices"][0]["message"]["content"] or ""
+    base = {"id": body["id"], "object": "chat.completion.chunk", "created": body["created"], "model": body["model"]}
+    step = max(1, chunk_chars)
+    for start in range(0, len(content), step):
+        delta = {"content": content[start : start + step]}
+        if start == 0:
+            delta["role"] = "assistant"
+        yield {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+    yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+    if include_usage:
+        yield {**base, "choices": [], "usage": body.get("usage")}
+
+
+def _error(status: int, message: str, kind: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    body = {"error": {"message": message, "type": kind, "param": None, "code": kind}}
+    return JSONResponse(status_code=status, content=body, headers=headers)
+
+
+class _Cassette:
+    """JSONL file of ``{"key": ..., "response": ...}`` lines, loaded into memory."""
+
+    def __init__(self, path: Optional[str]) -> None:
+        self._path = Path(path) if path else None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self._path and self._path.exists():
+            for line in self._path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]] = entry["response"]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._entries.get(key)
+
+    def record(self, key: str, response: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = response
+            if self._path is None:
+                return
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps({"key": key, "response": response}, ensure_ascii=False) + "\n")
+
+
+class _Faults:
+    """Seeded latency and failure injection shared by all requests."""
+
+    def __init__(self, config: StubConfig) -> None:
+        self._config = config
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, float]:
+        """(delay in seconds, failure roll in [0, 1))."""
+        config = self._config
+        with self._lock:
+            if config.latency_distribution == "uniform":
+                delay = self._rng.uniform(
+                    config.latency_ms - config.latency_jitter_ms, config.latency_ms + config.latency_jitter_ms
+                )
+            elif config.latency_distribution == "lognormal" and config.latency_ms > 0:
+                sigma = config.latency_jitter_ms / config.latency_ms
+                delay = self._rng.lognormvariate(0.0, sigma) * config.latency_ms
+            else:
+                delay = config.latency_ms
+            roll = self._rng.random()
+        return max(delay, 0.0) / 1000, roll
+
+
+def _forward(config: StubConfig, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    request = urllib.request.Request(
+        config.upstream_base_url.rstrip("/") + "/chat/completions",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {config.upstream_api_key or ''}",
+        },
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read() or b"{}")
+
+
+def create_app(config: Optional[StubConfig] = None) -> FastAPI:
+    config = config or StubConfig()
+    faults = _Faults(config)
+    cassette = _Cassette(config.cassette_path)
+    stats: Dict[str, int] = {"requests": 0, "errors": 0, "rate_limited": 0, "replay_misses": 0}
+    stats_lock = threading.Lock()
+
+    def count(name: str) -> None:
+        with stats_lock:
+            stats[name] += 1
+
+    app = FastAPI(title="OpenAI stub")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> Response:
+        payload = await request.json()
+        count("requests")
+        delay, roll = faults.draw()
+        if delay:
+            # Sleep without blocking the loop so concurrent requests overlap like a real API.
+            await asyncio.sleep(delay)
+        if roll < config.rate_limit_rate:
+            count("rate_limited")
+            return _error(
+                429,
+                "Rate limit reached (stub).",
+                "rate_limit_exceeded",
+                headers={"retry-after": str(config.retry_after_seconds)},
+            )
+        if roll < config.rate_limit_rate + config.error_rate:
+            count("errors")
+            return _error(500, "Injected server error (stub).", "server_error")
+
+        key = request_key(payload)
+        if config.mode == "replay":
+            body = cassette.get(key)
+            if body is None:
+                count("replay_misses")
+                return _error(404, f"No recorded response for request {key[:12]}.", "replay_miss")
+        elif config.mode == "record":
+            # Cassettes hold whole completions; streams are re-chunked locally.
+            upstream_payload = {k: v for k, v in payload.items() if k not in ("stream", "stream_options")}
+            status, body = await asyncio.to_thread(_forward, config, upstream_payload)
+            if status != 200:
+                return JSONResponse(status_code=status, content=body)
+            cassette.record(key, body)
+        else:
+            body = synthetic_completion(payload, key)
+
+        if payload.get("stream"):
+            include_usage = bool((payload.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(_sse(body, include_usage), media_type="text/event-stream")
+        return JSONResponse(body)
+
+    async def _sse(body: Dict[str, Any], include_usage: bool) -> AsyncIterator[str]:
+        for event in _stream_events(body, include_usage, config.stream_chunk_chars):
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+            if config.stream_chunk_delay_ms:
+                await asyncio.sleep(config.stream_chunk_delay_ms / 1000)
+        yield "data: [DONE]\n\n"
+
+    @app.get("/stub/stats")
+    def stub_stats() -> Dict[str, int]:
+        with stats_lock:
+            return dict(stats)
+
+    return app
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> Tuple[StubConfig, str, int]:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--mode", choices=["synthetic", "record", "replay"], default="synthetic")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--latency-distribution", choices=["fixed", "uniform", "lognormal"], default="fixed")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after-seconds", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cassette", dest="cassette_path")
+    parser.add_argument("--upstream-base-url", default=DEFAULT_UPSTREAM)
+    parser.add_argument("--upstream-api-key")
+    parser.add_argument("--stream-chunk-chars", type=int, default=4)
+    parser.add_argument("--stream-chunk-delay-ms", type=float, default=0.0)
+    args = vars(parser.parse_args(argv))
+    host, port = args.pop("host"), args.pop("port")
+    return StubConfig(**args), host, port
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import uvicorn
+
+    config, host, port = _parse_args(argv)
+    if config.mode == "record" and not config.upstream_api_key:
+        config.upstream_api_key = os.getenv("OPENAI_API_KEY")
+    uvicorn.run(create_app(config), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
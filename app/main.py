@@ -4,15 +4,19 @@ Entrypoint for the FastAPI application.
 from __future__ import annotations
 
 import logging
+import time
+from typing import Awaitable, Callable
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import router
+from app.api.routes_jobs import router as jobs_router
 from app.api.routes_persona import router as persona_router
+from app.core import metrics
 from app.core.config import get_settings
 from app.data.seed import seed
-from app.services import store
+from app.services import jobs, store
 
 log = logging.getLogger(__name__)
 
@@ -30,13 +34,38 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    @app.middleware("http")
+    async def _record_latency(
+        request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            # Label by route template, not raw path, to keep label cardinality bounded.
+            route = request.scope.get("route")
+            metrics.HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=request.method,
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            )
+
     @app.on_event("startup")
     async def _startup() -> None:  # pragma: no cover - side effect
         seed()
         log.info("Application started with %d seeded ideas", len(store.list_ideas()))
 
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:  # pragma: no cover - side effect
+        jobs.shutdown()
+
     app.include_router(router)
     app.include_router(persona_router)
+    app.include_router(jobs_router)
     return app
 
 
@@ -3,7 +3,7 @@ Idea-centric schemas for request/response payloads.
 """
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, conlist, confloat, conint
 
@@ -46,9 +46,50 @@ class Reaction(BaseModel):
     segment: Optional[str] = None
 
 
+class MetricSummary(BaseModel):
+    count: int = Field(..., ge=0)
+    mean: float
+    variance: float
+    stddev: float
+
+
+class GroupStats(BaseModel):
+    count: int = Field(..., ge=0)
+    intent_to_try: MetricSummary
+    likelihood: MetricSummary
+
+
+class ReactionStats(BaseModel):
+    ideaId: str
+    overall: GroupStats
+    bySegment: Dict[str, GroupStats]
+    byCategory: Dict[str, GroupStats] = Field(..., description="Keyed by persona category")
+
+
+SummaryMode = Literal["llm", "extractive"]
+
+
+class SamplingOptions(BaseModel):
+    """Adaptive panel sampling: query personas in random order until the estimate settles."""
+
+    precision: confloat(gt=0, le=50) = Field(
+        default=5.0, description="Stop once PSF and PMF 95% CI half-widths are within this many points"
+    )
+    minPersonas: conint(ge=2) = 10
+    maxPersonas: Optional[conint(ge=1)] = None
+    stratify: bool = Field(default=True, description="Keep each persona category's share of the sample proportional")
+    seed: Optional[int] = None
+
+
 class SimulationRequest(BaseModel):
     ideaIds: conlist(str, min_length=1, max_length=3)
     filters: Optional[Dict[str, str | float]] = None
+    sampling: Optional[SamplingOptions] = Field(
+        default=None, description="Omit to query every registered persona"
+    )
+    summaryMode: Optional[SummaryMode] = Field(
+        default=None, description="extractive skips the summary model call; defaults to SUMMARY_MODE"
+    )
 
 
 class SimulationPersonaReaction(BaseModel):
@@ -68,5 +109,25 @@ class SimulationResult(BaseModel):
     psf: confloat(ge=0, le=100)
     pmf: confloat(ge=0, le=100)
     ci95: Optional[CI] = None
+    psfCi95: Optional[CI] = None
     personaReactions: List[SimulationPersonaReaction]
+    personasUsed: int = Field(default=0, ge=0, description="Personas whose reactions were aggregated")
+    reusedFrom: Optional[str] = Field(
+        default=None, description="Near-duplicate idea whose cached reactions were reused"
+    )
+    reusedReactions: int = Field(default=0, ge=0)
     summaryComment: str
+
+
+class SimulationStreamEvent(BaseModel):
+    event: Literal["reaction", "summary"]
+    ideaId: Optional[str] = None
+    completed: int = Field(..., ge=0, description="Persona reactions received so far")
+    total: int = Field(..., ge=0, description="Most personas that will be queried for this idea")
+    psf: confloat(ge=0, le=100)
+    pmf: confloat(ge=0, le=100)
+    ci95: Optional[CI] = None
+    psfCi95: Optional[CI] = None
+    reaction: Optional[SimulationPersonaReaction] = None
+    summaryComment: Optional[str] = None
+    result: Optional[SimulationResult] = None
@@ -0,0 +1,26 @@
+"""
+Schemas for background simulation jobs.
+"""
+from __future__ import annotations
+
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+
+class SimulationJob(BaseModel):
+    id: str
+    status: JobStatus
+    ideaIds: List[str]
+    completed: int = Field(default=0, ge=0, description="Persona reactions received so far")
+    total: int = Field(
+        default=0,
+        ge=0,
+        description="Persona reactions expected in total; once succeeded, the reactions actually aggregated",
+    )
+    error: Optional[str] = None
+    createdAt: str
+    startedAt: Optional[str] = None
+    finishedAt: Optional[str] = None
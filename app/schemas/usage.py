@@ -0,0 +1,33 @@
+"""
+Schemas for the GPT token and cost ledger.
+"""
+from __future__ import annotations
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class UsageEntry(BaseModel):
+    """Accumulated usage for one (project, idea, endpoint, model) combination."""
+
+    projectId: Optional[str] = None
+    ideaId: Optional[str] = None
+    endpoint: Optional[str] = None
+    model: str
+    calls: int = Field(default=0, ge=0)
+    promptTokens: int = Field(default=0, ge=0)
+    completionTokens: int = Field(default=0, ge=0)
+    costUsd: float = Field(default=0.0, ge=0)
+
+
+class ProjectUsage(BaseModel):
+    projectId: str
+    calls: int
+    promptTokens: int
+    completionTokens: int
+    totalTokens: int
+    costUsd: float
+    budgetTokens: Optional[int] = Field(default=None, description="None when the project has no budget")
+    remainingTokens: Optional[int] = None
+    breakdown: List[UsageEntry]
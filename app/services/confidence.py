@@ -0,0 +1,159 @@
+"""
+Confidence intervals for persona panel statistics.
+
+Values are per-persona scores in [0, 1] (intent_to_try, price_acceptance).
+Every function accepts either a 1-D sample or a 2-D ``(ideas, personas)``
+matrix where NaN marks a missing reaction, so intervals for many ideas are
+computed in one call. Bounds are returned on the same [0, 1] scale.
+"""
+from __future__ import annotations
+
+from typing import List, Literal, Sequence, Tuple
+
+import numpy as np
+
+CIMethod = Literal["normal", "wilson", "bootstrap"]
+
+Z95 = 1.96
+# Upper bound on gathered elements per bootstrap chunk (~32 MB of float64).
+BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000
+
+Bounds = Tuple[np.ndarray, np.ndarray]
+
+
+def _as_matrix(values: Sequence[float] | np.ndarray) -> np.ndarray:
+    matrix = np.asarray(values, dtype=float)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    return matrix
+
+
+def _counts(matrix: np.ndarray) -> np.ndarray:
+    return np.sum(~np.isnan(matrix), axis=1)
+
+
+def _squeeze(bounds: Bounds, one_dimensional: bool) -> Bounds:
+    low, high = bounds
+    if one_dimensional:
+        return low[0], high[0]
+    return low, high
+
+
+def normal_ci(values: Sequence[float] | np.ndarray, z: float = Z95) -> Bounds:
+    """Normal approximation around the mean using the population standard deviation."""
+    matrix = _as_matrix(values)
+    counts = _counts(matrix)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mu = np.nanmean(matrix, axis=1)
+        margin = z * np.nanstd(matrix, axis=1) / np.sqrt(counts)
+    mu = np.nan_to_num(mu)
+    margin = np.nan_to_num(margin)
+    bounds = (np.clip(mu - margin, 0.0, 1.0), np.clip(mu + margin, 0.0, 1.0))
+    return _squeeze(bounds, np.ndim(values) == 1)
+
+
+def wilson_ci(values: Sequence[float] | np.ndarray, z: float = Z95) -> Bounds:
+    """
+    Wilson score interval, treating the mean of [0, 1] scores as a proportion.
+
+    Better behaved than the normal interval for small panels and means near
+    0 or 1, where the normal interval collapses or gets clipped.
+    """
+    matrix = _as_matrix(values)
+    counts = _counts(matrix).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = np.nan_to_num(np.nanmean(matrix, axis=1))
+        denom = 1.0 + z**2 / counts
+        centre = (p + z**2 / (2 * counts)) / denom
+        margin = z * np.sqrt(p * (1 - p) / counts + z**2 / (4 * counts**2)) / denom
+    empty = counts == 0
+    centre[empty] = 0.0
+    margin[empty] = 0.0
+    bounds = (np.clip(centre - margin, 0.0, 1.0), np.clip(centre + margin, 0.0, 1.0))
+    return _squeeze(bounds, np.ndim(values) == 1)
+
+
+def bootstrap_ci(
+    *columns: Sequence[float] | np.ndarray,
+    resamples: int = 10_000,
+    alpha: float = 0.05,
+    rng: np.random.Generator | None = None,
+) -> List[Bounds]:
+    """
+    Percentile bootstrap of the mean for one or more aligned matrices.
+
+    All columns share the same resampled persona indices (a paired bootstrap),
+    so PSF and PMF intervals come from identical panels. Resampling is done
+    as gathered index matrices in chunks, never as a Python loop per resample.
+    NaN positions must line up across columns.
+    """
+    if not columns:
+        return []
+    rng = rng or np.random.default_rng()
+    one_dimensional = np.ndim(columns[0]) == 1
+    matrices = [_as_matrix(column) for column in columns]
+    # Move valid values to the left of each row so index draws can ignore NaN.
+    order = np.argsort(np.isnan(matrices[0]), axis=1, kind="stable")
+    compact = [np.take_along_axis(matrix, order, axis=1) for matrix in matrices]
+    counts = _counts(matrices[0])
+    n_ideas, width = compact[0].shape
+
+    if width == 0 or not counts.any():
+        zeros = np.zeros(n_ideas)
+        return [_squeeze((zeros, zeros.copy()), one_dimensional) for _ in columns]
+
+    safe_counts = np.maximum(counts, 1)
+    position_mask = np.arange(width)[np.newaxis, np.newaxis, :] < counts[:, np.newaxis, np.newaxis]
+    chunk = max(1, BOOTSTRAP_CHUNK_ELEMENTS // max(1, n_ideas * width))
+    means = [np.empty((n_ideas, resamples)) for _ in columns]
+    row_index = np.arange(n_ideas)[:, np.newaxis, np.newaxis]
+
+    for start in range(0, resamples, chunk):
+        size = min(chunk, resamples - start)
+        draws = rng.random((n_ideas, size, width))
+        indices = (draws * safe_counts[:, np.newaxis, np.newaxis]).astype(np.intp)
+        for matrix, out in zip(compact, means, strict=True):
+            sampled = np.where(position_mask, matrix[row_index, indices], 0.0)
+            out[:, start : start + size] = sampled.sum(axis=2) / safe_counts[:, np.newaxis]
+
+    quantiles = [alpha / 2, 1 - alpha / 2]
+    results: List[Bounds] = []
+    for out in means:
+        low, high = np.quantile(out, quantiles, axis=1)
+        low[counts == 0] = 0.0
+        high[counts == 0] = 0.0
+        results.append(_squeeze((np.clip(low, 0.0, 1.0), np.clip(high, 0.0, 1.0)), one_dimensional))
+    return results
+
+
+def mean_ci(
+    values: Sequence[float] | np.ndarray,
+    method: CIMethod = "normal",
+    resamples: int = 10_000,
+    rng: np.random.Generator | None = None,
+) -> Bounds:
+    """Dispatch to the requested interval for a single column."""
+    if method == "wilson":
+        return wilson_ci(values)
+    if method == "bootstrap":
+        return bootstrap_ci(values, resamples=resamples, rng=rng)[0]
+    return normal_ci(values)
+
+
+def psf_pmf_ci(
+    intents: Sequence[float] | np.ndarray,
+    prices: Sequence[float] | np.ndarray,
+    method: CIMethod = "normal",
+    resamples: int = 10_000,
+    rng: np.random.Generator | None = None,
+) -> Tuple[Bounds, Bounds]:
+    """
+    Intervals for PSF (mean intent) and PMF (mean price acceptance).
+
+    Accepts 1-D panels or ``(ideas, personas)`` matrices; with the bootstrap
+    both intervals share the same resamples.
+    """
+    if method == "bootstrap":
+        psf, pmf = bootstrap_ci(intents, prices, resamples=resamples, rng=rng)
+        return psf, pmf
+    return mean_ci(intents, method), mean_ci(prices, method)
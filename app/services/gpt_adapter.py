@@ -9,24 +9,38 @@ from __future__ import annotations
 import json
 import logging
 import os
+import threading
 import time
-from collections import deque
-from typing import Any, Deque, Dict, Optional, Tuple
-
-from openai import OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
-
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from openai import OpenAI, RateLimitError
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from app.core import metrics
 from app.core.config import get_settings
 from app.schemas.idea import Idea
-from app.utils.json_safety import parse_or_default
+from app.services.llm_cache import CacheBackend, build_cache
+from app.services import usage
+from app.services.prompt_fragments import RenderedText, fragments
+from app.services.rate_limiter import RateLimiter, RateLimitTimeout, estimate_tokens
+from app.utils.json_safety import IncrementalFields, parse_or_default
 
 log = logging.getLogger(__name__)
 
 settings = get_settings()
-client = OpenAI()
+# OPENAI_BASE_URL may point at app.devtools.openai_stub for offline runs.
+client = OpenAI(base_url=settings.openai_base_url)
 MODEL = os.getenv("MODEL_CHAT", settings.model_chat)
 
-SYSTEM = "あなたは市場リサーチAI。出力は厳密なJSONのみ。コメントや説明を一切含めない。"
+SYSTEM = RenderedText("あなたは市場リサーチAI。出力は厳密なJSONのみ。コメントや説明を一切含めない。")
 USER_TMPL = """以下の案に対する想定反応をJSONで出力してください。
 - ターゲット: {target}
 - 課題: {pain}
@@ -50,19 +64,15 @@ DEFAULT_PAYLOAD: Dict[str, Any] = {
     "friction_hint": 0.0,
 }
 
-_cache: Dict[Tuple[str, ...], Dict[str, Any]] = {}
-_cache_order: Deque[Tuple[str, ...]] = deque(maxlen=settings.reaction_cache_size)
-_rate_window: Deque[float] = deque()
-
-
-def _rate_limited() -> bool:
-    now = time.time()
-    while _rate_window and now - _rate_window[0] > 60:
-        _rate_window.popleft()
-    if len(_rate_window) >= settings.request_rate_limit_per_minute:
-        return True
-    _rate_window.append(now)
-    return False
+_cache: CacheBackend = build_cache(settings)
+_limiter = RateLimiter(
+    requests_per_minute=settings.request_rate_limit_per_minute,
+    tokens_per_minute=settings.token_rate_limit_per_minute,
+    max_wait_seconds=settings.rate_limit_max_wait_seconds,
+)
+_inflight: Dict[Tuple[str, ...], "Future[Dict[str, Any]]"] = {}
+_inflight_lock = threading.Lock()
+_singleflight_stats: Dict[str, int] = {"leaders": 0, "coalesced": 0}
 
 
 def _cache_get(key: Optional[Tuple[str, ...]]) -> Optional[Dict[str, Any]]:
@@ -71,32 +81,92 @@ def _cache_get(key: Optional[Tuple[str, ...]]) -> Optional[Dict[str, Any]]:
     payload = _cache.get(key)
     if payload:
         log.info("GPT cache hit key=%s", key)
+    metrics.LLM_CACHE_REQUESTS.inc(result="hit" if payload else "miss")
     return payload
 
 
 def _cache_set(key: Optional[Tuple[str, ...]], value: Dict[str, Any]) -> None:
     if key is None:
         return
-    if key not in _cache:
-        if len(_cache_order) >= _cache_order.maxlen:
-            old_key = _cache_order.popleft()
-            if old_key is not None:
-                _cache.pop(old_key, None)
-        _cache_order.append(key)
-    _cache[key] = value
-
-
-def _build_prompt(idea: Idea) -> str:
-    return USER_TMPL.format(
-        target=idea.target,
-        pain=idea.pain,
-        solution=idea.solution,
-        price=idea.price,
-        onboarding=idea.onboarding,
-    )
+    _cache.set(key, value)
+
+
+def _build_prompt(idea: Idea) -> RenderedText:
+    def render() -> str:
+        return USER_TMPL.format(
+            target=idea.target,
+            pain=idea.pain,
+            solution=idea.solution,
+            price=idea.price,
+            onboarding=idea.onboarding,
+        )
+
+    return fragments.get("react-prompt", idea.id, idea.updatedAt, render)
+
 
+@dataclass(frozen=True)
+class EarlyStop:
+    """
+    Stream a JSON completion and stop generating once it is good enough.
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=0.6, max=4))
+    Generation is cut off when every ``required`` field has a complete value
+    while ``text_field`` is still being written and already has at least
+    ``max_text_chars`` characters; the truncated object is closed up by
+    ``parse_or_default``. Answers that finish on their own are read to the
+    end so the provider's usage report is kept.
+    """
+
+    required: Tuple[str, ...]
+    text_field: str
+    max_text_chars: int
+
+    def satisfied(self, parsed: IncrementalFields) -> bool:
+        if self.text_field in parsed.fields:
+            return False
+        if not all(field in parsed.fields for field in self.required):
+            return False
+        return parsed.text_length(self.text_field) >= self.max_text_chars
+
+
+def _stream_content(request_payload: Dict[str, Any], early_stop: EarlyStop) -> Tuple[str, Any, bool]:
+    """Return (content, reported usage or None, whether generation was cut off)."""
+    stream = client.chat.completions.create(
+        **request_payload, stream=True, stream_options={"include_usage": True}
+    )
+    parts: List[str] = []
+    parsed = IncrementalFields()
+    reported = None
+    stopped = False
+    try:
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                reported = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            parts.append(delta)
+            parsed.feed(delta)
+            if not parsed.closed and early_stop.satisfied(parsed):
+                stopped = True
+                break
+    finally:
+        # Closing the response tells the provider to stop generating.
+        stream.close()
+    return "".join(parts), reported, stopped
+
+
+def _record_retry(retry_state: RetryCallState) -> None:
+    metrics.GPT_RETRIES.inc(call_type=retry_state.kwargs.get("call_type", "chat"))
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=0.6, max=4),
+    # The limiter already waited up to its deadline and a spent budget stays
+    # spent; retrying either would only queue again.
+    retry=retry_if_not_exception_type((RateLimitTimeout, usage.BudgetExceeded)),
+    before_sleep=_record_retry,
+)
 def _chat_completion(
     *,
     system: str,
@@ -104,9 +174,40 @@ def _chat_completion(
     temperature: float,
     max_tokens: int,
     response_format: Optional[Dict[str, str]] = None,
+    call_type: str = "chat",
+    early_stop: Optional[EarlyStop] = None,
 ) -> str:
-    if _rate_limited():
-        raise RuntimeError("Rate limit exceeded for GPT calls.")
+    estimated_tokens = estimate_tokens(system, user, completion_tokens=max_tokens)
+    with usage.reserve_budget(estimated_tokens):
+        return _metered_completion(
+            system=system,
+            user=user,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            call_type=call_type,
+            early_stop=early_stop,
+            estimated_tokens=estimated_tokens,
+        )
+
+
+def _metered_completion(
+    *,
+    system: str,
+    user: str,
+    temperature: float,
+    max_tokens: int,
+    response_format: Optional[Dict[str, str]],
+    call_type: str,
+    early_stop: Optional[EarlyStop],
+    estimated_tokens: int,
+) -> str:
+    """One provider call behind the rate limiter, recording latency and usage."""
+    try:
+        reservation = _limiter.acquire(estimated_tokens)
+    except RateLimitTimeout:
+        metrics.RATE_LIMIT_REJECTIONS.inc(source="local")
+        raise
 
     request_payload: Dict[str, Any] = {
         "model": MODEL,
@@ -120,9 +221,108 @@ def _chat_completion(
     if response_format:
         request_payload["response_format"] = response_format
 
-    response = client.chat.completions.create(**request_payload)
-    log.info("OpenAI call cost estimation tokens=%s", response.usage)
-    return response.choices[0].message.content or ""
+    started = time.perf_counter()
+    stopped = False
+    try:
+        if early_stop is None:
+            response = client.chat.completions.create(**request_payload)
+            content, reported = response.choices[0].message.content or "", response.usage
+        else:
+            content, reported, stopped = _stream_content(request_payload, early_stop)
+    except Exception as exc:
+        # Nothing was billed; refund so each retry attempt does not stack another reservation.
+        _limiter.settle(reservation, 0)
+        metrics.GPT_CALL_SECONDS.observe(
+            time.perf_counter() - started, call_type=call_type, outcome="error"
+        )
+        if isinstance(exc, RateLimitError):
+            metrics.RATE_LIMIT_REJECTIONS.inc(source="provider")
+        raise
+    metrics.GPT_CALL_SECONDS.observe(
+        time.perf_counter() - started, call_type=call_type, outcome="early_stop" if stopped else "ok"
+    )
+    log.info("OpenAI call cost estimation tokens=%s", reported)
+    if reported is not None:
+        _limiter.settle(reservation, getattr(reported, "total_tokens", None))
+        usage.record(
+            MODEL,
+            getattr(reported, "prompt_tokens", 0) or 0,
+            getattr(reported, "completion_tokens", 0) or 0,
+        )
+    elif early_stop is not None:
+        # A stream cut off early never receives the usage chunk; bill our estimate.
+        prompt_tokens, completion_tokens = estimate_tokens(system, user), estimate_tokens(content)
+        _limiter.settle(reservation, prompt_tokens + completion_tokens)
+        usage.record(MODEL, prompt_tokens, completion_tokens)
+    return content
+
+
+def _single_flight(
+    key: Optional[Tuple[str, ...]], compute: Callable[[], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Run compute once per cache key across concurrent callers.
+
+    The first caller (the leader) performs the completion; callers arriving
+    while it is in flight wait on the same future and share its payload.
+    """
+    if key is None:
+        return compute()
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+            _singleflight_stats["leaders"] += 1
+        else:
+            _singleflight_stats["coalesced"] += 1
+
+    if not leader:
+        log.info("GPT call coalesced with in-flight request key=%s", key)
+        return future.result()
+
+    try:
+        # A previous leader may have populated the cache between our miss and
+        # claiming leadership.
+        payload = _cache.get(key)
+        if payload is None:
+            payload = compute()
+        future.set_result(payload)
+        return payload
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def get_cached(cache_key: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    """Return a cached payload without calling the model."""
+    return _cache_get(cache_key)
+
+
+def put_cached(cache_key: Tuple[str, ...], payload: Dict[str, Any]) -> None:
+    """Seed the cache with a payload obtained outside call_chat_json (e.g. batches)."""
+    _cache_set(cache_key, payload)
+
+
+def copy_cached(source_key: Tuple[str, ...], target_key: Tuple[str, ...]) -> bool:
+    """Reuse another key's payload when target_key has none; True if something was copied."""
+    if _cache_get(target_key) is not None:
+        return False
+    payload = _cache_get(source_key)
+    if payload is None:
+        return False
+    _cache_set(target_key, payload)
+    return True
+
+
+def singleflight_stats() -> Dict[str, int]:
+    with _inflight_lock:
+        return dict(_singleflight_stats, inflight=len(_inflight))
 
 
 def call_chat_json(
@@ -133,11 +333,76 @@ def call_chat_json(
     temperature: float = 0.4,
     max_tokens: int = 180,
     cache_key: Optional[Tuple[str, ...]] = None,
+    call_type: str = "chat",
+    early_stop: Optional[EarlyStop] = None,
 ) -> Dict[str, Any]:
     cached = _cache_get(cache_key)
     if cached is not None:
         return cached
 
+    def _compute() -> Dict[str, Any]:
+        # Fallbacks are never cached, so the next call for this key reaches the model again.
+        cacheable = True
+        try:
+            content = _chat_completion(
+                system=system,
+                user=user,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"},
+                call_type=call_type,
+                early_stop=early_stop,
+            )
+            payload = parse_or_default(content, {})
+            if not payload:
+                metrics.GPT_FALLBACKS.inc(call_type=call_type, reason="unparseable")
+                payload = fallback.copy()
+                cacheable = False
+        except usage.BudgetExceeded as exc:
+            log.info("GPT JSON call skipped: %s", exc)
+            metrics.GPT_FALLBACKS.inc(call_type=call_type, reason="budget")
+            payload = fallback.copy()
+            cacheable = False
+        except Exception as exc:  # noqa: BLE001
+            log.warning("GPT JSON call failed, using fallback: %s", exc)
+            metrics.GPT_FALLBACKS.inc(call_type=call_type, reason="error")
+            payload = fallback.copy()
+            cacheable = False
+
+        payload["intent_to_try"] = float(
+            max(0.0, min(1.0, payload.get("intent_to_try", fallback.get("intent_to_try", 0.5))))
+        )
+        payload["price_acceptance"] = float(
+            max(0.0, min(1.0, payload.get("price_acceptance", fallback.get("price_acceptance", 0.5))))
+        )
+        if "friction_hint" in fallback:
+            payload["friction_hint"] = float(
+                max(-1.0, min(1.0, payload.get("friction_hint", fallback.get("friction_hint", 0.0))))
+            )
+        if not payload.get("reaction") and fallback.get("reaction"):
+            payload["reaction"] = fallback["reaction"]
+
+        if cacheable:
+            _cache_set(cache_key, payload)
+        return payload
+
+    return _single_flight(cache_key, _compute)
+
+
+def call_chat_document(
+    *,
+    system: str,
+    user: str,
+    temperature: float = 0.4,
+    max_tokens: int = 800,
+    call_type: str = "chat",
+) -> Dict[str, Any]:
+    """
+    Return the raw JSON object produced by the model, or {} on failure.
+
+    Unlike call_chat_json no field normalisation or caching happens here; the
+    caller validates the document and decides what to cache.
+    """
     try:
         content = _chat_completion(
             system=system,
@@ -145,27 +410,16 @@ def call_chat_json(
             temperature=temperature,
             max_tokens=max_tokens,
             response_format={"type": "json_object"},
+            call_type=call_type,
         )
-        payload = parse_or_default(content, fallback)
+    except usage.BudgetExceeded as exc:
+        log.info("GPT document call skipped: %s", exc)
+        metrics.GPT_FALLBACKS.inc(call_type=call_type, reason="budget")
+        return {}
     except Exception as exc:  # noqa: BLE001
-        log.warning("GPT JSON call failed, using fallback: %s", exc)
-        payload = fallback.copy()
-
-    payload["intent_to_try"] = float(
-        max(0.0, min(1.0, payload.get("intent_to_try", fallback.get("intent_to_try", 0.5))))
-    )
-    payload["price_acceptance"] = float(
-        max(0.0, min(1.0, payload.get("price_acceptance", fallback.get("price_acceptance", 0.5))))
-    )
-    if "friction_hint" in fallback:
-        payload["friction_hint"] = float(
-            max(-1.0, min(1.0, payload.get("friction_hint", fallback.get("friction_hint", 0.0))))
-        )
-    if not payload.get("reaction") and fallback.get("reaction"):
-        payload["reaction"] = fallback["reaction"]
-
-    _cache_set(cache_key, payload)
-    return payload
+        log.warning("GPT document call failed: %s", exc)
+        return {}
+    return parse_or_default(content, {})
 
 
 def call_chat_text(
@@ -176,30 +430,50 @@ def call_chat_text(
     temperature: float = 0.4,
     max_tokens: int = 200,
     cache_key: Optional[Tuple[str, ...]] = None,
+    call_type: str = "chat",
 ) -> str:
     cached = _cache_get(cache_key)
     if cached is not None:
         return str(cached.get("text", fallback))
 
-    try:
-        content = _chat_completion(
-            system=system,
-            user=user,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-        text = content.strip() if content else fallback
-    except Exception as exc:  # noqa: BLE001
-        log.warning("GPT text call failed, using fallback: %s", exc)
-        text = fallback
-
-    _cache_set(cache_key, {"text": text})
-    return text
+    def _compute() -> Dict[str, Any]:
+        # Fallbacks are returned for this call only and never cached.
+        payload = {"text": fallback}
+        try:
+            content = _chat_completion(
+                system=system,
+                user=user,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                call_type=call_type,
+            )
+            text = content.strip() if content else ""
+        except usage.BudgetExceeded as exc:
+            log.info("GPT text call skipped: %s", exc)
+            metrics.GPT_FALLBACKS.inc(call_type=call_type, reason="budget")
+            return payload
+        except Exception as exc:  # noqa: BLE001
+            log.warning("GPT text call failed, using fallback: %s", exc)
+            metrics.GPT_FALLBACKS.inc(call_type=call_type, reason="error")
+            return payload
+        if not text:
+            metrics.GPT_FALLBACKS.inc(call_type=call_type, reason="empty")
+            return payload
+
+        payload = {"text": text}
+        _cache_set(cache_key, payload)
+        return payload
+
+    return str(_single_flight(cache_key, _compute).get("text", fallback))
+
+
+def react_cache_key(idea_id: str, updated_at: str) -> Tuple[str, ...]:
+    return (idea_id, updated_at)
 
 
 def react(idea: Idea) -> Dict[str, Any]:
     prompt = _build_prompt(idea)
-    cache_key = (idea.id, idea.updatedAt)
+    cache_key = react_cache_key(idea.id, idea.updatedAt)
     return call_chat_json(
         system=SYSTEM,
         user=prompt,
@@ -207,4 +481,5 @@ def react(idea: Idea) -> Dict[str, Any]:
         temperature=0.4,
         max_tokens=180,
         cache_key=cache_key,
+        call_type="react",
     )
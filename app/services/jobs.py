@@ -0,0 +1,174 @@
+"""
+Background execution of simulations.
+
+Jobs are recorded in the store and executed by a bounded worker pool, so
+long simulations no longer depend on an open HTTP connection. Workers consume
+``simulate.iter_simulation`` to report per-persona progress and to stop early
+when a job is cancelled. Job ids and cancellation requests live in the store,
+so any worker sharing it can cancel a job another worker is running.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from app.core.config import get_settings
+from app.schemas.idea import SimulationRequest, SimulationResult
+from app.schemas.job import SimulationJob
+from app.services import sampling, simulate, store, usage
+
+log = logging.getLogger(__name__)
+
+JOB_PREFIX = "job"
+FINISHED_STATUSES = {"succeeded", "failed", "cancelled"}
+USAGE_ENDPOINT = "/simulate/jobs"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_cancel_events: Dict[str, threading.Event] = {}
+_futures: Dict[str, Future] = {}
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, get_settings().simulation_job_workers),
+                thread_name_prefix="simulation-job",
+            )
+        return _executor
+
+
+def shutdown() -> None:
+    """Stop accepting work and cancel queued jobs (used on application shutdown)."""
+    global _executor
+    for event in list(_cancel_events.values()):
+        event.set()
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _update(job: SimulationJob, **changes: object) -> SimulationJob:
+    updated = job.model_copy(update=changes)
+    store.save_job(updated)
+    return updated
+
+
+def _finish(job: SimulationJob, status: str, **changes: object) -> SimulationJob:
+    _cancel_events.pop(job.id, None)
+    _futures.pop(job.id, None)
+    return _update(job, status=status, finishedAt=_now_iso(), **changes)
+
+
+def _cancel_requested(job_id: str, cancel: threading.Event) -> bool:
+    # The local event covers this process; the store flag covers other workers.
+    return cancel.is_set() or store.job_cancel_requested(job_id)
+
+
+def _run(job_id: str, request: SimulationRequest) -> None:
+    job = store.get_job(job_id)
+    if job is None:
+        return
+    cancel = _cancel_events.get(job_id)
+    if cancel is None or _cancel_requested(job_id, cancel):
+        if job.status not in FINISHED_STATUSES:
+            _finish(job, "cancelled")
+        return
+
+    ideas, personas = simulate.resolve_request(request)
+    job = _update(
+        job,
+        status="running",
+        startedAt=_now_iso(),
+        total=len(ideas) * sampling.sample_limit(len(personas), request.sampling),
+    )
+    results: List[SimulationResult] = []
+    events = simulate.iter_simulation(request)
+    try:
+        with usage.attribute(endpoint=USAGE_ENDPOINT):
+            for event in events:
+                if _cancel_requested(job_id, cancel):
+                    events.close()
+                    _finish(job, "cancelled")
+                    log.info("Simulation job cancelled id=%s", job_id)
+                    return
+                if event.event == "reaction":
+                    job = _update(job, completed=job.completed + 1)
+                elif event.result is not None:
+                    results.append(event.result)
+    except Exception as exc:  # noqa: BLE001
+        log.exception("Simulation job failed id=%s", job_id)
+        _finish(job, "failed", error=str(exc))
+        return
+
+    store.save_job(job, results=results)
+    # Early stopping and reused reactions can aggregate fewer than the planned total.
+    _finish(job, "succeeded", total=sum(result.personasUsed for result in results))
+
+
+def purge_expired() -> int:
+    """Drop finished jobs older than the configured retention window."""
+    retention = timedelta(seconds=get_settings().simulation_job_retention_seconds)
+    cutoff = datetime.now(timezone.utc) - retention
+    expired = [
+        job.id
+        for job in store.list_jobs()
+        if job.status in FINISHED_STATUSES
+        and job.finishedAt is not None
+        and datetime.fromisoformat(job.finishedAt) < cutoff
+    ]
+    for job_id in expired:
+        store.delete_job(job_id)
+    return len(expired)
+
+
+def submit(request: SimulationRequest) -> SimulationJob:
+    purge_expired()
+    job = SimulationJob(
+        id=f"{JOB_PREFIX}-{store.next_job_number()}",
+        status="queued",
+        ideaIds=list(request.ideaIds),
+        createdAt=_now_iso(),
+    )
+    store.save_job(job)
+    _cancel_events[job.id] = threading.Event()
+    _futures[job.id] = _get_executor().submit(_run, job.id, request)
+    log.info("Simulation job queued id=%s ideas=%s", job.id, job.ideaIds)
+    return job
+
+
+def get(job_id: str) -> Optional[SimulationJob]:
+    purge_expired()
+    return store.get_job(job_id)
+
+
+def results(job_id: str) -> Optional[List[SimulationResult]]:
+    return store.get_job_results(job_id)
+
+
+def cancel(job_id: str) -> Optional[SimulationJob]:
+    """
+    Request cancellation. Queued jobs are cancelled immediately; running jobs
+    stop after the persona calls already in flight complete.
+    """
+    job = store.get_job(job_id)
+    if job is None or job.status in FINISHED_STATUSES:
+        return job
+    store.request_job_cancel(job_id)
+    event = _cancel_events.get(job_id)
+    if event is not None:
+        event.set()
+    future = _futures.get(job_id)
+    if job.status == "queued" and (future is None or future.cancel()):
+        return _finish(job, "cancelled")
+    return store.get_job(job_id)
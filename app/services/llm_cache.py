@@ -0,0 +1,243 @@
+"""
+Pluggable cache backends for GPT responses.
+
+``gpt_adapter`` keys cached payloads by tuples of strings (idea id, updatedAt,
+persona id, ...). Backends here store JSON-serialisable payloads under those
+keys with a TTL and a size cap. The SQLite backend keeps paid-for responses
+across restarts and deploys.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple
+
+from app.core import metrics
+from app.core.config import Settings
+
+log = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, ...]
+EvictionHook = Callable[[int], None]
+
+# Inserts between full row counts; other processes sharing the file drift the local count.
+RECOUNT_INTERVAL = 1000
+
+
+class CacheBackend(Protocol):
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        ...
+
+    def set(self, key: CacheKey, value: Dict[str, Any]) -> None:
+        ...
+
+    def clear(self) -> None:
+        ...
+
+
+def _encode_key(key: CacheKey) -> str:
+    return json.dumps(list(key), ensure_ascii=False)
+
+
+class MemoryCache:
+    """Bounded LRU cache with an optional TTL, kept in process memory."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        on_evict: Optional[EvictionHook] = None,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: CacheKey, value: Dict[str, Any], stored_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (stored_at if stored_at is not None else time.time(), value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted and self.on_evict:
+            self.on_evict(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """
+    Single-file persistent cache with an in-memory front.
+
+    Rows carry their creation time (for the TTL) and last access time (for
+    LRU eviction once max_entries is exceeded). The most recently used rows are
+    loaded into the memory front on construction so the cache is warm on startup.
+    The row count is tracked in memory so writes do not scan the table.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        front_size: int = 50,
+        on_evict: Optional[EvictionHook] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        # Only the table's size cap counts; the memory front is a read-through copy.
+        self.on_evict = on_evict
+        self._front = MemoryCache(front_size, ttl_seconds)
+        self._lock = threading.Lock()
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache(accessed_at)"
+        )
+        self._purge_expired()
+        self._rows = self._count()
+        self._inserts_since_count = 0
+        self._warm()
+
+    def _count(self) -> int:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        return int(count)
+
+    def _purge_expired(self) -> None:
+        if self.ttl_seconds is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+
+    def _warm(self) -> None:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value, created_at FROM llm_cache ORDER BY accessed_at DESC LIMIT ?",
+                (self._front.max_entries,),
+            ).fetchall()
+        for raw_key, raw_value, created_at in reversed(rows):
+            self._front.set(tuple(json.loads(raw_key)), json.loads(raw_value), stored_at=created_at)
+        log.info("LLM cache warmed with %d entries from %s", len(rows), self.path)
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        value = self._front.get(key)
+        if value is not None:
+            return value
+
+        now = time.time()
+        encoded = _encode_key(key)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (encoded,)
+            ).fetchone()
+            if row is None:
+                return None
+            raw_value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                deleted = self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (encoded,))
+                self._rows -= deleted.rowcount
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, encoded)
+            )
+        value = json.loads(raw_value)
+        self._front.set(key, value, stored_at=created_at)
+        return value
+
+    def set(self, key: CacheKey, value: Dict[str, Any]) -> None:
+        now = time.time()
+        encoded, payload = _encode_key(key), json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO llm_cache(key, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (encoded, payload, now, now),
+            ).rowcount
+            if inserted:
+                self._rows += 1
+                self._inserts_since_count += 1
+            else:
+                self._conn.execute(
+                    "UPDATE llm_cache SET value = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                    (payload, now, now, encoded),
+                )
+            evicted = self._evict()
+        self._front.set(key, value, stored_at=now)
+        if evicted and self.on_evict:
+            self.on_evict(evicted)
+
+    def _evict(self) -> int:
+        if self._inserts_since_count >= RECOUNT_INTERVAL:
+            self._rows = self._count()
+            self._inserts_since_count = 0
+        overflow = self._rows - self.max_entries
+        if overflow <= 0:
+            return 0
+        evicted = self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            " SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+            (overflow,),
+        ).rowcount
+        self._rows -= evicted
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._rows = 0
+        self._front.clear()
+
+
+def _count_evictions(count: int) -> None:
+    metrics.LLM_CACHE_EVICTIONS.inc(count)
+
+
+def build_cache(settings: Settings) -> CacheBackend:
+    if settings.llm_cache_backend == "sqlite":
+        return SQLiteCache(
+            settings.llm_cache_path,
+            max_entries=settings.llm_cache_max_entries,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            front_size=settings.reaction_cache_size,
+            on_evict=_count_evictions,
+        )
+    return MemoryCache(
+        settings.reaction_cache_size, settings.llm_cache_ttl_seconds, on_evict=_count_evictions
+    )
@@ -0,0 +1,79 @@
+"""
+Rendered prompt fragments, cached per record version.
+
+Idea and persona text blocks are formatted once per ``(id, updatedAt)`` and
+reused for every pair prompt they appear in, so building a prompt is string
+concatenation only. Each fragment is a ``RenderedText``: a ``str`` that also
+carries its token-estimate weight, which ``rate_limiter.estimate_tokens``
+uses instead of rescanning the text.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+from app.services.rate_limiter import text_weight
+
+DEFAULT_MAX_ENTRIES = 50_000
+
+
+class RenderedText(str):
+    """Immutable prompt text with its precomputed ``token_weight``."""
+
+    token_weight: float
+
+    def __new__(cls, text: str, weight: float | None = None) -> "RenderedText":
+        rendered = super().__new__(cls, text)
+        rendered.token_weight = text_weight(text) if weight is None else weight
+        return rendered
+
+
+def join(*parts: str) -> RenderedText:
+    """Concatenate fragments; weights of RenderedText parts are reused, not recomputed."""
+    weight = sum(getattr(part, "token_weight", None) or text_weight(part) for part in parts)
+    return RenderedText("".join(parts), weight)
+
+
+class FragmentCache:
+    """
+    Rendered fragments keyed by ``(namespace, id)`` and tagged with a version.
+
+    A lookup with a newer version re-renders and replaces the stale entry, so
+    an updated idea or persona never reuses text from before the update.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[str, RenderedText]]" = OrderedDict()
+        self._stats: Dict[str, int] = {"hits": 0, "renders": 0}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, ident: Hashable, version: str, render: Callable[[], str]) -> RenderedText:
+        key = (namespace, ident)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+        # Render outside the lock; a concurrent duplicate render is harmless.
+        rendered = RenderedText(render())
+        with self._lock:
+            self._entries[key] = (version, rendered)
+            self._entries.move_to_end(key)
+            self._stats["renders"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return rendered
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+fragments = FragmentCache()
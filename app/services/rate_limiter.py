@@ -0,0 +1,119 @@
+"""
+Blocking request/token budgets for outbound GPT calls.
+
+Two token buckets mirror the provider quotas: requests-per-minute and
+tokens-per-minute. Callers reserve an estimated token count before a call,
+wait (up to a deadline) until both budgets allow it, and settle the
+reservation with the real ``response.usage`` afterwards.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when a caller could not acquire budget before its deadline."""
+
+
+class TokenBucket:
+    """Continuous-refill bucket; the balance may go negative to record debt."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(max(1.0, per_minute))
+        self.refill_per_second = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        needed = min(amount, self.capacity) - self.tokens
+        if needed <= 0:
+            return 0.0
+        return needed / self.refill_per_second
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+    def adjust(self, delta: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+
+@dataclass
+class Reservation:
+    tokens: int
+
+
+def text_weight(text: str) -> float:
+    """Un-rounded token estimate for one text; additive across concatenation."""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return (len(text) - ascii_chars) + ascii_chars / 4
+
+
+def estimate_tokens(*texts: str, completion_tokens: int = 0) -> int:
+    """
+    Cheap token estimate without a tokenizer.
+
+    Japanese characters are counted as roughly one token each and ASCII text as
+    four characters per token, which errs on the high side for our prompts.
+    Texts carrying a precomputed ``token_weight`` (prompt fragments) are not
+    rescanned.
+    """
+    total = 0.0
+    for text in texts:
+        weight = getattr(text, "token_weight", None)
+        total += text_weight(text) if weight is None else weight
+    return int(math.ceil(total)) + completion_tokens
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_wait_seconds: float = 30.0,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_wait_seconds = max_wait_seconds
+        self._cond = threading.Condition()
+
+    def acquire(self, estimated_tokens: int, timeout: Optional[float] = None) -> Reservation:
+        """Block until one request and estimated_tokens fit both budgets."""
+        wait_budget = self.max_wait_seconds if timeout is None else timeout
+        deadline = time.monotonic() + wait_budget
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(estimated_tokens, now),
+                )
+                if wait <= 0:
+                    reserved = int(min(estimated_tokens, self.tokens.capacity))
+                    self.requests.take(1)
+                    self.tokens.take(reserved)
+                    return Reservation(tokens=reserved)
+                remaining = deadline - now
+                if wait > remaining:
+                    raise RateLimitTimeout(
+                        f"GPT rate limit budget unavailable within {wait_budget:.1f}s"
+                    )
+                self._cond.wait(timeout=wait)
+
+    def settle(self, reservation: Reservation, actual_tokens: Optional[int]) -> None:
+        """Correct the token budget once the provider reports real usage."""
+        if actual_tokens is None:
+            return
+        with self._cond:
+            self.tokens.adjust(reservation.tokens - actual_tokens)
+            self._cond.notify_all()
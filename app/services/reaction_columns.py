@@ -0,0 +1,195 @@
+"""
+Compact, column-oriented storage for the reactions of one idea.
+
+Keeping every reaction as a Pydantic object costs roughly a kilobyte each.
+Here numeric fields live in growable NumPy buffers, repeated strings
+(personaId, segment, projectId, version) are interned into a shared
+``StringTable`` and stored as int32 codes, and ``Reaction`` objects are only
+rebuilt for the rows a caller actually reads.
+"""
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.schemas.idea import Reaction
+
+REACTION_ID_PREFIX = "reaction-"
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MISSING = -1
+
+
+class StringTable:
+    """Intern table mapping repeated strings to small integer codes."""
+
+    def __init__(self) -> None:
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return _MISSING
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    code = len(self._values)
+                    self._values.append(value)
+                    self._codes[value] = code
+        return code
+
+    def value(self, code: int) -> Optional[str]:
+        return None if code == _MISSING else self._values[code]
+
+
+class _Column:
+    """Append-only NumPy buffer that doubles its capacity when full."""
+
+    def __init__(self, dtype: np.dtype, capacity: int = 16) -> None:
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def append(self, value: float | int) -> None:
+        if self._size == self._data.shape[0]:
+            grown = np.empty(self._data.shape[0] * 2, dtype=self._data.dtype)
+            grown[: self._size] = self._data[: self._size]
+            self._data = grown
+        self._data[self._size] = value
+        self._size += 1
+
+    def view(self) -> np.ndarray:
+        """Read-only view of the filled prefix (no copy)."""
+        view = self._data[: self._size]
+        view.flags.writeable = False
+        return view
+
+    def __getitem__(self, row: int) -> float | int:
+        return self._data[row].item()
+
+
+def _created_to_us(value: str) -> Optional[int]:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return None
+    delta = parsed - _EPOCH
+    micros = (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+    # Only use the compact form when it reproduces the original string exactly.
+    return micros if _us_to_created(micros) == value else None
+
+
+def _us_to_created(value: int) -> str:
+    seconds, micros = divmod(value, 1_000_000)
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(microsecond=micros).isoformat()
+
+
+def _id_to_number(value: str) -> Optional[int]:
+    if not value.startswith(REACTION_ID_PREFIX):
+        return None
+    suffix = value[len(REACTION_ID_PREFIX) :]
+    if not suffix.isdigit() or str(int(suffix)) != suffix:
+        return None
+    return int(suffix)
+
+
+class ReactionColumns:
+    """
+    Reactions for a single idea, appended in arrival order.
+
+    Values that do not fit the compact encodings (non-``reaction-N`` ids,
+    non-UTC timestamps) are kept verbatim in small side tables, so every
+    reaction round-trips exactly.
+    """
+
+    def __init__(self, idea_id: str, strings: StringTable) -> None:
+        self.idea_id = idea_id
+        self._strings = strings
+        self._likelihood = _Column(np.dtype(np.float64))
+        self._intent = _Column(np.dtype(np.float64))
+        self._created_us = _Column(np.dtype(np.int64))
+        self._id_number = _Column(np.dtype(np.int64))
+        self._persona = _Column(np.dtype(np.int32))
+        self._segment = _Column(np.dtype(np.int32))
+        self._project = _Column(np.dtype(np.int32))
+        self._version = _Column(np.dtype(np.int32))
+        self._texts: List[str] = []
+        self._odd_ids: Dict[int, str] = {}
+        self._odd_created: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def append(self, reaction: Reaction) -> None:
+        with self._lock:
+            row = len(self._texts)
+            id_number = _id_to_number(reaction.id)
+            if id_number is None:
+                self._odd_ids[row] = reaction.id
+            created_us = _created_to_us(reaction.createdAt)
+            if created_us is None:
+                self._odd_created[row] = reaction.createdAt
+
+            self._likelihood.append(reaction.likelihood)
+            self._intent.append(reaction.intent_to_try)
+            self._created_us.append(_MISSING if created_us is None else created_us)
+            self._id_number.append(_MISSING if id_number is None else id_number)
+            self._persona.append(self._strings.code(reaction.personaId))
+            self._segment.append(self._strings.code(reaction.segment))
+            self._project.append(self._strings.code(reaction.projectId))
+            self._version.append(self._strings.code(reaction.version))
+            # Appended last: len() only counts rows whose columns are complete.
+            self._texts.append(reaction.text)
+
+    def extend(self, reactions: Iterable[Reaction]) -> None:
+        for reaction in reactions:
+            self.append(reaction)
+
+    def row(self, index: int) -> Reaction:
+        odd_id = self._odd_ids.get(index)
+        odd_created = self._odd_created.get(index)
+        strings = self._strings
+        # Values were validated when the reaction was first built.
+        return Reaction.model_construct(
+            id=odd_id or f"{REACTION_ID_PREFIX}{self._id_number[index]}",
+            ideaId=self.idea_id,
+            projectId=strings.value(int(self._project[index])),
+            version=strings.value(int(self._version[index])),
+            personaId=strings.value(int(self._persona[index])),
+            text=self._texts[index],
+            likelihood=float(self._likelihood[index]),
+            intent_to_try=float(self._intent[index]),
+            createdAt=odd_created or _us_to_created(int(self._created_us[index])),
+            segment=strings.value(int(self._segment[index])),
+        )
+
+    def newest(self, limit: int) -> List[Reaction]:
+        """The ``limit`` most recent reactions, newest first, in O(limit)."""
+        size = len(self)
+        return [self.row(index) for index in range(size - 1, max(size - limit, 0) - 1, -1)]
+
+    def likelihoods(self) -> np.ndarray:
+        return self._likelihood.view()[: len(self)]
+
+    def intents(self) -> np.ndarray:
+        return self._intent.view()[: len(self)]
+
+    def created_at_us(self) -> np.ndarray:
+        """Creation times as UTC epoch microseconds (-1 where not representable)."""
+        return self._created_us.view()[: len(self)]
+
+    def persona_codes(self) -> np.ndarray:
+        return self._persona.view()[: len(self)]
+
+    def segment_codes(self) -> np.ndarray:
+        return self._segment.view()[: len(self)]
@@ -0,0 +1,125 @@
+"""
+Running reaction aggregates maintained on every write.
+
+Each group (whole idea, segment, persona category) keeps Welford mean/M2
+accumulators for intent_to_try and likelihood, so summary reads are O(1)
+and batches can be merged without revisiting stored reactions.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from app.schemas.idea import GroupStats, MetricSummary, Reaction, ReactionStats
+
+UNKNOWN_GROUP = "unknown"
+
+
+@dataclass
+class RunningStats:
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningStats") -> None:
+        """Combine with another accumulator (Chan et al. parallel update)."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Population variance, matching the panel statistics elsewhere."""
+        return self.m2 / self.count if self.count else 0.0
+
+    def summary(self) -> MetricSummary:
+        return MetricSummary(
+            count=self.count,
+            mean=round(self.mean, 4),
+            variance=round(self.variance, 6),
+            stddev=round(math.sqrt(self.variance), 4),
+        )
+
+
+@dataclass
+class GroupAccumulator:
+    intent: RunningStats = field(default_factory=RunningStats)
+    likelihood: RunningStats = field(default_factory=RunningStats)
+
+    @property
+    def count(self) -> int:
+        return self.intent.count
+
+    def update(self, reaction: Reaction) -> None:
+        self.intent.update(reaction.intent_to_try)
+        self.likelihood.update(reaction.likelihood)
+
+    def merge(self, other: "GroupAccumulator") -> None:
+        self.intent.merge(other.intent)
+        self.likelihood.merge(other.likelihood)
+
+    def summary(self) -> GroupStats:
+        return GroupStats(
+            count=self.count,
+            intent_to_try=self.intent.summary(),
+            likelihood=self.likelihood.summary(),
+        )
+
+
+@dataclass
+class ReactionAggregates:
+    overall: GroupAccumulator = field(default_factory=GroupAccumulator)
+    by_segment: Dict[str, GroupAccumulator] = field(default_factory=dict)
+    by_category: Dict[str, GroupAccumulator] = field(default_factory=dict)
+
+    def add(self, reaction: Reaction, category: Optional[str]) -> None:
+        self.overall.update(reaction)
+        segment = reaction.segment or UNKNOWN_GROUP
+        self.by_segment.setdefault(segment, GroupAccumulator()).update(reaction)
+        self.by_category.setdefault(category or UNKNOWN_GROUP, GroupAccumulator()).update(reaction)
+
+    def groups(self) -> Iterator[Tuple[str, str, GroupAccumulator]]:
+        """(dimension, key, accumulator) rows, the shape the SQLite backend stores."""
+        yield "overall", "", self.overall
+        for key, group in self.by_segment.items():
+            yield "segment", key, group
+        for key, group in self.by_category.items():
+            yield "category", key, group
+
+    def merge_group(self, dimension: str, key: str, group: GroupAccumulator) -> None:
+        if dimension == "overall":
+            self.overall.merge(group)
+        elif dimension == "segment":
+            self.by_segment.setdefault(key, GroupAccumulator()).merge(group)
+        elif dimension == "category":
+            self.by_category.setdefault(key, GroupAccumulator()).merge(group)
+
+    def summary(self, idea_id: str) -> ReactionStats:
+        return ReactionStats(
+            ideaId=idea_id,
+            overall=self.overall.summary(),
+            bySegment={key: group.summary() for key, group in sorted(self.by_segment.items())},
+            byCategory={key: group.summary() for key, group in sorted(self.by_category.items())},
+        )
+
+
+def aggregate(reactions: Iterable[Tuple[Reaction, Optional[str]]]) -> Dict[str, ReactionAggregates]:
+    """Build per-idea aggregates for a batch of (reaction, persona category) pairs."""
+    per_idea: Dict[str, ReactionAggregates] = {}
+    for reaction, category in reactions:
+        per_idea.setdefault(reaction.ideaId, ReactionAggregates()).add(reaction, category)
+    return per_idea
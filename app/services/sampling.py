@@ -0,0 +1,80 @@
+"""
+Sequential persona sampling with a precision-based stopping rule.
+
+Instead of querying the whole panel, ``simulate`` can draw personas in a
+random (optionally category-stratified) order and stop as soon as the 95%
+intervals for PSF and PMF are narrow enough. The interval check uses the
+Welford accumulators from ``reaction_stats`` so each update is O(1).
+"""
+from __future__ import annotations
+
+import math
+import random
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+from app.schemas.idea import SamplingOptions
+from app.schemas.persona import Persona
+from app.services.confidence import Z95
+from app.services.reaction_stats import RunningStats
+
+
+def sampling_order(
+    personas: Sequence[Persona], stratify: bool = True, seed: Optional[int] = None
+) -> List[Persona]:
+    """
+    Return the personas in the order they should be queried.
+
+    With ``stratify`` every prefix of the order keeps each category close to
+    its share of the panel: personas are shuffled within their category and
+    the i-th of n is placed at a jittered position ``(i + u) / n``.
+    """
+    rng = random.Random(seed)
+    if not stratify:
+        order = list(personas)
+        rng.shuffle(order)
+        return order
+
+    by_category: Dict[str, List[Persona]] = defaultdict(list)
+    for persona in personas:
+        by_category[persona.category].append(persona)
+    keyed = []
+    for members in by_category.values():
+        rng.shuffle(members)
+        size = len(members)
+        keyed.extend(((index + rng.random()) / size, persona) for index, persona in enumerate(members))
+    keyed.sort(key=lambda item: item[0])
+    return [persona for _, persona in keyed]
+
+
+def sample_limit(panel_size: int, options: Optional[SamplingOptions]) -> int:
+    """Most personas a run will query."""
+    if options is None or options.maxPersonas is None:
+        return panel_size
+    return min(panel_size, options.maxPersonas)
+
+
+class PrecisionTracker:
+    """Running PSF/PMF interval half-widths, in percentage points."""
+
+    def __init__(self, options: SamplingOptions) -> None:
+        self.options = options
+        self.intent = RunningStats()
+        self.price = RunningStats()
+
+    @property
+    def count(self) -> int:
+        return self.intent.count
+
+    def add(self, intent_to_try: float, price_acceptance: float) -> None:
+        self.intent.update(intent_to_try)
+        self.price.update(price_acceptance)
+
+    def half_width(self) -> float:
+        if self.count == 0:
+            return math.inf
+        widest = max(self.intent.variance, self.price.variance)
+        return Z95 * math.sqrt(widest / self.count) * 100
+
+    def precise_enough(self) -> bool:
+        return self.count >= self.options.minPersonas and self.half_width() <= self.options.precision
@@ -0,0 +1,94 @@
+"""
+Batch scoring pipeline backing ``POST /ideas/score``.
+
+GPT reactions for every requested idea are gathered concurrently, scored in a
+single statkit batch and persisted with one bulk store write.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+from app.schemas.idea import Idea
+from app.services import gpt_adapter, similarity, statkit, store, usage
+from app.utils.concurrency import bounded_map
+
+log = logging.getLogger(__name__)
+
+SCORE_PERSONA_ID = "persona-gpt"
+
+
+def _resolve_ideas(idea_ids: Sequence[str]) -> List[Idea]:
+    ideas: List[Idea] = []
+    for idea_id in idea_ids:
+        idea = store.get_idea(idea_id)
+        if not idea:
+            log.info("Idea not found for scoring id=%s", idea_id)
+            continue
+        ideas.append(idea)
+    return ideas
+
+
+def _reuse_duplicate(idea: Idea) -> Optional[str]:
+    """Seed this idea's cached reaction from a near-duplicate; return the source id if used."""
+    match = similarity.find_duplicate(idea)
+    if match is None:
+        return None
+    copied = gpt_adapter.copy_cached(
+        gpt_adapter.react_cache_key(match.idea_id, match.updated_at),
+        gpt_adapter.react_cache_key(idea.id, idea.updatedAt),
+    )
+    if not copied:
+        return None
+    log.info("Reusing reaction from near-duplicate idea=%s source=%s", idea.id, match.idea_id)
+    return match.idea_id
+
+
+def _react(idea: Idea) -> Tuple[Dict[str, Any], Optional[str]]:
+    reused_from = _reuse_duplicate(idea)
+    with usage.attribute(project_id=idea.projectId, idea_id=idea.id):
+        return gpt_adapter.react(idea), reused_from
+
+
+def score_ideas(idea_ids: Sequence[str]) -> List[Dict[str, object]]:
+    ideas = _resolve_ideas(idea_ids)
+    if not ideas:
+        return []
+
+    concurrency = get_settings().simulation_concurrency
+    reacted: List[Tuple[Dict[str, Any], Optional[str]]] = bounded_map(_react, ideas, concurrency)
+    insights = [insight for insight, _ in reacted]
+    scored = statkit.compute_scores(
+        [
+            (idea.id, insight, idea.projectId, idea.version)
+            for idea, insight in zip(ideas, insights, strict=True)
+        ]
+    )
+
+    store.create_reactions(
+        (
+            idea.id,
+            {
+                "projectId": idea.projectId,
+                "version": idea.version,
+                "personaId": SCORE_PERSONA_ID,
+                "text": insight.get("reaction", ""),
+                "likelihood": score.p_apply[1],
+                "intent_to_try": insight.get("intent_to_try", 0.5),
+                "segment": idea.target,
+            },
+        )
+        for idea, insight, (score, _) in zip(ideas, insights, scored, strict=True)
+    )
+
+    return [
+        {
+            "projectId": idea.projectId,
+            "version": idea.version,
+            **score.model_dump(),
+            "factors": [factor.model_dump() for factor in contribution.factors],
+            "reusedFrom": reused_from,
+        }
+        for idea, (score, contribution), (_, reused_from) in zip(ideas, scored, reacted, strict=True)
+    ]
@@ -0,0 +1,161 @@
+"""
+Local near-duplicate detection for ideas.
+
+Idea text (title, target, pain, solution, price) is NFKC-normalised and
+turned into hashed character 2/3-gram counts, which work for Japanese
+without a tokenizer and need no network or model download. Vectors are
+L2-normalised, so the dot product from the inverted index is the cosine
+similarity.
+
+The index is per process and only holds ideas that were scored or
+simulated here, which are the ones whose GPT reactions are cached and
+worth reusing.
+"""
+from __future__ import annotations
+
+import math
+import re
+import threading
+import unicodedata
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.core.config import get_settings
+from app.schemas.idea import Idea
+
+NGRAM_SIZES = (2, 3)
+HASH_DIMENSIONS = 1 << 20
+
+_WHITESPACE = re.compile(r"\s+")
+
+Vector = Dict[int, float]
+
+
+def normalize(text: str) -> str:
+    """NFKC-fold (full/half width, compatibility kana), lowercase and collapse whitespace."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().lower()
+
+
+def idea_text(idea: Idea) -> str:
+    return "\n".join((idea.title, idea.target, idea.pain, idea.solution, f"{idea.price}円"))
+
+
+def ngram_counts(text: str) -> Vector:
+    """Hashed character n-gram counts of the normalised text."""
+    counts: Dict[int, float] = defaultdict(float)
+    normalized = normalize(text)
+    for size in NGRAM_SIZES:
+        for start in range(len(normalized) - size + 1):
+            # crc32 rather than hash(): stable across processes and PYTHONHASHSEED.
+            gram = normalized[start : start + size].encode("utf-8")
+            counts[zlib.crc32(gram) % HASH_DIMENSIONS] += 1.0
+    return counts
+
+
+def l2_normalize(vector: Vector) -> Vector:
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    if norm == 0:
+        return {}
+    return {feature: value / norm for feature, value in vector.items()}
+
+
+def cosine(left: Vector, right: Vector) -> float:
+    """Dot product of two L2-normalised vectors."""
+    if len(left) > len(right):
+        left, right = right, left
+    return sum(weight * right.get(feature, 0.0) for feature, weight in left.items())
+
+
+def vectorize(text: str) -> Vector:
+    return l2_normalize(ngram_counts(text))
+
+
+@dataclass(frozen=True)
+class Match:
+    idea_id: str
+    updated_at: str
+    similarity: float
+
+
+class IdeaIndex:
+    """Inverted index of idea vectors; one entry per idea id, replaced on update."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[str, int, Vector]] = {}
+        self._postings: Dict[int, Dict[str, float]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _remove(self, idea_id: str) -> None:
+        entry = self._entries.pop(idea_id, None)
+        if entry is None:
+            return
+        for feature in entry[2]:
+            posting = self._postings[feature]
+            posting.pop(idea_id, None)
+            if not posting:
+                del self._postings[feature]
+
+    def add(self, idea: Idea) -> None:
+        vector = vectorize(idea_text(idea))
+        with self._lock:
+            current = self._entries.get(idea.id)
+            if current is not None and current[0] == idea.updatedAt:
+                return
+            self._remove(idea.id)
+            self._entries[idea.id] = (idea.updatedAt, idea.price, vector)
+            for feature, weight in vector.items():
+                self._postings[feature][idea.id] = weight
+
+    def remove(self, idea_id: str) -> None:
+        with self._lock:
+            self._remove(idea_id)
+
+    def nearest(self, idea: Idea, threshold: float) -> Optional[Match]:
+        """
+        Most similar other idea at or above ``threshold``.
+
+        Candidates must have the same price: price acceptance depends on it
+        directly, so a repriced copy is never treated as a duplicate.
+        """
+        vector = vectorize(idea_text(idea))
+        scores: Dict[str, float] = defaultdict(float)
+        with self._lock:
+            for feature, weight in vector.items():
+                for other_id, other_weight in self._postings.get(feature, {}).items():
+                    scores[other_id] += weight * other_weight
+            best: Optional[Match] = None
+            for other_id, score in scores.items():
+                updated_at, price, _ = self._entries[other_id]
+                if other_id == idea.id or price != idea.price or score < threshold:
+                    continue
+                if best is None or score > best.similarity:
+                    best = Match(idea_id=other_id, updated_at=updated_at, similarity=min(1.0, score))
+        return best
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+
+
+index = IdeaIndex()
+
+
+def find_duplicate(idea: Idea) -> Optional[Match]:
+    """
+    Return the closest previously seen near-duplicate of ``idea`` and index it.
+
+    Disabled (always None) when ``DUPLICATE_SIMILARITY_THRESHOLD`` is unset.
+    """
+    threshold = get_settings().duplicate_similarity_threshold
+    if threshold is None:
+        return None
+    match = index.nearest(idea, threshold)
+    index.add(idea)
+    return match
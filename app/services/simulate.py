@@ -3,28 +3,57 @@ Simulation helpers that orchestrate persona-specific GPT reactions and aggregate
 """
 from __future__ import annotations
 
+import hashlib
 import logging
 import math
 from statistics import mean
-from typing import Iterable, List, Sequence
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 from app.schemas.common import CI
 from app.schemas.idea import (
     Idea,
+    SamplingOptions,
     SimulationPersonaReaction,
     SimulationRequest,
     SimulationResult,
+    SimulationStreamEvent,
+    SummaryMode,
 )
+from app.core.config import get_settings
 from app.schemas.persona import Persona
-from app.services import gpt_adapter, statkit, store
+from app.services import confidence, extractive, gpt_adapter, sampling, similarity, statkit, store, usage
+from app.services.prompt_fragments import RenderedText, fragments, join
+from app.services.rate_limiter import estimate_tokens
+from app.services.reaction_stats import RunningStats
+from app.utils.concurrency import bounded_map, iter_completed
 
 log = logging.getLogger(__name__)
 
-PERSONA_SYSTEM = "あなたは市場リサーチAI。出力は厳密なJSONのみ。余計な説明は不要です。"
-SUMMARY_SYSTEM = "あなたはUXリサーチャーです。コメントを要約し、洞察を簡潔に示してください。"
+PERSONA_SYSTEM = RenderedText("あなたは市場リサーチAI。出力は厳密なJSONのみ。余計な説明は不要です。")
+SUMMARY_SYSTEM = RenderedText("あなたはUXリサーチャーです。コメントを要約し、洞察を簡潔に示してください。")
 SUMMARY_PROMPT_TMPL = """以下のコメントから共通する洞察と気付きを150文字以内の日本語でまとめてください:
 {comments}
 """
+SUMMARY_CHUNK_PROMPT_TMPL = """以下のコメント群に共通する論点を、重複を除いて200文字以内の日本語の箇条書きでまとめてください:
+{comments}
+"""
+SUMMARY_CHUNK_MAX_TOKENS = 240
+# A chunk also ends after any comment whose digest is divisible by this, so
+# boundaries depend on content rather than position and adding personas only
+# changes the chunks around the new comments.
+SUMMARY_CHUNK_BOUNDARY_MODULUS = 16
 
 DEFAULT_PERSONA_RESPONSE = {
     "comment": "まだ判断できませんが、まずは小さく試してみたいです。",
@@ -32,9 +61,52 @@ DEFAULT_PERSONA_RESPONSE = {
     "price_acceptance": 0.5,
 }
 DEFAULT_SUMMARY = "コメントが少なく、十分なサマリを生成できませんでした。"
+BATCH_TOKENS_PER_PERSONA = 160
+
+
+PERSONA_PROMPT_INTRO = RenderedText(
+    "これから、次のアイデアについて、あなたの立場から意見を述べてください。\n"
+    "アイデア内容:\n"
+)
+PERSONA_PROMPT_FORMAT = RenderedText(
+    "\n\n"
+    "出力フォーマットは以下のJSON形式で返してください:\n"
+    "{\n"
+    '  "comment": "自由記述コメント",\n'
+    '  "intent_to_try": 0.0,\n'
+    '  "price_acceptance": 0.0\n'
+    "}\n"
+)
+# Same schema with the scores first, so a streamed answer can be cut off
+# (gpt_adapter.EarlyStop) once the comment is long enough.
+PERSONA_PROMPT_FORMAT_SCORES_FIRST = RenderedText(
+    "\n\n"
+    "出力フォーマットは以下のJSON形式で、キーの順番も守って返してください:\n"
+    "{\n"
+    '  "intent_to_try": 0.0,\n'
+    '  "price_acceptance": 0.0,\n'
+    '  "comment": "自由記述コメント"\n'
+    "}\n"
+)
+BATCH_PROMPT_INTRO = RenderedText(
+    "次のアイデアについて、以下の各ペルソナの立場からそれぞれ意見を述べてください。\n"
+    "アイデア内容:\n"
+)
+BATCH_PROMPT_FORMAT = RenderedText(
+    "\n\n"
+    "出力フォーマットは以下のJSON形式で、ペルソナごとに1要素を返してください:\n"
+    "{\n"
+    '  "reactions": [\n'
+    '    {"personaId": "ペルソナID", "comment": "自由記述コメント",'
+    ' "intent_to_try": 0.0, "price_acceptance": 0.0}\n'
+    "  ]\n"
+    "}\n"
+)
+_PERSONAS_HEADING = RenderedText("\n\nペルソナ一覧:\n")
+_NEWLINE = RenderedText("\n")
 
 
-def _idea_to_text(idea: Idea) -> str:
+def _render_idea_text(idea: Idea) -> str:
     return (
         f"タイトル: {idea.title}\n"
         f"ターゲット: {idea.target}\n"
@@ -45,47 +117,105 @@ def _idea_to_text(idea: Idea) -> str:
     )
 
 
-def build_prompt(idea_text: str, persona: Persona) -> str:
-    trait_text = "特性情報なし"
-    if persona.traits:
-        trait_pairs = [f"{key}={round(value, 2)}" for key, value in persona.traits.items()]
-        trait_text = ", ".join(trait_pairs)
+def _idea_to_text(idea: Idea) -> RenderedText:
+    return fragments.get("idea-text", idea.id, idea.updatedAt, lambda: _render_idea_text(idea))
 
-    background = persona.background or "経歴情報なし"
-    comment_style = persona.comment_style or "自由な語り口"
 
-    return (
-        f"あなたは {persona.category} です。\n"
-        f"会話スタイル: {comment_style}\n"
-        f"特徴パラメータ: {trait_text}\n"
-        f"経歴: {background}\n\n"
-        "これから、次のアイデアについて、あなたの立場から意見を述べてください。\n"
-        f"アイデア内容:\n{idea_text}\n\n"
-        "出力フォーマットは以下のJSON形式で返してください:\n"
-        "{\n"
-        '  "comment": "自由記述コメント",\n'
-        '  "intent_to_try": 0.0,\n'
-        '  "price_acceptance": 0.0\n'
-        "}\n"
-    )
+def _persona_traits(persona: Persona) -> str:
+    if not persona.traits:
+        return "特性情報なし"
+    trait_pairs = [f"{key}={round(value, 2)}" for key, value in persona.traits.items()]
+    return ", ".join(trait_pairs)
+
+
+def _persona_preamble(persona: Persona) -> RenderedText:
+    def render() -> str:
+        return (
+            f"あなたは {persona.category} です。\n"
+            f"会話スタイル: {persona.comment_style or '自由な語り口'}\n"
+            f"特徴パラメータ: {_persona_traits(persona)}\n"
+            f"経歴: {persona.background or '経歴情報なし'}\n\n"
+        )
+
+    return fragments.get("persona-preamble", persona.id, persona.updatedAt, render)
+
+
+def _persona_batch_line(persona: Persona) -> RenderedText:
+    def render() -> str:
+        return (
+            f"- personaId: {persona.id} / 立場: {persona.category}"
+            f" / 会話スタイル: {persona.comment_style or '自由な語り口'}"
+            f" / 特徴パラメータ: {_persona_traits(persona)}"
+            f" / 経歴: {persona.background or '経歴情報なし'}"
+        )
+
+    return fragments.get("persona-batch-line", persona.id, persona.updatedAt, render)
+
+
+def build_prompt(idea_text: str, persona: Persona, scores_first: bool = False) -> RenderedText:
+    """Pair prompt assembled from cached fragments; no per-pair formatting."""
+    output_format = PERSONA_PROMPT_FORMAT_SCORES_FIRST if scores_first else PERSONA_PROMPT_FORMAT
+    return join(_persona_preamble(persona), PERSONA_PROMPT_INTRO, idea_text, output_format)
+
+
+def build_batch_prompt(idea_text: str, personas: Sequence[Persona]) -> RenderedText:
+    """Prompt covering several personas while stating the idea only once."""
+    lines: List[str] = []
+    for index, persona in enumerate(personas):
+        if index:
+            lines.append(_NEWLINE)
+        lines.append(_persona_batch_line(persona))
+    return join(BATCH_PROMPT_INTRO, idea_text, _PERSONAS_HEADING, *lines, BATCH_PROMPT_FORMAT)
 
 
 def _clamp(value: float, lo: float, hi: float) -> float:
     return statkit.bounded(value, lo, hi)
 
 
-def _persona_reaction(idea: Idea, persona: Persona) -> SimulationPersonaReaction:
-    prompt = build_prompt(_idea_to_text(idea), persona)
-    cache_key = ("persona-reaction", idea.id, idea.updatedAt, persona.id)
-    payload = gpt_adapter.call_chat_json(
-        system=PERSONA_SYSTEM,
-        user=prompt,
-        fallback=DEFAULT_PERSONA_RESPONSE.copy(),
-        temperature=0.5,
-        max_tokens=220,
-        cache_key=cache_key,
+def _attribute_to(idea: Idea) -> ContextManager[usage.Attribution]:
+    """Charge GPT calls to the idea's project (and budget)."""
+    return usage.attribute(project_id=idea.projectId, idea_id=idea.id)
+
+
+def _persona_cache_key(idea: Idea, persona: Persona) -> Tuple[str, ...]:
+    return _persona_cache_key_for(idea.id, idea.updatedAt, persona.id)
+
+
+def _persona_cache_key_for(idea_id: str, updated_at: str, persona_id: str) -> Tuple[str, ...]:
+    return ("persona-reaction", idea_id, updated_at, persona_id)
+
+
+def _seed_from_duplicate(idea: Idea, personas: List[Persona]) -> Tuple[Optional[str], FrozenSet[str]]:
+    """
+    Copy cached reactions of a near-duplicate idea into this idea's cache keys.
+
+    Returns the source idea id and the personas whose reactions were copied;
+    personas this idea already has cached reactions for are left alone.
+    """
+    match = similarity.find_duplicate(idea)
+    if match is None:
+        return None, frozenset()
+    copied = frozenset(
+        persona.id
+        for persona in personas
+        if gpt_adapter.copy_cached(
+            _persona_cache_key_for(match.idea_id, match.updated_at, persona.id),
+            _persona_cache_key(idea, persona),
+        )
     )
+    if not copied:
+        return None, frozenset()
+    log.info(
+        "Reusing up to %d reactions from near-duplicate idea=%s source=%s similarity=%.3f",
+        len(copied),
+        idea.id,
+        match.idea_id,
+        match.similarity,
+    )
+    return match.idea_id, copied
+
 
+def _reaction_from_payload(persona: Persona, payload: Dict[str, Any]) -> SimulationPersonaReaction:
     comment = str(payload.get("comment", DEFAULT_PERSONA_RESPONSE["comment"])).strip()
     intent = _clamp(float(payload.get("intent_to_try", 0.5)), 0.0, 1.0)
     price = _clamp(float(payload.get("price_acceptance", 0.5)), 0.0, 1.0)
@@ -100,60 +230,362 @@ def _persona_reaction(idea: Idea, persona: Persona) -> SimulationPersonaReaction
     )
 
 
+def _persona_early_stop() -> Optional[gpt_adapter.EarlyStop]:
+    settings = get_settings()
+    if not settings.gpt_stream_early_stop:
+        return None
+    return gpt_adapter.EarlyStop(
+        required=("intent_to_try", "price_acceptance"),
+        text_field="comment",
+        max_text_chars=settings.persona_comment_max_chars,
+    )
+
+
+def _persona_reaction(idea: Idea, persona: Persona) -> SimulationPersonaReaction:
+    early_stop = _persona_early_stop()
+    prompt = build_prompt(_idea_to_text(idea), persona, scores_first=early_stop is not None)
+    with _attribute_to(idea):
+        payload = gpt_adapter.call_chat_json(
+            system=PERSONA_SYSTEM,
+            user=prompt,
+            fallback=DEFAULT_PERSONA_RESPONSE.copy(),
+            temperature=0.5,
+            max_tokens=220,
+            cache_key=_persona_cache_key(idea, persona),
+            call_type="persona_reaction",
+            early_stop=early_stop,
+        )
+    return _reaction_from_payload(persona, payload)
+
+
+def _parse_batch_entry(entry: Any) -> Optional[Dict[str, Any]]:
+    """Validate one element of a batched response; None means retry individually."""
+    if not isinstance(entry, dict):
+        return None
+    try:
+        intent = _clamp(float(entry["intent_to_try"]), 0.0, 1.0)
+        price = _clamp(float(entry["price_acceptance"]), 0.0, 1.0)
+    except (KeyError, TypeError, ValueError):
+        return None
+    comment = str(entry.get("comment") or "").strip()
+    if not comment:
+        return None
+    return {"comment": comment, "intent_to_try": intent, "price_acceptance": price}
+
+
+def _batch_reactions(
+    idea: Idea, personas: Sequence[Persona]
+) -> Dict[str, SimulationPersonaReaction]:
+    """
+    Ask for several personas in one completion.
+
+    Entries for unknown personas, duplicates and malformed items are ignored;
+    personas missing from the result are retried one by one by the caller.
+    Accepted entries are written to the per-pair cache so later single-persona
+    runs hit it.
+    """
+    with _attribute_to(idea):
+        document = gpt_adapter.call_chat_document(
+            system=PERSONA_SYSTEM,
+            user=build_batch_prompt(_idea_to_text(idea), personas),
+            temperature=0.5,
+            max_tokens=BATCH_TOKENS_PER_PERSONA * len(personas) + 60,
+            call_type="persona_batch",
+        )
+    entries = document.get("reactions")
+    if not isinstance(entries, list):
+        return {}
+
+    by_id = {persona.id: persona for persona in personas}
+    reactions: Dict[str, SimulationPersonaReaction] = {}
+    for entry in entries:
+        persona_id = entry.get("personaId") if isinstance(entry, dict) else None
+        persona = by_id.get(str(persona_id))
+        if persona is None or persona.id in reactions:
+            continue
+        payload = _parse_batch_entry(entry)
+        if payload is None:
+            continue
+        gpt_adapter.put_cached(_persona_cache_key(idea, persona), payload)
+        reactions[persona.id] = _reaction_from_payload(persona, payload)
+    return reactions
+
+
+def _iter_batched(
+    idea: Idea, personas: List[Persona], batch_size: int, concurrency: int
+) -> Iterator[SimulationPersonaReaction]:
+    pending: List[Persona] = []
+    for persona in personas:
+        cached = gpt_adapter.get_cached(_persona_cache_key(idea, persona))
+        if cached is not None:
+            yield _reaction_from_payload(persona, cached)
+        else:
+            pending.append(persona)
+
+    answered: Set[str] = set()
+    batches = [pending[i : i + batch_size] for i in range(0, len(pending), batch_size)]
+    for _, batch_result in iter_completed(
+        lambda batch: _batch_reactions(idea, batch), batches, concurrency
+    ):
+        answered.update(batch_result)
+        yield from batch_result.values()
+
+    dropped = [persona for persona in pending if persona.id not in answered]
+    if dropped:
+        log.info("Retrying %d personas dropped from batched responses idea=%s", len(dropped), idea.id)
+        for _, reaction in iter_completed(
+            lambda persona: _persona_reaction(idea, persona), dropped, concurrency
+        ):
+            yield reaction
+
+
 def _mean(values: Sequence[float], default: float = 0.0) -> float:
     return mean(values) if values else default
 
 
-def _ci95(values: Sequence[float]) -> CI:
-    if not values:
-        return CI(low=0.0, high=0.0)
+def _to_ci(bounds: Tuple[float, float]) -> CI:
+    low, high = bounds
+    return CI(low=round(float(low) * 100, 1), high=round(float(high) * 100, 1))
 
-    mu = _mean(values)
-    if len(values) == 1:
-        bounded_low = statkit.bounded(mu, 0.0, 1.0)
-        bounded_high = statkit.bounded(mu, 0.0, 1.0)
-        return CI(low=round(bounded_low * 100, 1), high=round(bounded_high * 100, 1))
 
-    variance = _mean([(value - mu) ** 2 for value in values])
-    std_dev = math.sqrt(variance)
-    margin = 1.96 * (std_dev / math.sqrt(len(values)))
-    low = statkit.bounded(mu - margin, 0.0, 1.0)
-    high = statkit.bounded(mu + margin, 0.0, 1.0)
-    return CI(low=round(low * 100, 1), high=round(high * 100, 1))
+def _psf_pmf_ci(
+    intents: Sequence[float], prices: Sequence[float], method: confidence.CIMethod
+) -> Tuple[CI, CI]:
+    if not prices:
+        return CI(low=0.0, high=0.0), CI(low=0.0, high=0.0)
+    psf_bounds, pmf_bounds = confidence.psf_pmf_ci(
+        intents, prices, method=method, resamples=get_settings().bootstrap_resamples
+    )
+    return _to_ci(psf_bounds), _to_ci(pmf_bounds)
 
 
-def summarize_comments(idea: Idea, comments: Iterable[str]) -> str:
-    filtered = [comment.strip() for comment in comments if comment and comment.strip()]
-    if not filtered:
-        return DEFAULT_SUMMARY
+def _comments_digest(comments: Sequence[str]) -> str:
+    # Stable across processes (unlike hash()) so persisted cache entries stay valid.
+    return hashlib.sha1("\n".join(comments).encode("utf-8")).hexdigest()
 
-    bullet_lines = "\n".join(f"- {line}" for line in filtered[:10])
-    prompt = SUMMARY_PROMPT_TMPL.format(comments=bullet_lines)
-    cache_key = (
-        "persona-summary",
-        idea.id,
-        idea.updatedAt,
-        str(hash(tuple(filtered))),
-    )
-    return gpt_adapter.call_chat_text(
-        system=SUMMARY_SYSTEM,
-        user=prompt,
-        fallback=DEFAULT_SUMMARY,
-        temperature=0.4,
-        max_tokens=180,
-        cache_key=cache_key,
-    )
+
+def _bullets(lines: Sequence[str]) -> str:
+    return "\n".join(f"- {line}" for line in lines)
+
+
+def _lines_tokens(lines: Sequence[str]) -> int:
+    # One extra token per line for the bullet marker and newline.
+    return estimate_tokens(*lines) + len(lines)
 
 
-def _simulate_for_idea(idea: Idea, personas: List[Persona]) -> SimulationResult:
-    reactions = [_persona_reaction(idea, persona) for persona in personas]
+def _is_chunk_boundary(line: str) -> bool:
+    digest = hashlib.sha1(line.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % SUMMARY_CHUNK_BOUNDARY_MODULUS == 0
 
+
+def chunk_comments(lines: Sequence[str], token_budget: int) -> List[List[str]]:
+    """Split lines into chunks of at most token_budget tokens, cutting at content-defined boundaries."""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for line in lines:
+        tokens = _lines_tokens([line])
+        if current and current_tokens + tokens > token_budget:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += tokens
+        if _is_chunk_boundary(line):
+            chunks.append(current)
+            current, current_tokens = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _summarize_chunk(chunk: List[str]) -> str:
+    # Keyed on content only: the prompt does not mention the idea, so identical
+    # chunks are shared across ideas and runs. An empty answer means the call
+    # failed; the extractive stand-in is built only then and never cached.
+    summary = gpt_adapter.call_chat_text(
+        system=SUMMARY_SYSTEM,
+        user=SUMMARY_CHUNK_PROMPT_TMPL.format(comments=_bullets(chunk)),
+        fallback="",
+        temperature=0.3,
+        max_tokens=SUMMARY_CHUNK_MAX_TOKENS,
+        cache_key=("summary-chunk", _comments_digest(chunk)),
+        call_type="summary_chunk",
+    )
+    return summary or extractive.summarize(chunk, max_chars=200)
+
+
+def _condense(lines: List[str], token_budget: int) -> List[str]:
+    """
+    Map step: summarise chunks concurrently until the lines fit one prompt.
+
+    Each level replaces every chunk with its summary; a level that does not
+    shrink the input ends the loop so pathological inputs cannot spin.
+    """
+    concurrency = get_settings().simulation_concurrency
+    tokens = _lines_tokens(lines)
+    while tokens > token_budget:
+        chunks = chunk_comments(lines, token_budget)
+        if len(chunks) <= 1:
+            break
+        condensed = [summary.strip() for summary in bounded_map(_summarize_chunk, chunks, concurrency)]
+        condensed = [summary for summary in condensed if summary]
+        condensed_tokens = _lines_tokens(condensed)
+        if not condensed or condensed_tokens >= tokens:
+            break
+        lines, tokens = condensed, condensed_tokens
+    return lines
+
+
+def summarize_comments(idea: Idea, comments: Iterable[str], mode: SummaryMode = "llm") -> str:
+    """
+    Summarise every comment into one short insight (map-reduce for large panels).
+
+    Comments that fit ``Settings.summary_chunk_tokens`` go to the model in one call.
+    Larger sets are chunked, the chunks summarised in parallel with cached
+    results, and the chunk summaries reduced into the final insight.
+    ``mode="extractive"`` skips the model and returns the local extractive
+    summary, which is also the fallback when a summary call fails.
+    """
+    filtered = [comment.strip() for comment in comments if comment and comment.strip()]
+    if not filtered:
+        return DEFAULT_SUMMARY
+    if mode == "extractive":
+        return extractive.summarize(filtered) or DEFAULT_SUMMARY
+
+    with _attribute_to(idea):
+        condensed = _condense(filtered, get_settings().summary_chunk_tokens)
+        cache_key = (
+            "persona-summary",
+            idea.id,
+            idea.updatedAt,
+            _comments_digest(condensed),
+        )
+        summary = gpt_adapter.call_chat_text(
+            system=SUMMARY_SYSTEM,
+            user=SUMMARY_PROMPT_TMPL.format(comments=_bullets(condensed)),
+            fallback="",
+            temperature=0.4,
+            max_tokens=180,
+            cache_key=cache_key,
+            call_type="summary",
+        )
+    # Empty means the call failed; fall back for this call only (not cached).
+    return summary or extractive.summarize(filtered) or DEFAULT_SUMMARY
+
+
+def _iter_reactions(idea: Idea, personas: List[Persona]) -> Iterator[SimulationPersonaReaction]:
+    """
+    Yield persona reactions in completion order.
+
+    Personas are queried in parallel up to the configured concurrency cap, and
+    grouped into multi-persona prompts when batching is enabled.
+    """
+    settings = get_settings()
+    concurrency = settings.simulation_concurrency
+    if settings.simulation_batch_size > 1:
+        yield from _iter_batched(idea, personas, settings.simulation_batch_size, concurrency)
+        return
+    for _, reaction in iter_completed(
+        lambda persona: _persona_reaction(idea, persona), personas, concurrency
+    ):
+        yield reaction
+
+
+def _iter_sampled(
+    idea: Idea, personas: List[Persona], options: SamplingOptions
+) -> Iterator[SimulationPersonaReaction]:
+    """
+    Yield reactions from a random sample of the panel, stopping early once precise.
+
+    Personas are drawn in rounds sized to keep the worker pool busy; the
+    stopping rule is checked after each round, so a run overshoots the
+    minimal sample by at most one round.
+    """
+    settings = get_settings()
+    order = sampling.sampling_order(personas, options.stratify, options.seed)
+    order = order[: sampling.sample_limit(len(order), options)]
+    step = max(1, settings.simulation_concurrency, settings.simulation_batch_size)
+    tracker = sampling.PrecisionTracker(options)
+    for start in range(0, len(order), step):
+        for reaction in _iter_reactions(idea, order[start : start + step]):
+            tracker.add(reaction.intent_to_try, reaction.price_acceptance)
+            yield reaction
+        if tracker.precise_enough():
+            log.info(
+                "Sampling stopped early idea=%s personas=%d/%d half_width=%.2f",
+                idea.id,
+                tracker.count,
+                len(personas),
+                tracker.half_width(),
+            )
+            return
+
+
+def _reactions_for(
+    idea: Idea, personas: List[Persona], options: Optional[SamplingOptions]
+) -> Iterator[SimulationPersonaReaction]:
+    if options is None:
+        return _iter_reactions(idea, personas)
+    return _iter_sampled(idea, personas, options)
+
+
+def _aggregate(
+    reactions: Sequence[SimulationPersonaReaction], method: confidence.CIMethod = "normal"
+) -> Tuple[float, float, CI, CI]:
+    """Return (psf, pmf, pmf CI, psf CI) for the reactions received so far."""
     intents = [reaction.intent_to_try for reaction in reactions]
     prices = [reaction.price_acceptance for reaction in reactions]
     psf = round(_mean(intents) * 100, 1)
     pmf = round(_mean(prices) * 100, 1)
-    ci95 = _ci95(prices)
-    summary_comment = summarize_comments(idea, (reaction.comment for reaction in reactions))
+    psf_ci, pmf_ci = _psf_pmf_ci(intents, prices, method)
+    return psf, pmf, pmf_ci, psf_ci
+
+
+def _normal_ci(stats: RunningStats) -> CI:
+    """Same bounds as ``confidence.normal_ci``, from running moments."""
+    if stats.count == 0:
+        return CI(low=0.0, high=0.0)
+    margin = confidence.Z95 * math.sqrt(stats.variance / stats.count)
+    return _to_ci((_clamp(stats.mean - margin, 0.0, 1.0), _clamp(stats.mean + margin, 0.0, 1.0)))
+
+
+class _RunningAggregate:
+    """
+    PSF/PMF with normal 95% intervals over the reactions received so far.
+
+    Welford accumulators make each update O(1), so a stream does not re-scan
+    every earlier reaction per event; the configured interval method is
+    applied once, in ``_build_result``.
+    """
+
+    def __init__(self) -> None:
+        self.intent = RunningStats()
+        self.price = RunningStats()
+
+    def add(self, reaction: SimulationPersonaReaction) -> None:
+        self.intent.update(reaction.intent_to_try)
+        self.price.update(reaction.price_acceptance)
+
+    def snapshot(self) -> Tuple[float, float, CI, CI]:
+        """Return (psf, pmf, pmf CI, psf CI) like ``_aggregate``."""
+        psf = round(self.intent.mean * 100, 1)
+        pmf = round(self.price.mean * 100, 1)
+        return psf, pmf, _normal_ci(self.price), _normal_ci(self.intent)
+
+
+def _build_result(
+    idea: Idea,
+    personas: List[Persona],
+    reactions: Iterable[SimulationPersonaReaction],
+    reuse: Tuple[Optional[str], FrozenSet[str]] = (None, frozenset()),
+    summary_mode: SummaryMode = "llm",
+) -> SimulationResult:
+    by_persona = {reaction.personaId: reaction for reaction in reactions}
+    ordered = [by_persona[persona.id] for persona in personas if persona.id in by_persona]
+    # Sampling may stop before every copied reaction is consumed; count only those aggregated.
+    reused = sum(1 for reaction in ordered if reaction.personaId in reuse[1])
+    psf, pmf, ci95, psf_ci95 = _aggregate(ordered, get_settings().ci_method)
+    summary_comment = summarize_comments(idea, (reaction.comment for reaction in ordered), summary_mode)
 
     return SimulationResult(
         ideaId=idea.id,
@@ -163,22 +595,96 @@ def _simulate_for_idea(idea: Idea, personas: List[Persona]) -> SimulationResult:
         psf=psf,
         pmf=pmf,
         ci95=ci95,
-        personaReactions=reactions,
+        psfCi95=psf_ci95,
+        personaReactions=ordered,
+        personasUsed=len(ordered),
+        reusedFrom=reuse[0] if reused else None,
+        reusedReactions=reused,
         summaryComment=summary_comment,
     )
 
 
-def simulate(request: SimulationRequest) -> List[SimulationResult]:
-    idea_ids = request.ideaIds
+def _simulate_for_idea(
+    idea: Idea,
+    personas: List[Persona],
+    options: Optional[SamplingOptions] = None,
+    summary_mode: SummaryMode = "llm",
+) -> SimulationResult:
+    reuse = _seed_from_duplicate(idea, personas)
+    reactions = _reactions_for(idea, personas, options)
+    return _build_result(idea, personas, reactions, reuse, summary_mode)
+
+
+def _iter_idea_events(
+    idea: Idea,
+    personas: List[Persona],
+    options: Optional[SamplingOptions] = None,
+    summary_mode: SummaryMode = "llm",
+) -> Iterator[SimulationStreamEvent]:
+    reuse = _seed_from_duplicate(idea, personas)
+    reactions: List[SimulationPersonaReaction] = []
+    running = _RunningAggregate()
+    total = sampling.sample_limit(len(personas), options)
+    for reaction in _reactions_for(idea, personas, options):
+        reactions.append(reaction)
+        running.add(reaction)
+        # Running updates use the cheap normal interval; the summary event
+        # carries the configured method.
+        psf, pmf, ci95, psf_ci95 = running.snapshot()
+        yield SimulationStreamEvent(
+            event="reaction",
+            ideaId=idea.id,
+            completed=len(reactions),
+            total=total,
+            psf=psf,
+            pmf=pmf,
+            ci95=ci95,
+            psfCi95=psf_ci95,
+            reaction=reaction,
+        )
+
+    result = _build_result(idea, personas, reactions, reuse, summary_mode)
+    yield SimulationStreamEvent(
+        event="summary",
+        ideaId=idea.id,
+        completed=len(reactions),
+        total=total,
+        psf=result.psf,
+        pmf=result.pmf,
+        ci95=result.ci95,
+        psfCi95=result.psfCi95,
+        summaryComment=result.summaryComment,
+        result=result,
+    )
+
+
+def _summary_mode(request: SimulationRequest) -> SummaryMode:
+    return request.summaryMode or get_settings().summary_mode
+
+
+def resolve_request(request: SimulationRequest) -> Tuple[List[Idea], List[Persona]]:
+    """Return the known ideas and registered personas a request will run against."""
     ideas: List[Idea] = [
-        idea for idea_id in idea_ids if (idea := store.get_idea(idea_id)) is not None
+        idea for idea_id in request.ideaIds if (idea := store.get_idea(idea_id)) is not None
     ]
     if not ideas:
-        return []
+        return [], []
 
     personas = store.list_personas()
     if not personas:
         log.warning("No personas registered; simulation cannot run.")
-        return []
+        return [], []
+    return ideas, personas
 
-    return [_simulate_for_idea(idea, personas) for idea in ideas]
+
+def iter_simulation(request: SimulationRequest) -> Iterator[SimulationStreamEvent]:
+    """Stream per-persona reactions with running PSF/PMF/CI, then each idea's summary."""
+    ideas, personas = resolve_request(request)
+    for idea in ideas:
+        yield from _iter_idea_events(idea, personas, request.sampling, _summary_mode(request))
+
+
+def simulate(request: SimulationRequest) -> List[SimulationResult]:
+    ideas, personas = resolve_request(request)
+    mode = _summary_mode(request)
+    return [_simulate_for_idea(idea, personas, request.sampling, mode) for idea in ideas]
@@ -6,9 +6,9 @@ swapped out for real analytics pipelines later on.
 """
 from __future__ import annotations
 
-import math
 import random
-from typing import Dict, Iterable, List, Sequence, Tuple
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
 
 import numpy as np
 
@@ -58,10 +58,122 @@ def _verdict(pmf: float, psf: float) -> str:
 def _contribution_values() -> List[ContributionFactor]:
     raw = _rng.normal(0.2, 0.08, size=len(FACTOR_LABELS))
     abs_total = float(np.sum(np.abs(raw))) or 1.0
-    factors = []
-    for label, value in zip(FACTOR_LABELS, raw, strict=False):
-        factors.append(ContributionFactor(name=label, value=float(round(value / abs_total, 3))))
-    return factors
+    return [
+        ContributionFactor(name=label, value=float(round(value / abs_total, 3)))
+        for label, value in zip(FACTOR_LABELS, raw, strict=True)
+    ]
+
+
+def _verdicts(pmf: np.ndarray, psf: np.ndarray) -> np.ndarray:
+    avg = 0.6 * pmf + 0.4 * psf
+    return np.select([avg >= 70, avg >= 50], ["Go", "Improve"], default="Kill")
+
+
+def _range_arrays(lo: np.ndarray, hi: np.ndarray, decimals: int = RANGE_DECIMALS) -> np.ndarray:
+    return np.round(np.clip(np.stack([lo, hi], axis=1), 0.0, 1.0), decimals)
+
+
+def _fill_missing(values: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    missing = np.isnan(values)
+    if missing.any():
+        values = values.copy()
+        values[missing] = rng.uniform(0.4, 0.7, size=int(missing.sum()))
+    return values
+
+
+@dataclass(frozen=True)
+class ScoreBatch:
+    """Column-oriented scores for N ideas; row i describes the i-th input."""
+
+    psf: np.ndarray
+    pmf: np.ndarray
+    ci_low: np.ndarray
+    ci_high: np.ndarray
+    p_apply: np.ndarray
+    p_purchase: np.ndarray
+    p_d7: np.ndarray
+    verdict: np.ndarray
+    contributions: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.psf.shape[0])
+
+
+def score_arrays(
+    intent: np.ndarray,
+    price_acceptance: np.ndarray,
+    friction: np.ndarray,
+    trend: np.ndarray | None = None,
+    credibility: np.ndarray | None = None,
+    rng: np.random.Generator | None = None,
+    ci_bounds: Tuple[np.ndarray, np.ndarray] | None = None,
+) -> ScoreBatch:
+    """
+    Score N ideas in one pass.
+
+    trend / credibility entries that are NaN (or omitted arrays) receive the
+    same random draws compute_score uses. ci_bounds (0-100 scale, e.g. from
+    ``confidence.psf_pmf_ci`` on real persona panels) replaces the synthetic
+    CI window. Values are rounded the way the API reports them;
+    ``contributions`` has one column per FACTOR_LABELS entry.
+    """
+    rng = rng or _rng
+    intent = np.clip(np.asarray(intent, dtype=float), 0.0, 1.0)
+    price_acc = np.clip(np.asarray(price_acceptance, dtype=float), 0.0, 1.0)
+    friction = np.clip(np.asarray(friction, dtype=float), -1.0, 1.0)
+    size = intent.shape[0]
+    trend = _fill_missing(
+        np.full(size, np.nan) if trend is None else np.asarray(trend, dtype=float), rng
+    )
+    cred = _fill_missing(
+        np.full(size, np.nan) if credibility is None else np.asarray(credibility, dtype=float), rng
+    )
+
+    psf = 100.0 * (0.5 * intent + 0.3 * price_acc + 0.2 * (1.0 - np.maximum(friction, 0.0)))
+    pmf = 100.0 * (0.45 * intent + 0.25 * price_acc + 0.15 * trend + 0.15 * cred)
+    psf = np.clip(psf, 0.0, 100.0)
+    pmf = np.clip(pmf, 0.0, 100.0)
+
+    if ci_bounds is None:
+        delta = rng.uniform(6.0, 10.0, size=size)
+        ci_low = np.clip(pmf - delta, 0.0, 100.0)
+        ci_high = np.clip(pmf + delta, 0.0, 100.0)
+    else:
+        ci_low = np.clip(np.asarray(ci_bounds[0], dtype=float), 0.0, 100.0)
+        ci_high = np.clip(np.asarray(ci_bounds[1], dtype=float), 0.0, 100.0)
+
+    raw = rng.normal(0.2, 0.08, size=(size, len(FACTOR_LABELS)))
+    abs_total = np.sum(np.abs(raw), axis=1, keepdims=True)
+    abs_total[abs_total == 0] = 1.0
+
+    return ScoreBatch(
+        psf=np.round(psf, 1),
+        pmf=np.round(pmf, 1),
+        ci_low=np.round(ci_low, 1),
+        ci_high=np.round(ci_high, 1),
+        p_apply=_range_arrays(intent * 0.6, intent * 0.9),
+        p_purchase=_range_arrays(intent * 0.3, intent * 0.6),
+        p_d7=_range_arrays(intent * 0.4, intent * 0.75),
+        verdict=_verdicts(pmf, psf),
+        contributions=np.round(raw / abs_total, 3),
+    )
+
+
+def _insight_column(insights: Sequence[Dict[str, float]], key: str, default: float) -> np.ndarray:
+    return np.fromiter(
+        (float(insight.get(key, default)) for insight in insights), dtype=float, count=len(insights)
+    )
+
+
+def _optional_column(insights: Sequence[Dict[str, float]], key: str) -> np.ndarray:
+    return np.fromiter(
+        (
+            np.nan if (value := insight.get(key)) is None else float(value)
+            for insight in insights
+        ),
+        dtype=float,
+        count=len(insights),
+    )
 
 
 def compute_score(
@@ -74,6 +186,9 @@ def compute_score(
     Generate a synthetic Score and Contribution for the provided insight payload.
 
     insight keys: intent_to_try, price_acceptance, friction_hint, trend?, cred?
+
+    Plain float arithmetic: for a single idea it is several times cheaper
+    than a one-row ``score_arrays`` call, with the same formulas.
     """
     intent = bounded(float(insight.get("intent_to_try", 0.5)), 0.0, 1.0)
     price_acc = bounded(float(insight.get("price_acceptance", 0.5)), 0.0, 1.0)
@@ -86,18 +201,8 @@ def compute_score(
     if cred is None:
         cred = _random_trend()
 
-    psf = 100.0 * (
-        0.5 * intent
-        + 0.3 * price_acc
-        + 0.2 * (1.0 - max(friction, 0.0))
-    )
-    pmf = 100.0 * (
-        0.45 * intent
-        + 0.25 * price_acc
-        + 0.15 * trend
-        + 0.15 * cred
-    )
-
+    psf = 100.0 * (0.5 * intent + 0.3 * price_acc + 0.2 * (1.0 - max(friction, 0.0)))
+    pmf = 100.0 * (0.45 * intent + 0.25 * price_acc + 0.15 * trend + 0.15 * cred)
     psf = bounded(psf, 0.0, 100.0)
     pmf = bounded(pmf, 0.0, 100.0)
 
@@ -117,7 +222,6 @@ def compute_score(
         p_d7=range_tuple(intent * 0.4, intent * 0.75),
         verdict=_verdict(pmf, psf),
     )
-
     contribution = Contribution(
         ideaId=idea_id,
         projectId=project_id,
@@ -127,6 +231,52 @@ def compute_score(
     return score, contribution
 
 
+def compute_scores(
+    items: Sequence[Tuple[str, Dict[str, float], str | None, str | None]],
+) -> List[Tuple[Score, Contribution]]:
+    """
+    Score a batch of (idea_id, insight, project_id, version) tuples.
+
+    Batches go through score_arrays; a single item takes the scalar path.
+    """
+    if len(items) <= 1:
+        return [compute_score(*item) for item in items]
+    insights = [insight for _, insight, _, _ in items]
+    batch = score_arrays(
+        _insight_column(insights, "intent_to_try", 0.5),
+        _insight_column(insights, "price_acceptance", 0.5),
+        _insight_column(insights, "friction_hint", 0.0),
+        trend=_optional_column(insights, "trend"),
+        credibility=_optional_column(insights, "credibility"),
+    )
+
+    results: List[Tuple[Score, Contribution]] = []
+    for row, (idea_id, _, project_id, version) in enumerate(items):
+        score = Score(
+            ideaId=idea_id,
+            projectId=project_id,
+            version=version,
+            psf=float(batch.psf[row]),
+            pmf=float(batch.pmf[row]),
+            ci95={"low": float(batch.ci_low[row]), "high": float(batch.ci_high[row])},  # type: ignore[arg-type]
+            p_apply=tuple(batch.p_apply[row].tolist()),
+            p_purchase=tuple(batch.p_purchase[row].tolist()),
+            p_d7=tuple(batch.p_d7[row].tolist()),
+            verdict=str(batch.verdict[row]),
+        )
+        contribution = Contribution(
+            ideaId=idea_id,
+            projectId=project_id,
+            version=version,
+            factors=[
+                ContributionFactor(name=label, value=float(value))
+                for label, value in zip(FACTOR_LABELS, batch.contributions[row].tolist(), strict=True)
+            ],
+        )
+        results.append((score, contribution))
+    return results
+
+
 def simulate_win_probs(idea_ids: Sequence[str]) -> Dict[str, float]:
     samples = _rng.random(len(idea_ids))
     total = float(np.sum(samples)) or 1.0
@@ -1,40 +1,37 @@
 """
-Simple in-memory persistence layer.
+Persistence layer used by the API and services.
 
-This module keeps the mock backend state in memory so that the UI can interact
-with stateful endpoints without requiring an external database.
+Records live in a pluggable backend (``store_backends``): in memory by default
+so the UI can interact with stateful endpoints without an external database,
+or in SQLite when ``Settings.store_backend`` is ``"sqlite"``.
 """
 from __future__ import annotations
 
-import itertools
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import re
 
-from app.schemas.idea import Idea, IdeaCreate, Reaction
+from app.core.config import get_settings
+from app.schemas.idea import Idea, IdeaCreate, Reaction, ReactionStats, SimulationResult
+from app.schemas.job import SimulationJob
 from app.schemas.persona import Persona, PersonaCreate
 from app.schemas.project import Project
+from app.schemas.usage import UsageEntry
 from app.services.persona_aliases import (
     PersonaAlias,
     PersonaResolution,
     iter_aliases,
     resolve_persona_reference,
 )
+from app.services.store_backends import Page, PageKey, StoreBackend, build_backend
 
 log = logging.getLogger(__name__)
 
 IDEA_PREFIX = "idea"
 REACTION_PREFIX = "reaction"
 
-_projects: Dict[str, Project] = {}
-_ideas: Dict[str, Idea] = {}
-_reactions: Dict[str, List[Reaction]] = {}
-_personas: Dict[str, Persona] = {}
-_idea_counter = itertools.count(1000)
-_reaction_counter = itertools.count(1000)
-_project_counter = itertools.count(1000)
-_persona_counter = itertools.count(1)
+_backend: StoreBackend = build_backend(get_settings())
 _compat_stats: Dict[str, int] = {"legacy_hits": 0, "legacy_unresolved": 0}
 _persona_alias_index: Dict[str, PersonaAlias] = {}
 
@@ -45,33 +42,26 @@ def _now_iso() -> str:
 
 def reset_store() -> None:
     """Used by tests to ensure a clean state."""
-    _projects.clear()
-    _ideas.clear()
-    _reactions.clear()
-    _personas.clear()
+    _backend.reset()
     _compat_stats.update({"legacy_hits": 0, "legacy_unresolved": 0})
     _persona_alias_index.clear()
 
 
 def upsert_ideas(seed: Iterable[Idea]) -> None:
-    for idea in seed:
-        _ideas[idea.id] = idea
-        _reactions.setdefault(idea.id, [])
+    _backend.put_ideas(seed)
 
 
 def upsert_projects(seed: Iterable[Project]) -> None:
-    for project in seed:
-        _projects[project.id] = project
+    _backend.put_projects(seed)
 
 
 def upsert_personas(seed: Iterable[Persona]) -> None:
-    for persona in seed:
-        _personas[persona.id] = persona
+    _backend.put_personas(seed)
 
 
 def _ensure_persona_alias(alias: PersonaAlias) -> None:
     _persona_alias_index[alias.persona_id] = alias
-    if alias.persona_id in _personas:
+    if _backend.get_persona(alias.persona_id) is not None:
         return
     now = _now_iso()
     persona = Persona(
@@ -86,7 +76,7 @@ def _ensure_persona_alias(alias: PersonaAlias) -> None:
         createdAt=now,
         updatedAt=now,
     )
-    _personas[alias.persona_id] = persona
+    _backend.put_personas([persona])
 
 
 def register_persona_aliases() -> None:
@@ -96,59 +86,96 @@ def register_persona_aliases() -> None:
 
 
 def list_projects() -> List[Project]:
-    return sorted(_projects.values(), key=lambda item: item.updatedAt, reverse=True)
+    return page_projects().items
+
+
+def page_projects(limit: Optional[int] = None, after: Optional[PageKey] = None) -> Page[Project]:
+    """Projects newest-first; ``after`` is the key of the last project already seen."""
+    return _backend.list_projects(limit=limit, after=after)
+
+
+def get_project(project_id: str) -> Optional[Project]:
+    return _backend.get_project(project_id)
 
 
 def create_project(name: str) -> Project:
     slug = _slugify(name)
     base_slug = slug
     idx = 1
-    while slug in _projects:
+    while _backend.get_project(slug) is not None:
         slug = f"{base_slug}-{idx}"
         idx += 1
     now = _now_iso()
     project = Project(id=slug, name=name.strip(), createdAt=now, updatedAt=now)
-    _projects[slug] = project
+    _backend.put_projects([project])
     return project
 
 
 def add_reactions(idea_id: str, reactions: Iterable[Reaction]) -> None:
-    bucket = _reactions.setdefault(idea_id, [])
-    bucket.extend(reactions)
+    _backend.add_reactions(
+        [
+            reaction if reaction.ideaId == idea_id else reaction.model_copy(update={"ideaId": idea_id})
+            for reaction in reactions
+        ]
+    )
+
 
+def list_ideas(project_id: Optional[str] = None) -> List[Idea]:
+    return page_ideas(project_id=project_id).items
 
-def list_ideas() -> List[Idea]:
-    return sorted(_ideas.values(), key=lambda item: item.updatedAt, reverse=True)
+
+def page_ideas(
+    project_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[PageKey] = None,
+) -> Page[Idea]:
+    """
+    Ideas newest-first, optionally within one project.
+
+    Pages come from indexes maintained on write; ``after`` is the key of the
+    last idea already seen, so the page resumes at the same position even if
+    that idea was edited or deleted since.
+    """
+    return _backend.list_ideas(project_id=project_id, limit=limit, after=after)
 
 
 def get_idea(idea_id: str) -> Optional[Idea]:
-    return _ideas.get(idea_id)
+    return _backend.get_idea(idea_id)
 
 
 def list_reactions(idea_id: str, limit: int = 20) -> List[Reaction]:
-    return list(_reactions.get(idea_id, []))[:limit]
+    """Most recent reactions first."""
+    return _backend.list_reactions(idea_id, limit)
+
+
+def reaction_stats(idea_id: str) -> ReactionStats:
+    """Running intent/likelihood aggregates for an idea, updated on every reaction write."""
+    return _backend.reaction_stats(idea_id).summary(idea_id)
 
 
 def list_personas() -> List[Persona]:
-    return sorted(_personas.values(), key=lambda item: item.updatedAt, reverse=True)
+    return page_personas().items
+
+
+def page_personas(limit: Optional[int] = None, after: Optional[PageKey] = None) -> Page[Persona]:
+    return _backend.list_personas(limit=limit, after=after)
 
 
 def create_idea(payload: IdeaCreate) -> Idea:
-    ident = f"{IDEA_PREFIX}-{next(_idea_counter)}"
+    ident = f"{IDEA_PREFIX}-{_backend.next_id('idea')}"
     now = _now_iso()
     ensure_project_exists(payload.projectId)
     idea = Idea(id=ident, createdAt=now, updatedAt=now, **payload.model_dump())
-    _ideas[ident] = idea
-    _reactions.setdefault(ident, [])
+    _backend.put_ideas([idea])
     log.info("Idea created id=%s", ident)
     return idea
 
 
 def append_reaction(idea_id: str, reaction: Reaction) -> None:
-    _reactions.setdefault(idea_id, []).append(reaction)
+    add_reactions(idea_id, [reaction])
 
 
-def create_reaction(idea_id: str, payload: Dict[str, Any]) -> Reaction:
+def _build_reaction(idea_id: str, payload: Dict[str, Any]) -> Reaction:
     from app.schemas.idea import Reaction as ReactionSchema  # avoid circular
 
     legacy_agent_id = (
@@ -178,7 +205,7 @@ def create_reaction(idea_id: str, payload: Dict[str, Any]) -> Reaction:
     else:
         payload.setdefault("personaId", "persona-unknown")
 
-    reaction_id = f"{REACTION_PREFIX}-{next(_reaction_counter)}"
+    reaction_id = f"{REACTION_PREFIX}-{_backend.next_id('reaction')}"
     reaction = ReactionSchema(
         id=reaction_id,
         ideaId=idea_id,
@@ -187,25 +214,37 @@ def create_reaction(idea_id: str, payload: Dict[str, Any]) -> Reaction:
     )
     if getattr(reaction, "projectId", None):
         ensure_project_exists(reaction.projectId, fallback_name=reaction.projectId)
+    return reaction
+
+
+def create_reaction(idea_id: str, payload: Dict[str, Any]) -> Reaction:
+    reaction = _build_reaction(idea_id, payload)
     append_reaction(idea_id, reaction)
     return reaction
 
 
+def create_reactions(items: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Reaction]:
+    """Build reactions for (idea_id, payload) pairs and persist them in one write."""
+    reactions = [_build_reaction(idea_id, payload) for idea_id, payload in items]
+    _backend.add_reactions(reactions)
+    return reactions
+
+
 def ensure_project_exists(project_id: str, fallback_name: Optional[str] = None) -> None:
-    if project_id in _projects:
+    if _backend.get_project(project_id) is not None:
         return
     now = _now_iso()
     name = fallback_name or project_id
-    _projects[project_id] = Project(id=project_id, name=name, createdAt=now, updatedAt=now)
+    _backend.put_projects([Project(id=project_id, name=name, createdAt=now, updatedAt=now)])
 
 
 def _slugify(value: str) -> str:
     base = re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
-    return base or f"project-{next(_project_counter)}"
+    return base or f"project-{_backend.next_id('project')}"
 
 
 def create_persona(payload: PersonaCreate) -> Persona:
-    ident = f"persona-{next(_persona_counter)}"
+    ident = f"persona-{_backend.next_id('persona')}"
     now = _now_iso()
     persona = Persona(
         id=ident,
@@ -213,5 +252,50 @@ def create_persona(payload: PersonaCreate) -> Persona:
         updatedAt=now,
         **payload.model_dump(),
     )
-    _personas[ident] = persona
+    _backend.put_personas([persona])
     return persona
+
+
+def record_usage(entry: UsageEntry) -> None:
+    _backend.record_usage(entry)
+
+
+def list_usage(project_id: str) -> List[UsageEntry]:
+    return _backend.list_usage(project_id)
+
+
+def project_tokens(project_id: str) -> int:
+    return _backend.project_tokens(project_id)
+
+
+def next_job_number() -> int:
+    """Job sequence shared by every worker using the same backend."""
+    return _backend.next_id("job")
+
+
+def save_job(job: SimulationJob, results: Optional[List[SimulationResult]] = None) -> None:
+    _backend.put_job(job, results)
+
+
+def get_job(job_id: str) -> Optional[SimulationJob]:
+    return _backend.get_job(job_id)
+
+
+def get_job_results(job_id: str) -> Optional[List[SimulationResult]]:
+    return _backend.get_job_results(job_id)
+
+
+def list_jobs() -> List[SimulationJob]:
+    return _backend.list_jobs()
+
+
+def delete_job(job_id: str) -> None:
+    _backend.delete_job(job_id)
+
+
+def request_job_cancel(job_id: str) -> None:
+    _backend.request_job_cancel(job_id)
+
+
+def job_cancel_requested(job_id: str) -> bool:
+    return _backend.job_cancel_requested(job_id)
@@ -0,0 +1,787 @@
+"""
+Storage backends behind the ``app.services.store`` API.
+
+``MemoryBackend`` is the original module-level dict storage and remains the
+default. ``SQLiteBackend`` persists the same records in a WAL-mode database
+file so state survives restarts and is shared between uvicorn workers.
+Domain rules (slugs, persona alias resolution, timestamps) stay in
+``store``; backends only persist and query records.
+"""
+from __future__ import annotations
+
+import bisect
+import copy
+import itertools
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from pydantic import TypeAdapter
+
+from app.core.config import Settings
+from app.schemas.idea import Idea, Reaction, SimulationResult
+from app.schemas.job import SimulationJob
+from app.schemas.persona import Persona
+from app.schemas.project import Project
+from app.schemas.usage import UsageEntry
+from app.services import reaction_stats
+from app.services.reaction_columns import ReactionColumns, StringTable
+from app.services.reaction_stats import GroupAccumulator, ReactionAggregates, RunningStats
+
+COUNTER_STARTS: Dict[str, int] = {
+    "idea": 1000,
+    "reaction": 1000,
+    "project": 1000,
+    "persona": 1,
+    "job": 1,
+}
+
+_results_adapter = TypeAdapter(List[SimulationResult])
+
+T = TypeVar("T")
+
+
+class PageKey(NamedTuple):
+    """
+    Position of a record in a newest-first list.
+
+    ``seq`` is the backend's first-insertion order (ascending within one
+    ``updatedAt``). Pages resume strictly after a key, so the record it came
+    from may have been edited or deleted since.
+    """
+
+    updated_at: str
+    seq: int
+    id: str
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    last_key: Optional[PageKey]
+
+
+class OrderedIndex:
+    """
+    Ids kept sorted newest-first by ``updatedAt``, maintained on every write.
+
+    Keys are ``(updatedAt, -seq)`` where ``seq`` is the first-insertion order,
+    so ties list the earliest inserted record first (the order the previous
+    full re-sort produced). Pages are read with ``bisect`` in O(log n + limit).
+    """
+
+    def __init__(self) -> None:
+        self._keys: List[Tuple[str, int, str]] = []
+        self._by_id: Dict[str, Tuple[str, int, str]] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, ident: str) -> bool:
+        return ident in self._by_id
+
+    def upsert(self, ident: str, updated_at: str) -> None:
+        previous = self._by_id.get(ident)
+        if previous is not None:
+            if previous[0] == updated_at:
+                return
+            self._keys.pop(bisect.bisect_left(self._keys, previous))
+            key = (updated_at, previous[1], ident)
+        else:
+            key = (updated_at, -next(self._seq), ident)
+        bisect.insort(self._keys, key)
+        self._by_id[ident] = key
+
+    def remove(self, ident: str) -> None:
+        key = self._by_id.pop(ident, None)
+        if key is not None:
+            self._keys.pop(bisect.bisect_left(self._keys, key))
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._by_id.clear()
+
+    def page(self, limit: Optional[int] = None, after: Optional[PageKey] = None) -> List[PageKey]:
+        """Keys newest-first, starting strictly after the ``after`` key."""
+        end = len(self._keys)
+        if after is not None:
+            end = bisect.bisect_left(self._keys, (after.updated_at, -after.seq, after.id))
+        start = 0 if limit is None else max(0, end - limit)
+        return [PageKey(key[0], -key[1], key[2]) for key in reversed(self._keys[start:end])]
+
+
+def _memory_page(records: Dict[str, T], keys: List[PageKey]) -> Page[T]:
+    return Page([records[key.id] for key in keys], keys[-1] if keys else None)
+
+
+class StoreBackend(Protocol):
+    def reset(self) -> None:
+        ...
+
+    def next_id(self, kind: str) -> int:
+        ...
+
+    def get_project(self, project_id: str) -> Optional[Project]:
+        ...
+
+    def put_projects(self, projects: Iterable[Project]) -> None:
+        ...
+
+    def list_projects(self, limit: Optional[int] = None, after: Optional[PageKey] = None) -> Page[Project]:
+        ...
+
+    def get_idea(self, idea_id: str) -> Optional[Idea]:
+        ...
+
+    def put_ideas(self, ideas: Iterable[Idea]) -> None:
+        ...
+
+    def list_ideas(
+        self,
+        project_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[PageKey] = None,
+    ) -> Page[Idea]:
+        ...
+
+    def get_persona(self, persona_id: str) -> Optional[Persona]:
+        ...
+
+    def put_personas(self, personas: Iterable[Persona]) -> None:
+        ...
+
+    def list_personas(self, limit: Optional[int] = None, after: Optional[PageKey] = None) -> Page[Persona]:
+        ...
+
+    def add_reactions(self, reactions: Sequence[Reaction]) -> None:
+        ...
+
+    def list_reactions(self, idea_id: str, limit: int) -> List[Reaction]:
+        """The ``limit`` most recent reactions for an idea, newest first."""
+        ...
+
+    def reaction_stats(self, idea_id: str) -> ReactionAggregates:
+        ...
+
+    def record_usage(self, entry: UsageEntry) -> None:
+        """Add ``entry``'s counts to the ledger row with the same attribution."""
+        ...
+
+    def list_usage(self, project_id: str) -> List[UsageEntry]:
+        ...
+
+    def project_tokens(self, project_id: str) -> int:
+        """Prompt plus completion tokens recorded for a project."""
+        ...
+
+    def put_job(self, job: SimulationJob, results: Optional[List[SimulationResult]] = None) -> None:
+        ...
+
+    def get_job(self, job_id: str) -> Optional[SimulationJob]:
+        ...
+
+    def get_job_results(self, job_id: str) -> Optional[List[SimulationResult]]:
+        ...
+
+    def list_jobs(self) -> List[SimulationJob]:
+        ...
+
+    def delete_job(self, job_id: str) -> None:
+        ...
+
+    def request_job_cancel(self, job_id: str) -> None:
+        """Flag a job for cancellation; whichever worker runs it polls the flag."""
+        ...
+
+    def job_cancel_requested(self, job_id: str) -> bool:
+        ...
+
+
+class MemoryBackend:
+    """Process-local dictionaries; fast, but lost on restart and per worker."""
+
+    def __init__(self) -> None:
+        self._projects: Dict[str, Project] = {}
+        self._ideas: Dict[str, Idea] = {}
+        self._reactions: Dict[str, ReactionColumns] = {}
+        self._reaction_stats: Dict[str, ReactionAggregates] = {}
+        self._stats_lock = threading.Lock()
+        self._strings = StringTable()
+        self._personas: Dict[str, Persona] = {}
+        self._jobs: Dict[str, SimulationJob] = {}
+        self._job_results: Dict[str, List[SimulationResult]] = {}
+        self._job_cancellations: Set[str] = set()
+        self._usage: Dict[Tuple[str, str, str, str], UsageEntry] = {}
+        self._project_tokens: Dict[str, int] = {}
+        self._usage_lock = threading.Lock()
+        self._counters = {kind: itertools.count(start) for kind, start in COUNTER_STARTS.items()}
+        self._project_index = OrderedIndex()
+        self._idea_index = OrderedIndex()
+        self._ideas_by_project: Dict[str, OrderedIndex] = {}
+        self._persona_index = OrderedIndex()
+        self._index_lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._index_lock:
+            self._projects.clear()
+            self._ideas.clear()
+            self._reactions.clear()
+            self._reaction_stats.clear()
+            self._personas.clear()
+            self._jobs.clear()
+            self._job_results.clear()
+            self._job_cancellations.clear()
+            self._usage.clear()
+            self._project_tokens.clear()
+            self._project_index.clear()
+            self._idea_index.clear()
+            self._ideas_by_project.clear()
+            self._persona_index.clear()
+
+    def next_id(self, kind: str) -> int:
+        return next(self._counters[kind])
+
+    def get_project(self, project_id: str) -> Optional[Project]:
+        return self._projects.get(project_id)
+
+    def put_projects(self, projects: Iterable[Project]) -> None:
+        with self._index_lock:
+            for project in projects:
+                self._projects[project.id] = project
+                self._project_index.upsert(project.id, project.updatedAt)
+
+    def list_projects(self, limit: Optional[int] = None, after: Optional[PageKey] = None) -> Page[Project]:
+        with self._index_lock:
+            return _memory_page(self._projects, self._project_index.page(limit, after))
+
+    def get_idea(self, idea_id: str) -> Optional[Idea]:
+        return self._ideas.get(idea_id)
+
+    def put_ideas(self, ideas: Iterable[Idea]) -> None:
+        with self._index_lock:
+            for idea in ideas:
+                previous = self._ideas.get(idea.id)
+                if previous is not None and previous.projectId != idea.projectId:
+                    self._ideas_by_project[previous.projectId].remove(idea.id)
+                self._ideas[idea.id] = idea
+                self._columns(idea.id)
+                self._idea_index.upsert(idea.id, idea.updatedAt)
+                self._ideas_by_project.setdefault(idea.projectId, OrderedIndex()).upsert(
+                    idea.id, idea.updatedAt
+                )
+
+    def list_ideas(
+        self,
+        project_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[PageKey] = None,
+    ) -> Page[Idea]:
+        with self._index_lock:
+            if project_id is None:
+                index = self._idea_index
+            else:
+                index = self._ideas_by_project.get(project_id, OrderedIndex())
+            return _memory_page(self._ideas, index.page(limit, after))
+
+    def get_persona(self, persona_id: str) -> Optional[Persona]:
+        return self._personas.get(persona_id)
+
+    def put_personas(self, personas: Iterable[Persona]) -> None:
+        with self._index_lock:
+            for persona in personas:
+                self._personas[persona.id] = persona
+                self._persona_index.upsert(persona.id, persona.updatedAt)
+
+    def list_personas(self, limit: Optional[int] = None, after: Optional[PageKey] = None) -> Page[Persona]:
+        with self._index_lock:
+            return _memory_page(self._personas, self._persona_index.page(limit, after))
+
+    def _columns(self, idea_id: str) -> ReactionColumns:
+        columns = self._reactions.get(idea_id)
+        if columns is None:
+            columns = self._reactions.setdefault(idea_id, ReactionColumns(idea_id, self._strings))
+        return columns
+
+    def reaction_columns(self, idea_id: str) -> Optional[ReactionColumns]:
+        """Column store for one idea, for callers that scan numeric fields."""
+        return self._reactions.get(idea_id)
+
+    def _category(self, persona_id: str) -> Optional[str]:
+        persona = self._personas.get(persona_id)
+        return persona.category if persona else None
+
+    def add_reactions(self, reactions: Sequence[Reaction]) -> None:
+        for reaction in reactions:
+            self._columns(reaction.ideaId).append(reaction)
+        with self._stats_lock:
+            for reaction in reactions:
+                self._reaction_stats.setdefault(reaction.ideaId, ReactionAggregates()).add(
+                    reaction, self._category(reaction.personaId)
+                )
+
+    def reaction_stats(self, idea_id: str) -> ReactionAggregates:
+        with self._stats_lock:
+            return copy.deepcopy(self._reaction_stats.get(idea_id, ReactionAggregates()))
+
+    def list_reactions(self, idea_id: str, limit: int) -> List[Reaction]:
+        columns = self._reactions.get(idea_id)
+        return columns.newest(limit) if columns is not None else []
+
+    def record_usage(self, entry: UsageEntry) -> None:
+        key = _usage_key(entry)
+        with self._usage_lock:
+            current = self._usage.get(key)
+            self._usage[key] = entry if current is None else _merge_usage(current, entry)
+            self._project_tokens[key[0]] = (
+                self._project_tokens.get(key[0], 0) + entry.promptTokens + entry.completionTokens
+            )
+
+    def list_usage(self, project_id: str) -> List[UsageEntry]:
+        with self._usage_lock:
+            return [entry for key, entry in sorted(self._usage.items()) if key[0] == project_id]
+
+    def project_tokens(self, project_id: str) -> int:
+        with self._usage_lock:
+            return self._project_tokens.get(project_id, 0)
+
+    def put_job(self, job: SimulationJob, results: Optional[List[SimulationResult]] = None) -> None:
+        self._jobs[job.id] = job
+        if results is not None:
+            self._job_results[job.id] = results
+
+    def get_job(self, job_id: str) -> Optional[SimulationJob]:
+        return self._jobs.get(job_id)
+
+    def get_job_results(self, job_id: str) -> Optional[List[SimulationResult]]:
+        return self._job_results.get(job_id)
+
+    def list_jobs(self) -> List[SimulationJob]:
+        return sorted(self._jobs.values(), key=lambda item: item.createdAt, reverse=True)
+
+    def delete_job(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._job_results.pop(job_id, None)
+        self._job_cancellations.discard(job_id)
+
+    def request_job_cancel(self, job_id: str) -> None:
+        self._job_cancellations.add(job_id)
+
+    def job_cancel_requested(self, job_id: str) -> bool:
+        return job_id in self._job_cancellations
+
+
+def _usage_key(entry: UsageEntry) -> Tuple[str, str, str, str]:
+    return (entry.projectId or "", entry.ideaId or "", entry.endpoint or "", entry.model)
+
+
+def _merge_usage(current: UsageEntry, entry: UsageEntry) -> UsageEntry:
+    return current.model_copy(
+        update={
+            "calls": current.calls + entry.calls,
+            "promptTokens": current.promptTokens + entry.promptTokens,
+            "completionTokens": current.completionTokens + entry.completionTokens,
+            "costUsd": current.costUsd + entry.costUsd,
+        }
+    )
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY, updatedAt TEXT NOT NULL, data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS projects_updated_at ON projects(updatedAt);
+CREATE TABLE IF NOT EXISTS ideas (
+    id TEXT PRIMARY KEY, projectId TEXT NOT NULL, updatedAt TEXT NOT NULL, data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ideas_updated_at ON ideas(updatedAt);
+CREATE INDEX IF NOT EXISTS ideas_project_updated_at ON ideas(projectId, updatedAt);
+CREATE TABLE IF NOT EXISTS personas (
+    id TEXT PRIMARY KEY, updatedAt TEXT NOT NULL, data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS personas_updated_at ON personas(updatedAt);
+CREATE TABLE IF NOT EXISTS reactions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    ideaId TEXT NOT NULL,
+    projectId TEXT NOT NULL,
+    createdAt TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reactions_idea ON reactions(ideaId, seq);
+CREATE INDEX IF NOT EXISTS reactions_project ON reactions(projectId);
+CREATE TABLE IF NOT EXISTS reaction_stats (
+    ideaId TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    intent_mean REAL NOT NULL,
+    intent_m2 REAL NOT NULL,
+    likelihood_mean REAL NOT NULL,
+    likelihood_m2 REAL NOT NULL,
+    PRIMARY KEY (ideaId, dimension, key)
+);
+CREATE TABLE IF NOT EXISTS usage (
+    projectId TEXT NOT NULL,
+    ideaId TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    model TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cost_usd REAL NOT NULL,
+    PRIMARY KEY (projectId, ideaId, endpoint, model)
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY, createdAt TEXT NOT NULL, data TEXT NOT NULL, results TEXT
+);
+CREATE TABLE IF NOT EXISTS job_cancellations (id TEXT PRIMARY KEY);
+"""
+
+
+class SQLiteBackend:
+    """
+    WAL-mode SQLite storage shared by every worker pointing at the same file.
+
+    Records are stored as the Pydantic JSON payload plus the indexed columns
+    the list queries need. Each thread gets its own connection; writes that
+    touch several rows run in a single transaction.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO counters(name, value) VALUES (?, ?)",
+                COUNTER_STARTS.items(),
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._conn())
+
+    def reset(self) -> None:
+        with self._transaction() as conn:
+            for table in (
+                "projects",
+                "ideas",
+                "personas",
+                "reactions",
+                "reaction_stats",
+                "usage",
+                "jobs",
+                "job_cancellations",
+            ):
+                conn.execute(f"DELETE FROM {table}")
+
+    def next_id(self, kind: str) -> int:
+        with self._transaction() as conn:
+            (value,) = conn.execute(
+                "UPDATE counters SET value = value + 1 WHERE name = ? RETURNING value - 1",
+                (kind,),
+            ).fetchone()
+        return int(value)
+
+    def _get(self, table: str, ident: str) -> Optional[str]:
+        row = self._conn().execute(f"SELECT data FROM {table} WHERE id = ?", (ident,)).fetchone()
+        return row[0] if row else None
+
+    def _list(self, query: str, params: Sequence[object] = ()) -> Iterator[str]:
+        for (data,) in self._conn().execute(query, params):
+            yield data
+
+    def _page(
+        self,
+        table: str,
+        limit: Optional[int],
+        after: Optional[PageKey],
+        project_id: Optional[str] = None,
+    ) -> Tuple[List[str], Optional[PageKey]]:
+        """
+        Newest-first keyset pagination on (updatedAt, rowid).
+
+        Upserts keep the rowid, so ties keep first-insertion order like the
+        in-memory index; the rowid is the ``PageKey.seq``.
+        """
+        clauses: List[str] = []
+        params: List[object] = []
+        if project_id is not None:
+            clauses.append("projectId = ?")
+            params.append(project_id)
+        if after is not None:
+            clauses.append("(updatedAt < ? OR (updatedAt = ? AND rowid > ?))")
+            params.extend([after.updated_at, after.updated_at, after.seq])
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(-1 if limit is None else limit)
+        rows = self._conn().execute(
+            f"SELECT updatedAt, rowid, id, data FROM {table}{where}"
+            " ORDER BY updatedAt DESC, rowid ASC LIMIT ?",
+            params,
+        ).fetchall()
+        last_key = PageKey(*rows[-1][:3]) if rows else None
+        return [row[3] for row in rows], last_key
+
+    def get_project(self, project_id: str) -> Optional[Project]:
+        data = self._get("projects", project_id)
+        return Project.model_validate_json(data) if data else None
+
+    def put_projects(self, projects: Iterable[Project]) -> None:
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO projects(id, updatedAt, data) VALUES (?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET updatedAt = excluded.updatedAt, data = excluded.data",
+                ((p.id, p.updatedAt, p.model_dump_json()) for p in projects),
+            )
+
+    def list_projects(self, limit: Optional[int] = None, after: Optional[PageKey] = None) -> Page[Project]:
+        rows, last_key = self._page("projects", limit, after)
+        return Page([Project.model_validate_json(data) for data in rows], last_key)
+
+    def get_idea(self, idea_id: str) -> Optional[Idea]:
+        data = self._get("ideas", idea_id)
+        return Idea.model_validate_json(data) if data else None
+
+    def put_ideas(self, ideas: Iterable[Idea]) -> None:
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO ideas(id, projectId, updatedAt, data) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET projectId = excluded.projectId,"
+                " updatedAt = excluded.updatedAt, data = excluded.data",
+                ((i.id, i.projectId, i.updatedAt, i.model_dump_json()) for i in ideas),
+            )
+
+    def list_ideas(
+        self,
+        project_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[PageKey] = None,
+    ) -> Page[Idea]:
+        rows, last_key = self._page("ideas", limit, after, project_id=project_id)
+        return Page([Idea.model_validate_json(data) for data in rows], last_key)
+
+    def get_persona(self, persona_id: str) -> Optional[Persona]:
+        data = self._get("personas", persona_id)
+        return Persona.model_validate_json(data) if data else None
+
+    def put_personas(self, personas: Iterable[Persona]) -> None:
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO personas(id, updatedAt, data) VALUES (?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET updatedAt = excluded.updatedAt, data = excluded.data",
+                ((p.id, p.updatedAt, p.model_dump_json()) for p in personas),
+            )
+
+    def list_personas(self, limit: Optional[int] = None, after: Optional[PageKey] = None) -> Page[Persona]:
+        rows, last_key = self._page("personas", limit, after)
+        return Page([Persona.model_validate_json(data) for data in rows], last_key)
+
+    def add_reactions(self, reactions: Sequence[Reaction]) -> None:
+        categories: Dict[str, Optional[str]] = {}
+        for persona_id in {r.personaId for r in reactions}:
+            persona = self.get_persona(persona_id)
+            categories[persona_id] = persona.category if persona else None
+        batch = reaction_stats.aggregate((r, categories[r.personaId]) for r in reactions)
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO reactions(id, ideaId, projectId, createdAt, data) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (r.id, r.ideaId, r.projectId, r.createdAt, r.model_dump_json())
+                    for r in reactions
+                ),
+            )
+            # Merge the batch into the stored accumulators inside the same
+            # transaction so concurrent workers never lose an update.
+            for idea_id, aggregates in batch.items():
+                stored = self._load_stats(conn, idea_id)
+                for dimension, key, group in aggregates.groups():
+                    stored.merge_group(dimension, key, group)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO reaction_stats(ideaId, dimension, key, count,"
+                    " intent_mean, intent_m2, likelihood_mean, likelihood_m2)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            idea_id,
+                            dimension,
+                            key,
+                            group.count,
+                            group.intent.mean,
+                            group.intent.m2,
+                            group.likelihood.mean,
+                            group.likelihood.m2,
+                        )
+                        for dimension, key, group in stored.groups()
+                    ),
+                )
+
+    @staticmethod
+    def _load_stats(conn: sqlite3.Connection, idea_id: str) -> ReactionAggregates:
+        aggregates = ReactionAggregates()
+        rows = conn.execute(
+            "SELECT dimension, key, count, intent_mean, intent_m2, likelihood_mean, likelihood_m2"
+            " FROM reaction_stats WHERE ideaId = ?",
+            (idea_id,),
+        )
+        for dimension, key, count, i_mean, i_m2, l_mean, l_m2 in rows:
+            aggregates.merge_group(
+                dimension,
+                key,
+                GroupAccumulator(
+                    intent=RunningStats(count, i_mean, i_m2),
+                    likelihood=RunningStats(count, l_mean, l_m2),
+                ),
+            )
+        return aggregates
+
+    def reaction_stats(self, idea_id: str) -> ReactionAggregates:
+        return self._load_stats(self._conn(), idea_id)
+
+    def list_reactions(self, idea_id: str, limit: int) -> List[Reaction]:
+        return [
+            Reaction.model_validate_json(data)
+            for data in self._list(
+                "SELECT data FROM reactions WHERE ideaId = ? ORDER BY seq DESC LIMIT ?",
+                (idea_id, limit),
+            )
+        ]
+
+    def record_usage(self, entry: UsageEntry) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO usage(projectId, ideaId, endpoint, model, calls, prompt_tokens,"
+                " completion_tokens, cost_usd) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(projectId, ideaId, endpoint, model) DO UPDATE SET"
+                " calls = calls + excluded.calls,"
+                " prompt_tokens = prompt_tokens + excluded.prompt_tokens,"
+                " completion_tokens = completion_tokens + excluded.completion_tokens,"
+                " cost_usd = cost_usd + excluded.cost_usd",
+                (
+                    *_usage_key(entry),
+                    entry.calls,
+                    entry.promptTokens,
+                    entry.completionTokens,
+                    entry.costUsd,
+                ),
+            )
+
+    def list_usage(self, project_id: str) -> List[UsageEntry]:
+        rows = self._conn().execute(
+            "SELECT ideaId, endpoint, model, calls, prompt_tokens, completion_tokens, cost_usd"
+            " FROM usage WHERE projectId = ? ORDER BY ideaId, endpoint, model",
+            (project_id,),
+        )
+        return [
+            UsageEntry(
+                projectId=project_id or None,
+                ideaId=idea_id or None,
+                endpoint=endpoint or None,
+                model=model,
+                calls=calls,
+                promptTokens=prompt_tokens,
+                completionTokens=completion_tokens,
+                costUsd=cost_usd,
+            )
+            for idea_id, endpoint, model, calls, prompt_tokens, completion_tokens, cost_usd in rows
+        ]
+
+    def project_tokens(self, project_id: str) -> int:
+        (total,) = self._conn().execute(
+            "SELECT COALESCE(SUM(prompt_tokens + completion_tokens), 0) FROM usage WHERE projectId = ?",
+            (project_id,),
+        ).fetchone()
+        return int(total)
+
+    def put_job(self, job: SimulationJob, results: Optional[List[SimulationResult]] = None) -> None:
+        with self._transaction() as conn:
+            if results is None:
+                conn.execute(
+                    "INSERT INTO jobs(id, createdAt, data) VALUES (?, ?, ?)"
+                    " ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+                    (job.id, job.createdAt, job.model_dump_json()),
+                )
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs(id, createdAt, data, results) VALUES (?, ?, ?, ?)",
+                    (
+                        job.id,
+                        job.createdAt,
+                        job.model_dump_json(),
+                        _results_adapter.dump_json(results).decode("utf-8"),
+                    ),
+                )
+
+    def get_job(self, job_id: str) -> Optional[SimulationJob]:
+        data = self._get("jobs", job_id)
+        return SimulationJob.model_validate_json(data) if data else None
+
+    def get_job_results(self, job_id: str) -> Optional[List[SimulationResult]]:
+        row = self._conn().execute("SELECT results FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if not row or row[0] is None:
+            return None
+        return _results_adapter.validate_json(row[0])
+
+    def list_jobs(self) -> List[SimulationJob]:
+        return [
+            SimulationJob.model_validate_json(data)
+            for data in self._list("SELECT data FROM jobs ORDER BY createdAt DESC")
+        ]
+
+    def delete_job(self, job_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            conn.execute("DELETE FROM job_cancellations WHERE id = ?", (job_id,))
+
+    def request_job_cancel(self, job_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO job_cancellations(id) VALUES (?)", (job_id,))
+
+    def job_cancel_requested(self, job_id: str) -> bool:
+        row = self._conn().execute("SELECT 1 FROM job_cancellations WHERE id = ?", (job_id,)).fetchone()
+        return row is not None
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK around an autocommit connection."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def build_backend(settings: Settings) -> StoreBackend:
+    if settings.store_backend == "sqlite":
+        return SQLiteBackend(settings.store_path)
+    return MemoryBackend()
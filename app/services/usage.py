@@ -0,0 +1,172 @@
+"""
+Token and cost ledger for GPT calls, with per-project budgets.
+
+Callers describe who a call is for with ``attribute(project_id=..., idea_id=...,
+endpoint=...)``; the values live in a context variable, so they follow the
+call into ``app.utils.concurrency`` worker threads and down to
+``gpt_adapter._chat_completion``, which records usage and checks budgets
+without every intermediate function passing them along.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from typing import Dict, Iterator, Optional, Tuple, TypeVar
+
+from app.core.config import get_settings
+from app.schemas.usage import ProjectUsage, UsageEntry
+from app.services import store
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# USD per million (prompt, completion) tokens; unknown models are costed at zero.
+MODEL_PRICES_PER_MILLION: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised instead of calling the model once a project's token budget is spent."""
+
+
+@dataclass(frozen=True)
+class Attribution:
+    project_id: Optional[str] = None
+    idea_id: Optional[str] = None
+    endpoint: Optional[str] = None
+
+
+_current: ContextVar[Attribution] = ContextVar("usage_attribution", default=Attribution())
+
+
+def current() -> Attribution:
+    return _current.get()
+
+
+@contextmanager
+def attribute(**changes: Optional[str]) -> Iterator[Attribution]:
+    """Attribute GPT calls made inside the block; unspecified fields are inherited."""
+    token = _current.set(replace(_current.get(), **changes))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+def bind(iterator: Iterator[T]) -> Iterator[T]:
+    """
+    Iterate under the attribution active now rather than at each ``next()``.
+
+    Streaming responses advance their generator from fresh contexts, so the
+    attribution set by the route handler would otherwise be lost.
+    """
+    attribution = _current.get()
+
+    def _iterate() -> Iterator[T]:
+        try:
+            while True:
+                token = _current.set(attribution)
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    _current.reset(token)
+                yield item
+        finally:
+            # Propagate early close so the wrapped generator can cancel its work.
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    return _iterate()
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICES_PER_MILLION.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def budget_for(project_id: str) -> Optional[int]:
+    settings = get_settings()
+    return settings.project_token_budgets.get(project_id, settings.default_project_token_budget)
+
+
+_held: Dict[str, int] = {}
+_held_lock = threading.Lock()
+
+
+@contextmanager
+def reserve_budget(estimated_tokens: int) -> Iterator[None]:
+    """
+    Hold ``estimated_tokens`` against the attributed project's budget for one call.
+
+    Raises BudgetExceeded when recorded usage plus the tokens held by calls
+    still in flight reaches the budget, so a concurrent fan-out cannot
+    overshoot it by more than one call. The hold is released on exit, after
+    the call has recorded its real usage. Holds are per process.
+    """
+    project_id = _current.get().project_id
+    budget = None if project_id is None else budget_for(project_id)
+    if project_id is None or budget is None:
+        yield
+        return
+    with _held_lock:
+        used = store.project_tokens(project_id)
+        held = _held.get(project_id, 0)
+        if used + held >= budget:
+            raise BudgetExceeded(
+                f"Project {project_id} used {used} (+{held} in flight) of {budget} budgeted tokens"
+            )
+        _held[project_id] = held + estimated_tokens
+    try:
+        yield
+    finally:
+        with _held_lock:
+            remaining = _held[project_id] - estimated_tokens
+            if remaining:
+                _held[project_id] = remaining
+            else:
+                del _held[project_id]
+
+
+def record(model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    attribution = _current.get()
+    store.record_usage(
+        UsageEntry(
+            projectId=attribution.project_id,
+            ideaId=attribution.idea_id,
+            endpoint=attribution.endpoint,
+            model=model,
+            calls=1,
+            promptTokens=prompt_tokens,
+            completionTokens=completion_tokens,
+            costUsd=estimate_cost(model, prompt_tokens, completion_tokens),
+        )
+    )
+
+
+def project_usage(project_id: str) -> ProjectUsage:
+    entries = store.list_usage(project_id)
+    prompt = sum(entry.promptTokens for entry in entries)
+    completion = sum(entry.completionTokens for entry in entries)
+    budget = budget_for(project_id)
+    return ProjectUsage(
+        projectId=project_id,
+        calls=sum(entry.calls for entry in entries),
+        promptTokens=prompt,
+        completionTokens=completion,
+        totalTokens=prompt + completion,
+        costUsd=round(sum(entry.costUsd for entry in entries), 6),
+        budgetTokens=budget,
+        remainingTokens=None if budget is None else max(0, budget - prompt - completion),
+        breakdown=entries,
+    )
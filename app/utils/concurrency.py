@@ -0,0 +1,58 @@
+"""
+Small helpers for fanning blocking work (mostly GPT calls) out to threads.
+
+FastAPI runs the synchronous route handlers in a worker thread already, so a
+bounded thread pool is the least intrusive way to overlap network round-trips
+without rewriting the call chain as async. Each call runs in a copy of the
+submitting thread's context, so context variables (e.g. usage attribution)
+carry over into the workers.
+"""
+from __future__ import annotations
+
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _submit(executor: ThreadPoolExecutor, fn: Callable[[T], R], item: T) -> "Future[R]":
+    # One copy per call: a Context cannot be entered by two threads at once.
+    return executor.submit(contextvars.copy_context().run, fn, item)
+
+
+def bounded_map(fn: Callable[[T], R], items: Iterable[T], max_workers: int) -> List[R]:
+    """Apply fn to every item using at most max_workers threads, preserving order."""
+    materialised = list(items)
+    workers = min(max_workers, len(materialised))
+    if workers <= 1:
+        return [fn(item) for item in materialised]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [_submit(executor, fn, item) for item in materialised]
+        return [future.result() for future in futures]
+
+
+def iter_completed(
+    fn: Callable[[T], R], items: Iterable[T], max_workers: int
+) -> Iterator[Tuple[T, R]]:
+    """
+    Yield (item, result) pairs as soon as each call finishes.
+
+    Closing the generator early cancels calls that have not started yet, so a
+    disconnected stream does not keep paying for GPT round-trips.
+    """
+    materialised = list(items)
+    workers = min(max_workers, len(materialised))
+    if workers <= 1:
+        for item in materialised:
+            yield item, fn(item)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {_submit(executor, fn, item): item for item in materialised}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -3,35 +3,232 @@ Utilities to safely coerce LLM output into JSON structures.
 
 The helpers here deliberately avoid third-party dependencies so they can be
 reused in other services or swapped out when moving away from OpenAI.
+
+Objects are located with a single-pass, string-aware brace scanner rather
+than a regex, so prose or code fences around the JSON, several objects in
+one reply, and braces inside string values are all handled in linear time.
+An object cut off by ``max_tokens`` is closed up best-effort instead of
+being discarded. ``IncrementalFields`` applies the same scan to a streamed
+completion, exposing fields before the object is finished.
 """
 from __future__ import annotations
 
 import json
 import logging
-import re
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 log = logging.getLogger(__name__)
 
-JSON_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _repairs(text: str, start: int) -> List[str]:
+    """
+    Candidate completions for an object truncated at the end of ``text``.
+
+    The first keeps everything (closing an open string value); the second
+    cuts back to the last comma or opener, dropping a half-written member.
+    """
+    stack: List[str] = []
+    in_string = escaped = False
+    safe_cut: Optional[Tuple[int, List[str]]] = None
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+            safe_cut = (index + 1, list(stack))
+        elif stack and char == stack[-1]:
+            stack.pop()
+        elif char == ",":
+            safe_cut = (index, list(stack))
+
+    body = text[start:].rstrip()
+    if escaped:
+        body = body[:-1]
+    candidates = [body + ('"' if in_string else "") + "".join(reversed(stack))]
+    if safe_cut is not None:
+        end, closers = safe_cut
+        candidates.append(text[start:end] + "".join(reversed(closers)))
+    return candidates
+
+
+def extract_json_objects(text: str, repair: bool = True) -> List[str]:
+    """
+    Return every top-level ``{...}`` substring of text, in order.
+
+    Quotes only open strings inside an object, so apostrophes and quotes in
+    surrounding prose do not confuse the scan. With ``repair``, an object
+    still open at the end of the text is followed by its repaired
+    completions (see ``_repairs``).
+    """
+    text = text or ""
+    objects: List[str] = []
+    depth = 0
+    start = 0
+    in_string = escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == "{":
+            if depth == 0:
+                start = index
+            depth += 1
+        elif depth == 0:
+            continue
+        elif char == '"':
+            in_string = True
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                objects.append(text[start : index + 1])
+    if depth > 0 and repair:
+        objects.extend(_repairs(text, start))
+    return objects
 
 
 def extract_json_like(text: str) -> str:
-    """Return the first balanced JSON-like substring found in text."""
-    match = JSON_PATTERN.search(text or "")
-    if not match:
+    """Return the first top-level JSON-like object found in text."""
+    objects = extract_json_objects(text, repair=False) or extract_json_objects(text)
+    if not objects:
         raise ValueError("No JSON object found in text.")
-    return match.group(0)
+    return objects[0]
+
+
+def parse_all(text: str) -> List[Dict[str, Any]]:
+    """Parse every top-level JSON object in text, skipping fragments that do not parse."""
+    parsed: List[Dict[str, Any]] = []
+    for candidate in extract_json_objects(text):
+        try:
+            document = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(document, dict):
+            parsed.append(document)
+    return parsed
 
 
 def parse_or_default(text: str, default: Dict[str, Any]) -> Dict[str, Any]:
-    """Attempt to parse JSON, falling back to default on error."""
-    try:
-        document = extract_json_like(text)
-        parsed = json.loads(document)
-        if not isinstance(parsed, dict):
-            raise ValueError("Parsed payload is not a JSON object.")
-        return parsed
-    except Exception as exc:
-        log.info("JSON coercion fallback triggered: %s", exc)
-        return default.copy()
+    """Return the first JSON object in text that parses, falling back to default."""
+    for candidate in extract_json_objects(text):
+        try:
+            parsed = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    log.info("JSON coercion fallback triggered: no parseable object in %d chars", len(text or ""))
+    return default.copy()
+
+
+class IncrementalFields:
+    """
+    Top-level fields of one JSON object, parsed while its text is still arriving.
+
+    Feed completion chunks as they stream in; a field appears in ``fields``
+    as soon as its value is complete (a number once the following ``,``,
+    ``}`` or whitespace arrives), so callers can act before the object ends.
+    Text before the first ``{`` (e.g. a code fence) is ignored.
+    """
+
+    def __init__(self) -> None:
+        self.fields: Dict[str, Any] = {}
+        self.closed = False
+        self._text = ""
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._phase = "key"  # key -> colon -> value -> after -> key ...
+        self._key: Optional[str] = None
+        self._in_token = False
+        self._start = 0
+
+    def feed(self, chunk: str) -> None:
+        offset = len(self._text)
+        self._text += chunk
+        for index in range(offset, len(self._text)):
+            if self.closed:
+                return
+            self._step(index, self._text[index])
+
+    def text_length(self, key: str) -> int:
+        """Characters received so far for a string field, complete or still open."""
+        value = self.fields.get(key)
+        if isinstance(value, str):
+            return len(value)
+        if self._in_string and self._in_token and self._phase == "value" and self._key == key:
+            return len(self._text) - self._start - 1
+        return 0
+
+    def _step(self, index: int, char: str) -> None:
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+                if self._depth == 1:
+                    self._finish(index + 1)
+            return
+        if self._depth == 0:
+            if char == "{":
+                self._depth = 1
+            return
+        if self._depth == 1 and self._in_token and (char in ",}" or char.isspace()):
+            # Only a bare scalar (number, true, null...) can be open at depth 1 here.
+            self._finish(index)
+        if char == '"':
+            self._in_string = True
+            if self._depth == 1:
+                self._begin(index)
+        elif char in "{[":
+            if self._depth == 1 and self._phase == "value":
+                self._begin(index)
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 1 and self._in_token:
+                self._finish(index + 1)
+            elif self._depth == 0:
+                self.closed = True
+        elif self._depth == 1:
+            if char == ":" and self._phase == "colon":
+                self._phase = "value"
+            elif char == ",":
+                self._phase = "key"
+            elif not char.isspace() and self._phase == "value" and not self._in_token:
+                self._begin(index)
+
+    def _begin(self, index: int) -> None:
+        self._in_token = True
+        self._start = index
+
+    def _finish(self, end: int) -> None:
+        self._in_token = False
+        try:
+            value = json.loads(self._text[self._start : end])
+        except ValueError:
+            value, parsed = None, False
+        else:
+            parsed = True
+        if self._phase == "key":
+            self._key = value if isinstance(value, str) else None
+            self._phase = "colon"
+        elif self._phase == "value":
+            if parsed and self._key is not None:
+                self.fields[self._key] = value
+            self._phase = "after"
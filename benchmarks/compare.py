@@ -0,0 +1,54 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare old.json new.json --threshold 1.25
+
+Cases are matched on name and parameters. Exits with status 1 when any case
+got slower than ``threshold`` times its baseline per-operation median.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+CaseKey = Tuple[str, str]
+
+
+def _load(path: Path) -> Dict[CaseKey, Dict[str, Any]]:
+    report = json.loads(path.read_text(encoding="utf-8"))
+    return {
+        (result["name"], json.dumps(result["params"], sort_keys=True, ensure_ascii=False)): result
+        for result in report["results"]
+    }
+
+
+def compare(baseline: Path, candidate: Path) -> List[Tuple[CaseKey, float, float, float]]:
+    """(case, baseline s/op, candidate s/op, ratio) for cases present in both files."""
+    old, new = _load(baseline), _load(candidate)
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key]["per_op_s"], new[key]["per_op_s"]
+        rows.append((key, before, after, after / before if before else float("inf")))
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    regressions = 0
+    for (name, params), before, after, ratio in compare(args.baseline, args.candidate):
+        flag = "REGRESSION" if ratio > args.threshold else ""
+        regressions += bool(flag)
+        print(f"{name:<34} {params:<40} {before * 1000:>10.3f} -> {after * 1000:>10.3f} ms/op  x{ratio:.2f} {flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Seeded synthetic records for the benchmark suite.
+
+Shapes follow ``app/data/seed.py`` closely enough that validation, indexing
+and prompt building do realistic work, while sizes are free to scale up.
+"""
+from __future__ import annotations
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Sequence
+
+from app.schemas.idea import Idea, Reaction
+from app.schemas.persona import Persona
+
+CATEGORIES = ["大企業決裁者", "VC", "スタートアップ決裁者", "デザイナー", "学生", "主婦"]
+SEGMENTS = ["学生", "社会人", "経営者", "主婦", None]
+COMMENTS = [
+    "使ってみたいが価格が気になる",
+    "課題には強く共感する。導入の手間が少なければ試したい",
+    "既存サービスとの違いがまだ分かりにくい",
+    "チームで使うなら稟議が必要になりそう",
+    "毎日使う場面が想像できるので前向きに検討したい",
+]
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _timestamp(offset_seconds: int) -> str:
+    return (_EPOCH + timedelta(seconds=offset_seconds)).isoformat()
+
+
+def make_personas(count: int, seed: int = 0) -> List[Persona]:
+    rng = random.Random(seed)
+    return [
+        Persona(
+            id=f"persona-bench-{n}",
+            name=f"ベンチ{n}",
+            category=rng.choice(CATEGORIES),
+            age=rng.randint(18, 70),
+            background="都内在住。新しいサービスはまず無料で試す。",
+            traits={"novelty": round(rng.random(), 2), "price_sensitivity": round(rng.random(), 2)},
+            comment_style="率直",
+            createdAt=_timestamp(n),
+            updatedAt=_timestamp(n),
+        )
+        for n in range(count)
+    ]
+
+
+def make_ideas(count: int, projects: int = 20, seed: int = 0) -> List[Idea]:
+    rng = random.Random(seed)
+    return [
+        Idea(
+            id=f"idea-bench-{n}",
+            projectId=f"project-bench-{n % projects}",
+            title=f"アイデア{n}",
+            target=rng.choice(["学生", "中小企業", "子育て世帯"]),
+            pain="日々の情報整理に時間がかかっている",
+            solution="AI が要点をまとめて次のアクションを提案する",
+            price=rng.choice([480, 980, 1980, 4980]),
+            channel="SNS",
+            onboarding="アカウント登録のみ",
+            createdAt=_timestamp(n),
+            updatedAt=_timestamp(rng.randint(0, 10 * count)),
+        )
+        for n in range(count)
+    ]
+
+
+def iter_reaction_chunks(
+    idea_ids: Sequence[str],
+    persona_ids: Sequence[str],
+    total: int,
+    chunk_size: int = 50_000,
+    seed: int = 0,
+) -> Iterator[List[Reaction]]:
+    """Yield reactions in chunks so a million rows never exist as objects at once."""
+    rng = random.Random(seed)
+    for start in range(0, total, chunk_size):
+        chunk: List[Reaction] = []
+        for n in range(start, min(total, start + chunk_size)):
+            intent = rng.random()
+            chunk.append(
+                Reaction(
+                    id=f"reaction-{n}",
+                    ideaId=idea_ids[n % len(idea_ids)],
+                    projectId="project-bench-0",
+                    personaId=persona_ids[n % len(persona_ids)],
+                    text=rng.choice(COMMENTS),
+                    likelihood=round(intent * 0.8, 3),
+                    intent_to_try=round(intent, 3),
+                    createdAt=_timestamp(n),
+                    segment=rng.choice(SEGMENTS),
+                )
+            )
+        yield chunk
+
+
+def make_insights(count: int, seed: int = 0) -> List[Dict[str, float]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "intent_to_try": rng.random(),
+            "price_acceptance": rng.random(),
+            "friction_hint": rng.random() * 0.5,
+        }
+        for _ in range(count)
+    ]
+
+
+def llm_payloads() -> Dict[str, str]:
+    """Completion texts seen in practice: clean, fenced, chatty, truncated, batched."""
+    reaction = {
+        "comment": COMMENTS[1],
+        "intent_to_try": 0.62,
+        "price_acceptance": 0.48,
+    }
+    batch = {
+        "reactions": [
+            {"personaId": f"persona-{n}", **reaction, "comment": COMMENTS[n % len(COMMENTS)]}
+            for n in range(8)
+        ]
+    }
+    clean = json.dumps(reaction, ensure_ascii=False)
+    batched = json.dumps(batch, ensure_ascii=False, indent=2)
+    return {
+        "clean": clean,
+        "fenced": f"```json\n{clean}\n```",
+        "prose": f"承知しました。以下が回答です。\n{clean}\n補足: 価格は {{要確認}} です。",
+        "truncated": clean[: len(clean) * 2 // 3],
+        "batch": batched,
+    }
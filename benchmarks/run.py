@@ -0,0 +1,92 @@
+"""
+Run the benchmark suite and write machine-readable results.
+
+    python -m benchmarks.run --scale small
+    python -m benchmarks.run --scale full --store sqlite --only store
+    python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+
+Results land in ``benchmarks/results/<commit>.json`` by default (``-dirty``
+is appended when the tree has uncommitted changes) together with the
+environment they were measured in.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def commit_label() -> str:
+    commit = _git("rev-parse", "--short", "HEAD") or "unknown"
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no"))
+    return f"{commit}-dirty" if dirty else commit
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark simulation, scoring, statkit, store and JSON paths.")
+    parser.add_argument("--scale", choices=["smoke", "small", "medium", "full"], default="small")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fixed latency of the stubbed LLM.")
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--only", nargs="*", default=[], help="Subset of: simulate score statkit store json")
+    parser.add_argument("--output", type=Path, help="Result file (default: benchmarks/results/<commit>.json).")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Path:
+    args = _parse_args(argv)
+    # The store and adapter read settings at import time, so configure first.
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["STORE_BACKEND"] = args.store
+    scratch = tempfile.TemporaryDirectory(prefix="bench-store-")
+    os.environ["STORE_PATH"] = str(Path(scratch.name) / "store.sqlite3")
+
+    import logging
+
+    import numpy as np
+
+    from benchmarks import suite
+
+    logging.disable(logging.INFO)
+    results = suite.run(args.scale, args.latency_ms / 1000, args.only)
+
+    label = commit_label()
+    report: Dict[str, Any] = {
+        "meta": {
+            "commit": label,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "scale": args.scale,
+            "llm_latency_ms": args.latency_ms,
+            "store_backend": args.store,
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": [result.to_dict() for result in results],
+    }
+    output = args.output or RESULTS_DIR / f"{label}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    scratch.cleanup()
+    print(f"wrote {output}")
+    return output
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Benchmark cases for the simulation, scoring, statkit, store and JSON hot paths.
+
+Each case loads its fixtures outside the timed region and yields one
+``Result`` per size. GPT calls are replaced with stubs that sleep for a fixed
+latency, so timings reflect orchestration cost rather than the network.
+"""
+from __future__ import annotations
+
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Sequence
+
+from app.api import routes
+from app.schemas.idea import Idea, SimulationRequest
+from app.services import gpt_adapter, simulate, statkit, store
+from app.utils.json_safety import parse_or_default
+from benchmarks import fixtures
+
+PAGE_SIZE = 50
+
+
+@dataclass(frozen=True)
+class Scale:
+    personas: Sequence[int]
+    ideas: Sequence[int]
+    reactions: Sequence[int]
+    repeat: int
+    json_calls: int
+
+
+SCALES: Dict[str, Scale] = {
+    "smoke": Scale(personas=[10], ideas=[100], reactions=[1_000], repeat=2, json_calls=200),
+    "small": Scale(personas=[10, 100], ideas=[1_000], reactions=[10_000], repeat=3, json_calls=2_000),
+    "medium": Scale(
+        personas=[10, 100, 1_000], ideas=[1_000, 10_000], reactions=[100_000], repeat=3, json_calls=10_000
+    ),
+    "full": Scale(
+        personas=[10, 100, 1_000, 10_000],
+        ideas=[1_000, 10_000, 100_000],
+        reactions=[100_000, 1_000_000],
+        repeat=3,
+        json_calls=50_000,
+    ),
+}
+
+
+@dataclass
+class Result:
+    name: str
+    params: Dict[str, Any]
+    repeat: int
+    number: int
+    min_s: float
+    median_s: float
+    mean_s: float
+    per_op_s: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.per_op_s = self.median_s / self.number
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def measure(name: str, params: Dict[str, Any], fn: Callable[[], Any], repeat: int, number: int = 1) -> Result:
+    """Run ``fn`` ``number`` times per sample and keep ``repeat`` wall-clock samples."""
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append(time.perf_counter() - start)
+    return Result(
+        name=name,
+        params=params,
+        repeat=repeat,
+        number=number,
+        min_s=min(samples),
+        median_s=statistics.median(samples),
+        mean_s=statistics.fmean(samples),
+    )
+
+
+class StubbedLLM:
+    """Swap gpt_adapter entry points for fixed-latency fakes within a ``with`` block."""
+
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+        self._originals: Dict[str, Any] = {}
+
+    def _sleep(self) -> None:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def _json(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        self._sleep()
+        return {"comment": fixtures.COMMENTS[0], "intent_to_try": 0.6, "price_acceptance": 0.5}
+
+    def _text(self, *args: Any, **kwargs: Any) -> str:
+        self._sleep()
+        return "価格次第で試したいという声が多い。"
+
+    def _react(self, idea: Idea) -> Dict[str, Any]:
+        self._sleep()
+        return {"reaction": fixtures.COMMENTS[0], "intent_to_try": 0.6, "price_acceptance": 0.5, "friction_hint": 0.1}
+
+    def __enter__(self) -> "StubbedLLM":
+        for name, fake in (("call_chat_json", self._json), ("call_chat_text", self._text), ("react", self._react)):
+            self._originals[name] = getattr(gpt_adapter, name)
+            setattr(gpt_adapter, name, fake)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        for name, original in self._originals.items():
+            setattr(gpt_adapter, name, original)
+
+
+def bench_simulate(scale: Scale, latency_s: float) -> Iterator[Result]:
+    idea = fixtures.make_ideas(1)[0]
+    for count in scale.personas:
+        store.reset_store()
+        store.upsert_ideas([idea])
+        store.upsert_personas(fixtures.make_personas(count))
+        request = SimulationRequest(ideaIds=[idea.id])
+        # Large panels at real latency take minutes; one sample is enough there.
+        repeat = scale.repeat if count <= 1_000 else 1
+        with StubbedLLM(latency_s):
+            yield measure("simulate.simulate", {"personas": count}, lambda: simulate.simulate(request), repeat)
+
+
+def bench_score_ideas(scale: Scale, latency_s: float) -> Iterator[Result]:
+    for count in scale.ideas:
+        store.reset_store()
+        ideas = fixtures.make_ideas(count)
+        store.upsert_ideas(ideas)
+        request = routes.ScoreRequest(ideaIds=[idea.id for idea in ideas[:200]])
+        with StubbedLLM(latency_s):
+            yield measure(
+                "routes.score_ideas",
+                {"ideas": count, "batch": len(request.ideaIds)},
+                lambda: routes.score_ideas(request),
+                scale.repeat,
+            )
+
+
+def bench_statkit(scale: Scale) -> Iterator[Result]:
+    for count in scale.ideas:
+        items = [
+            (f"idea-{n}", insight, "project-bench", None)
+            for n, insight in enumerate(fixtures.make_insights(count))
+        ]
+        # The per-item path is what older callers use; keep its size bounded.
+        single = items[: min(count, 10_000)]
+        yield measure(
+            "statkit.compute_score",
+            {"ideas": len(single)},
+            lambda: [statkit.compute_score(*item) for item in single],
+            scale.repeat,
+        )
+        yield measure("statkit.compute_scores", {"ideas": count}, lambda: statkit.compute_scores(items), scale.repeat)
+
+
+def bench_store(scale: Scale) -> Iterator[Result]:
+    for count in scale.ideas:
+        store.reset_store()
+        ideas = fixtures.make_ideas(count)
+        store.upsert_ideas(ideas)
+        middle = store.page_ideas(limit=count // 2 + 1).last_key
+        params = {"ideas": count}
+        yield measure("store.list_ideas.all", params, store.list_ideas, scale.repeat)
+        yield measure(
+            "store.list_ideas.page",
+            params,
+            lambda: store.page_ideas(limit=PAGE_SIZE, after=middle),
+            scale.repeat,
+            number=100,
+        )
+        yield measure(
+            "store.list_ideas.project_page",
+            params,
+            lambda: store.page_ideas(project_id="project-bench-0", limit=PAGE_SIZE),
+            scale.repeat,
+            number=100,
+        )
+
+    for count in scale.personas:
+        store.reset_store()
+        store.upsert_personas(fixtures.make_personas(count))
+        yield measure("store.list_personas", {"personas": count}, store.list_personas, scale.repeat)
+
+    for total in scale.reactions:
+        store.reset_store()
+        idea_ids = [idea.id for idea in fixtures.make_ideas(100)]
+        persona_ids = [persona.id for persona in fixtures.make_personas(100)]
+        load = 0.0
+        for chunk in fixtures.iter_reaction_chunks(idea_ids, persona_ids, total):
+            start = time.perf_counter()
+            _add_grouped(chunk)
+            load += time.perf_counter() - start
+        params = {"reactions": total}
+        yield Result("store.add_reactions", params, 1, total, load, load, load)
+        yield measure(
+            "store.list_reactions",
+            params,
+            lambda: store.list_reactions(idea_ids[0], limit=PAGE_SIZE),
+            scale.repeat,
+            number=100,
+        )
+        yield measure("store.reaction_stats", params, lambda: store.reaction_stats(idea_ids[0]), scale.repeat, 100)
+    store.reset_store()
+
+
+def _add_grouped(chunk: Sequence[Any]) -> None:
+    grouped: Dict[str, List[Any]] = {}
+    for reaction in chunk:
+        grouped.setdefault(reaction.ideaId, []).append(reaction)
+    for idea_id, reactions in grouped.items():
+        store.add_reactions(idea_id, reactions)
+
+
+def bench_json(scale: Scale) -> Iterator[Result]:
+    default = {"comment": "", "intent_to_try": 0.5, "price_acceptance": 0.5}
+    for kind, text in fixtures.llm_payloads().items():
+        yield measure(
+            "json_safety.parse_or_default",
+            {"payload": kind, "chars": len(text)},
+            lambda: parse_or_default(text, default),
+            scale.repeat,
+            number=scale.json_calls,
+        )
+
+
+def run(scale_name: str, latency_s: float, only: Sequence[str] = ()) -> List[Result]:
+    scale = SCALES[scale_name]
+    cases: Dict[str, Callable[[], Iterator[Result]]] = {
+        "simulate": lambda: bench_simulate(scale, latency_s),
+        "score": lambda: bench_score_ideas(scale, latency_s),
+        "statkit": lambda: bench_statkit(scale),
+        "store": lambda: bench_store(scale),
+        "json": lambda: bench_json(scale),
+    }
+    results: List[Result] = []
+    for case, factory in cases.items():
+        if only and case not in only:
+            continue
+        for result in factory():
+            print(f"{result.name:<34} {_format_params(result.params):<32} {result.per_op_s * 1000:>10.3f} ms/op")
+            results.append(result)
+    return results
+
+
+def _format_params(params: Dict[str, Any]) -> str:
+    return " ".join(f"{key}={value}" for key, value in params.items())
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from benchmarks import compare, suite
+
+
+def test_smoke_benchmarks_produce_comparable_results(tmp_path: Path) -> None:
+    results = suite.run("smoke", latency_s=0.0, only=["statkit", "json"])
+    names = {result.name for result in results}
+    assert {"statkit.compute_scores", "json_safety.parse_or_default"} <= names
+    assert all(result.per_op_s > 0 for result in results)
+
+    baseline = tmp_path / "baseline.json"
+    candidate = tmp_path / "candidate.json"
+    baseline.write_text(json.dumps({"meta": {}, "results": [r.to_dict() for r in results]}))
+    slower = [dict(r.to_dict(), per_op_s=r.per_op_s * 2) for r in results]
+    candidate.write_text(json.dumps({"meta": {}, "results": slower}))
+
+    rows = compare.compare(baseline, candidate)
+    assert len(rows) == len(results)
+    assert all(abs(ratio - 2.0) < 1e-9 for *_, ratio in rows)
+    assert compare.main([str(baseline), str(baseline)]) == 0
+    assert compare.main([str(baseline), str(candidate), "--threshold", "1.5"]) == 1
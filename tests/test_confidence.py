@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from app.services import confidence
+
+
+def test_normal_ci_matches_population_formula() -> None:
+    values = [0.2, 0.4, 0.9, 0.5]
+    mu = sum(values) / len(values)
+    sd = math.sqrt(sum((v - mu) ** 2 for v in values) / len(values))
+    low, high = confidence.normal_ci(values)
+    assert math.isclose(low, mu - 1.96 * sd / 2)
+    assert math.isclose(high, mu + 1.96 * sd / 2)
+
+
+def test_wilson_ci_stays_inside_unit_interval_for_extreme_panels() -> None:
+    low, high = confidence.wilson_ci([1.0, 1.0, 1.0])
+    assert 0.0 < low < 1.0
+    assert high == 1.0
+
+
+def test_bootstrap_handles_many_ideas_with_missing_reactions() -> None:
+    rng = np.random.default_rng(3)
+    intents = rng.uniform(0.3, 0.7, size=(4, 200))
+    prices = rng.uniform(0.1, 0.5, size=(4, 200))
+    intents[1, 50:] = np.nan
+    prices[1, 50:] = np.nan
+    intents[3, :] = np.nan
+    prices[3, :] = np.nan
+
+    (psf_low, psf_high), (pmf_low, pmf_high) = confidence.psf_pmf_ci(
+        intents, prices, method="bootstrap", resamples=2000, rng=rng
+    )
+
+    means = np.nanmean(intents[:3], axis=1)
+    assert np.all((psf_low[:3] < means) & (means < psf_high[:3]))
+    assert (psf_high[1] - psf_low[1]) > (psf_high[0] - psf_low[0])
+    assert psf_low[3] == psf_high[3] == pmf_low[3] == 0.0
+    normal_low, normal_high = confidence.normal_ci(prices[0])
+    assert abs(pmf_low[0] - normal_low) < 0.01 and abs(pmf_high[0] - normal_high) < 0.01
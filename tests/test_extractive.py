@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from app.data.seed import seed
+from app.schemas.idea import SimulationRequest
+from app.services import extractive, gpt_adapter, simulate, store
+
+COMMENTS = [
+    "価格が高いので迷う。でも一度は使ってみたい。",
+    "価格がもう少し安ければ試したい。",
+    "価格が高いので迷う。",
+    "操作が簡単そうで良い！",
+    "サポート体制が気になる。",
+] * 40
+
+
+def test_summary_is_central_non_redundant_and_bounded() -> None:
+    summary = extractive.summarize(COMMENTS, max_chars=60)
+    assert 0 < len(summary) <= 60
+    assert "価格が高いので迷う。" in summary
+    picked = extractive.split_sentences([summary])
+    assert len(picked) == len(set(picked)) <= extractive.MAX_SENTENCES
+    assert extractive.summarize([]) == ""
+    assert extractive.summarize(["あ" * 300], max_chars=20) == "あ" * 19 + "…"
+
+
+def test_extractive_mode_skips_the_model_and_failures_fall_back_to_it() -> None:
+    store.reset_store()
+    seed()
+    gpt_adapter._cache.clear()
+    original_json = gpt_adapter.call_chat_json
+    original_completion = gpt_adapter._chat_completion
+    summary_calls: List[str] = []
+
+    def _fake_json(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return {"comment": "価格が高いので迷う。操作は簡単そう。", "intent_to_try": 0.5, "price_acceptance": 0.5}
+
+    def _failing_completion(*args: Any, **kwargs: Any) -> str:
+        summary_calls.append(kwargs["call_type"])
+        raise RuntimeError("provider down")
+
+    original_summarize = extractive.summarize
+    local_calls: List[int] = []
+
+    def _counting_summarize(*args: Any, **kwargs: Any) -> str:
+        local_calls.append(1)
+        return original_summarize(*args, **kwargs)
+
+    gpt_adapter.call_chat_json = _fake_json  # type: ignore[assignment]
+    gpt_adapter._chat_completion = _failing_completion  # type: ignore[assignment]
+    try:
+        request = SimulationRequest(ideaIds=["idea-video-concierge"], summaryMode="extractive")
+        local = simulate.simulate(request)[0]
+        assert summary_calls == []
+        assert local.summaryComment == "価格が高いので迷う。操作は簡単そう。"
+
+        fallback = simulate.simulate(SimulationRequest(ideaIds=["idea-video-concierge"]))[0]
+        assert summary_calls == ["summary"]
+        assert fallback.summaryComment == local.summaryComment
+
+        # The stand-in was not cached, and is not even built once the model answers.
+        gpt_adapter._chat_completion = lambda *a, **k: "モデルの要約"  # type: ignore[assignment]
+        extractive.summarize = _counting_summarize  # type: ignore[assignment]
+        recovered = simulate.simulate(SimulationRequest(ideaIds=["idea-video-concierge"]))[0]
+        assert recovered.summaryComment == "モデルの要約"
+        assert local_calls == []
+    finally:
+        gpt_adapter.call_chat_json = original_json  # type: ignore[assignment]
+        gpt_adapter._chat_completion = original_completion  # type: ignore[assignment]
+        extractive.summarize = original_summarize  # type: ignore[assignment]
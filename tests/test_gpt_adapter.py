@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+from tenacity import RetryError, wait_none
+
+from app.services import gpt_adapter
+from app.utils.concurrency import bounded_map
+
+
+def test_concurrent_identical_calls_share_one_completion() -> None:
+    original = gpt_adapter._chat_completion
+    calls: List[str] = []
+    calls_lock = threading.Lock()
+
+    def _slow_completion(**kwargs: Any) -> str:
+        with calls_lock:
+            calls.append(kwargs["user"])
+        time.sleep(0.05)
+        return '{"comment": "共有", "intent_to_try": 0.7, "price_acceptance": 0.3}'
+
+    gpt_adapter._chat_completion = _slow_completion  # type: ignore[assignment]
+    before = gpt_adapter.singleflight_stats()
+    key = ("persona-reaction", "idea-singleflight", str(time.time()), "persona-1")
+    try:
+        payloads = bounded_map(
+            lambda _: gpt_adapter.call_chat_json(
+                system="s", user="u", fallback={"comment": ""}, cache_key=key
+            ),
+            range(6),
+            max_workers=6,
+        )
+    finally:
+        gpt_adapter._chat_completion = original  # type: ignore[assignment]
+
+    assert len(calls) == 1
+    assert all(payload["comment"] == "共有" for payload in payloads)
+    after = gpt_adapter.singleflight_stats()
+    assert after["leaders"] - before["leaders"] >= 1
+    assert after["inflight"] == 0
+
+
+def test_rate_limiter_queues_until_budget_refills() -> None:
+    from app.services.rate_limiter import RateLimiter, RateLimitTimeout
+
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=6000, max_wait_seconds=1.0)
+    first = limiter.acquire(6000)
+    started = time.monotonic()
+    limiter.settle(first, actual_tokens=5990)
+    limiter.acquire(20)  # refund covers 10 tokens, the rest refills within ~0.1s
+    assert time.monotonic() - started < 0.5
+
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(6000, timeout=0.05)
+
+
+def test_failed_calls_refund_their_reservation_and_local_timeouts_are_not_cached() -> None:
+    from app.services.rate_limiter import RateLimiter
+
+    class _DownClient:
+        def __init__(self) -> None:
+            self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+        def _create(self, **_: Any) -> Any:
+            raise ConnectionError("boom")
+
+    original_client, original_limiter = gpt_adapter.client, gpt_adapter._limiter
+    gpt_adapter.client = _DownClient()  # type: ignore[assignment]
+    gpt_adapter._limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=6000, max_wait_seconds=0.05)
+    try:
+        completion = gpt_adapter._chat_completion.retry_with(wait=wait_none())
+        with pytest.raises(RetryError):
+            completion(system="s", user="u", temperature=0.0, max_tokens=4000)
+        # Three failed attempts reserved 4000+ tokens each; all of it was refunded.
+        assert gpt_adapter._limiter.tokens.tokens > 5990
+
+        gpt_adapter._limiter.tokens.take(6000)
+        key = ("persona-reaction", "idea-timeout", str(time.time()), "persona-1")
+        payload = gpt_adapter.call_chat_json(system="s", user="u", fallback={"comment": "fb"}, cache_key=key)
+        assert payload["comment"] == "fb"
+        assert gpt_adapter.get_cached(key) is None
+    finally:
+        gpt_adapter.client = original_client  # type: ignore[assignment]
+        gpt_adapter._limiter = original_limiter
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict
+
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.data.seed import seed
+from app.main import create_app
+from app.services import gpt_adapter, store
+
+
+def _client() -> TestClient:
+    store.reset_store()
+    seed()
+    return TestClient(create_app())
+
+
+def _wait_for(client: TestClient, job_id: str, statuses: set[str]) -> Dict[str, Any]:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = client.get(f"/simulate/jobs/{job_id}").json()
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {statuses}")
+
+
+def test_job_submit_poll_and_result() -> None:
+    client = _client()
+    original_json = gpt_adapter.call_chat_json
+    original_text = gpt_adapter.call_chat_text
+    gpt_adapter.call_chat_json = lambda *a, **k: {  # type: ignore[assignment]
+        "comment": "ジョブ",
+        "intent_to_try": 0.6,
+        "price_acceptance": 0.5,
+    }
+    gpt_adapter.call_chat_text = lambda *a, **k: "ジョブ要約"  # type: ignore[assignment]
+    settings = get_settings()
+    original_concurrency = settings.simulation_concurrency
+    try:
+        submitted = client.post("/simulate/jobs", json={"ideaIds": ["idea-video-concierge"]})
+        assert submitted.status_code == 202
+        job = _wait_for(client, submitted.json()["id"], {"succeeded", "failed"})
+        assert job["status"] == "succeeded"
+        assert job["completed"] == job["total"] == len(store.list_personas())
+
+        result = client.get(f"/simulate/jobs/{job['id']}/result")
+        assert result.status_code == 200
+        assert result.json()[0]["summaryComment"] == "ジョブ要約"
+        assert client.get("/simulate/jobs/job-missing").status_code == 404
+
+        # Identical answers settle at minPersonas; the job reports what it aggregated.
+        settings.simulation_concurrency = 1
+        sampled = client.post(
+            "/simulate/jobs",
+            json={"ideaIds": ["idea-video-concierge"], "sampling": {"minPersonas": 2, "seed": 1}},
+        )
+        job = _wait_for(client, sampled.json()["id"], {"succeeded", "failed"})
+        assert job["status"] == "succeeded"
+        assert job["completed"] == job["total"] == 2
+    finally:
+        gpt_adapter.call_chat_json = original_json  # type: ignore[assignment]
+        gpt_adapter.call_chat_text = original_text  # type: ignore[assignment]
+        settings.simulation_concurrency = original_concurrency
+
+
+def test_job_cancellation_stops_running_job() -> None:
+    client = _client()
+    gate = threading.Event()
+    original_json = gpt_adapter.call_chat_json
+
+    def _blocked(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        gate.wait(timeout=5)
+        return {"comment": "遅延", "intent_to_try": 0.5, "price_acceptance": 0.5}
+
+    gpt_adapter.call_chat_json = _blocked  # type: ignore[assignment]
+    try:
+        job_id = client.post("/simulate/jobs", json={"ideaIds": ["idea-video-concierge"]}).json()["id"]
+        _wait_for(client, job_id, {"running"})
+        assert client.post(f"/simulate/jobs/{job_id}/cancel").status_code == 200
+        gate.set()
+        job = _wait_for(client, job_id, {"cancelled", "succeeded", "failed"})
+        assert job["status"] == "cancelled"
+        assert client.get(f"/simulate/jobs/{job_id}/result").status_code == 409
+
+        # A cancel handled by another worker only reaches this one through the store.
+        gate.clear()
+        other_id = client.post("/simulate/jobs", json={"ideaIds": ["idea-video-concierge"]}).json()["id"]
+        assert other_id != job_id
+        _wait_for(client, other_id, {"running"})
+        store.request_job_cancel(other_id)
+        gate.set()
+        assert _wait_for(client, other_id, {"cancelled", "succeeded", "failed"})["status"] == "cancelled"
+    finally:
+        gate.set()
+        gpt_adapter.call_chat_json = original_json  # type: ignore[assignment]
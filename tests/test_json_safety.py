@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pytest
+
+from app.utils.json_safety import (
+    IncrementalFields,
+    extract_json_like,
+    extract_json_objects,
+    parse_all,
+    parse_or_default,
+)
+
+DEFAULT = {"fallback": True}
+
+
+def test_scanner_returns_each_top_level_object() -> None:
+    text = 'まず {"a": 1} 次に {"b": {"c": "}{"}} 以上です。補足 {注意}'
+    assert extract_json_objects(text) == ['{"a": 1}', '{"b": {"c": "}{"}}', "{注意}"]
+    assert parse_all(text) == [{"a": 1}, {"b": {"c": "}{"}}]
+    assert extract_json_like(text) == '{"a": 1}'
+    with pytest.raises(ValueError):
+        extract_json_like("no json here")
+
+
+def test_parse_skips_prose_braces_and_code_fences() -> None:
+    fenced = 'Here is the {answer}:\n```json\n{"comment": "it\'s \\"fine\\" {ok}", "intent_to_try": 0.6}\n```\nThanks {user}!'
+    assert parse_or_default(fenced, DEFAULT) == {"comment": 'it\'s "fine" {ok}', "intent_to_try": 0.6}
+    assert parse_or_default("", DEFAULT) == DEFAULT
+    assert parse_or_default("[1, 2]", DEFAULT) == DEFAULT
+
+
+@pytest.mark.parametrize(
+    ("truncated", "expected"),
+    [
+        ('{"comment": "途中で切れ', {"comment": "途中で切れ"}),
+        ('{"comment": "ok", "intent_to_try": 0.6', {"comment": "ok", "intent_to_try": 0.6}),
+        ('{"comment": "ok", "intent_to_try": 0.6,', {"comment": "ok", "intent_to_try": 0.6}),
+        ('{"comment": "ok", "intent_to', {"comment": "ok"}),
+        ('{"comment": "ok", "price_acceptance": 0.', {"comment": "ok"}),
+        (
+            '{"reactions": [{"personaId": "p1", "comment": "a"}, {"personaId": "p2", "comm',
+            {"reactions": [{"personaId": "p1", "comment": "a"}, {"personaId": "p2"}]},
+        ),
+        ('{"comment": "末尾\\', {"comment": "末尾"}),
+    ],
+)
+def test_truncated_output_is_repaired(truncated: str, expected: dict) -> None:
+    assert parse_or_default(truncated, DEFAULT) == expected
+
+
+def test_incremental_fields_complete_before_the_object_ends() -> None:
+    text = '```json\n{"intent_to_try": 0.62, "nested": {"a": "}"}, "comment": "とても\\"良い\\"と思う", "x": null}'
+    parsed = IncrementalFields()
+    seen = []
+    for index in range(0, len(text), 3):
+        parsed.feed(text[index : index + 3])
+        seen.append((dict(parsed.fields), parsed.text_length("comment")))
+
+    first_intent = next(i for i, (fields, _) in enumerate(seen) if "intent_to_try" in fields)
+    first_comment = next(i for i, (fields, _) in enumerate(seen) if "comment" in fields)
+    assert first_intent < first_comment
+    assert any(0 < length and "comment" not in fields for fields, length in seen)
+    assert parsed.closed
+    assert parsed.fields == {"intent_to_try": 0.62, "nested": {"a": "}"}, "comment": 'とても"良い"と思う', "x": None}
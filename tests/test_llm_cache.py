@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from app.services.llm_cache import MemoryCache, SQLiteCache
+
+
+def test_sqlite_cache_survives_reopen_and_warms_front(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite3"
+    cache = SQLiteCache(path, max_entries=10)
+    cache.set(("persona-reaction", "idea-1", "t0", "persona-1"), {"comment": "良い"})
+
+    reopened = SQLiteCache(path, max_entries=10)
+    assert len(reopened._front) == 1
+    assert reopened.get(("persona-reaction", "idea-1", "t0", "persona-1")) == {"comment": "良い"}
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = SQLiteCache(tmp_path / "cache.sqlite3", max_entries=2, front_size=1)
+    cache.set(("a",), {"text": "a"})
+    cache.set(("b",), {"text": "b"})
+    assert cache.get(("a",)) is not None
+    cache.set(("c",), {"text": "c"})
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == {"text": "a"}
+    assert cache.get(("c",)) == {"text": "c"}
+
+
+def test_sqlite_cache_tracks_its_size_without_counting_rows(tmp_path: Path) -> None:
+    cache = SQLiteCache(tmp_path / "cache.sqlite3", max_entries=3, front_size=1)
+    statements: list = []
+    cache._conn.set_trace_callback(statements.append)
+    for index in range(6):
+        cache.set((f"k{index}",), {"text": str(index)})
+    cache.set(("k5",), {"text": "replaced"})  # overwriting does not grow the table
+
+    assert not any("COUNT(*)" in statement for statement in statements)
+    assert cache._rows == cache._count() == 3
+    assert cache.get(("k2",)) is None and cache.get(("k5",)) == {"text": "replaced"}
+
+
+def test_caches_expire_entries_after_ttl(tmp_path: Path) -> None:
+    for cache in (MemoryCache(5, ttl_seconds=0.01), SQLiteCache(tmp_path / "c.db", 5, 0.01)):
+        cache.set(("k",), {"text": "v"})
+        time.sleep(0.02)
+        assert cache.get(("k",)) is None
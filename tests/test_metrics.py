@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+from typing import Any, List
+
+from fastapi.testclient import TestClient
+from tenacity import wait_none
+
+from app.core import metrics
+from app.main import create_app
+from app.services import gpt_adapter
+
+
+class _FlakyClient:
+    """Fails the first call, then answers with the queued contents."""
+
+    def __init__(self, contents: List[str]) -> None:
+        self.contents = contents
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **_: Any) -> Any:
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("boom")
+        message = SimpleNamespace(content=self.contents.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = metrics.Registry()
+    counter = registry.counter("demo_total", "Demo counter.", ("kind",))
+    histogram = registry.histogram("demo_seconds", "Demo latency.", buckets=(0.1, 1.0))
+    counter.inc(kind='a"b')
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+
+    text = registry.render()
+    assert '# TYPE demo_total counter\ndemo_total{kind="a\\"b"} 1.0' in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_seconds_count 3" in text
+
+
+def test_adapter_records_retries_latency_fallbacks_and_cache() -> None:
+    original = gpt_adapter.client
+    fake = _FlakyClient(['{"reaction": "ok", "intent_to_try": 0.4}', "not json", '{"reaction": "retried"}'])
+    gpt_adapter.client = fake  # type: ignore[assignment]
+    metrics.REGISTRY.reset()
+    try:
+        completion = gpt_adapter._chat_completion.retry_with(wait=wait_none())
+        content = completion(system="s", user="u", temperature=0.0, max_tokens=10, call_type="react")
+        assert "ok" in content
+        assert metrics.GPT_RETRIES.value(call_type="react") == 1
+        assert metrics.GPT_CALL_SECONDS.count(call_type="react", outcome="error") == 1
+        assert metrics.GPT_CALL_SECONDS.count(call_type="react", outcome="ok") == 1
+
+        key = ("metrics-test", str(time.time()))
+        fallback = {"reaction": "fallback", "intent_to_try": 0.5, "price_acceptance": 0.5}
+        payload = gpt_adapter.call_chat_json(
+            system="s", user="u", fallback=fallback, cache_key=key, call_type="summary"
+        )
+        assert payload["reaction"] == "fallback"
+        assert metrics.GPT_FALLBACKS.value(call_type="summary", reason="unparseable") == 1
+        # The fallback was not cached, so the next call reaches the model again.
+        payload = gpt_adapter.call_chat_json(system="s", user="u", fallback=fallback, cache_key=key)
+        assert payload["reaction"] == "retried"
+        assert metrics.LLM_CACHE_REQUESTS.value(result="miss") == 2
+        gpt_adapter.call_chat_json(system="s", user="u", fallback=fallback, cache_key=key)
+        assert metrics.LLM_CACHE_REQUESTS.value(result="hit") == 1
+        assert fake.calls == 4
+    finally:
+        gpt_adapter.client = original  # type: ignore[assignment]
+
+
+def test_metrics_endpoint_reports_route_latency() -> None:
+    client = TestClient(create_app())
+    assert client.get("/health").status_code == 200
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+    assert "# TYPE gpt_call_duration_seconds histogram" in response.text
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+import uvicorn
+from openai import NotFoundError, OpenAI, RateLimitError
+
+from app.core import metrics
+from app.devtools.openai_stub import StubConfig, create_app
+from app.services import gpt_adapter, simulate, store, usage
+
+
+@contextmanager
+def _serve(config: StubConfig) -> Iterator[str]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}/v1"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+def _client(base_url: str) -> OpenAI:
+    return OpenAI(api_key="stub", base_url=base_url, max_retries=0)
+
+
+def test_adapter_runs_against_synthetic_stub() -> None:
+    original = gpt_adapter.client
+    with _serve(StubConfig(seed=1)) as base_url:
+        gpt_adapter.client = _client(base_url)
+        try:
+            first = gpt_adapter.call_chat_document(system="sys", user='{"comment": "x", "intent_to_try": 0.0}')
+            second = gpt_adapter.call_chat_document(system="sys", user='{"comment": "x", "intent_to_try": 0.0}')
+        finally:
+            gpt_adapter.client = original
+
+    assert first == second
+    assert set(first) == {"comment", "intent_to_try"}
+    assert 0.0 <= first["intent_to_try"] <= 1.0
+
+
+def test_stub_injects_rate_limits() -> None:
+    with _serve(StubConfig(rate_limit_rate=1.0)) as base_url:
+        with pytest.raises(RateLimitError):
+            _client(base_url).chat.completions.create(
+                model="stub", messages=[{"role": "user", "content": "hi"}]
+            )
+
+
+def test_record_then_replay(tmp_path: Path) -> None:
+    cassette = tmp_path / "cassette.jsonl"
+    messages = [{"role": "user", "content": "要約してください"}]
+    with _serve(StubConfig(seed=7)) as upstream:
+        with _serve(StubConfig(mode="record", cassette_path=str(cassette), upstream_base_url=upstream)) as recorder:
+            recorded = _client(recorder).chat.completions.create(model="stub", messages=messages)
+
+    with _serve(StubConfig(mode="replay", cassette_path=str(cassette))) as replayer:
+        client = _client(replayer)
+        replayed = client.chat.completions.create(model="stub", messages=messages)
+        assert replayed.choices[0].message.content == recorded.choices[0].message.content
+        with pytest.raises(NotFoundError):
+            client.chat.completions.create(model="stub", messages=[{"role": "user", "content": "未録音"}])
+
+
+def test_streamed_json_stops_once_scores_and_enough_comment_arrived() -> None:
+    store.reset_store()
+    metrics.GPT_CALL_SECONDS.reset()
+    original = gpt_adapter.client
+    prompt = "ペルソナとして回答してください。" + simulate.PERSONA_PROMPT_FORMAT_SCORES_FIRST
+    fallback = {"comment": "fallback", "intent_to_try": 0.5, "price_acceptance": 0.5}
+    with _serve(StubConfig(seed=3, stream_chunk_chars=2)) as base_url:
+        gpt_adapter.client = _client(base_url)
+        try:
+            full = gpt_adapter.call_chat_json(
+                system="sys",
+                user=prompt,
+                fallback=fallback,
+                call_type="persona_reaction",
+                early_stop=gpt_adapter.EarlyStop(
+                    required=("intent_to_try", "price_acceptance"), text_field="comment", max_text_chars=500
+                ),
+            )
+            with usage.attribute(project_id="projectA"):
+                streamed = gpt_adapter.call_chat_json(
+                    system="sys",
+                    user=prompt,
+                    fallback=fallback,
+                    call_type="persona_reaction",
+                    early_stop=gpt_adapter.EarlyStop(
+                        required=("intent_to_try", "price_acceptance"), text_field="comment", max_text_chars=3
+                    ),
+                )
+        finally:
+            gpt_adapter.client = original
+
+    assert list(full)[:2] == ["intent_to_try", "price_acceptance"] and len(full["comment"]) > 4
+    assert streamed["intent_to_try"] == full["intent_to_try"]
+    assert streamed["price_acceptance"] == full["price_acceptance"]
+    assert 3 <= len(streamed["comment"]) < len(full["comment"])
+    assert full["comment"].startswith(streamed["comment"])
+    assert metrics.GPT_CALL_SECONDS.count(call_type="persona_reaction", outcome="ok") == 1
+    assert metrics.GPT_CALL_SECONDS.count(call_type="persona_reaction", outcome="early_stop") == 1
+    # The cut-off stream has no usage chunk, so the estimate is billed instead.
+    assert store.project_tokens("projectA") > 0
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from app.schemas.persona import Persona
+from app.services import simulate
+from app.services.prompt_fragments import FragmentCache, RenderedText, join
+from app.services.rate_limiter import estimate_tokens
+
+
+def test_fragments_rerender_only_when_the_version_changes() -> None:
+    cache = FragmentCache()
+    renders = []
+
+    def render(text: str):
+        return lambda: renders.append(text) or text
+
+    first = cache.get("idea-text", "idea-1", "v1", render("旧テキスト"))
+    again = cache.get("idea-text", "idea-1", "v1", render("unused"))
+    updated = cache.get("idea-text", "idea-1", "v2", render("新テキスト"))
+
+    assert first is again
+    assert updated == "新テキスト"
+    assert renders == ["旧テキスト", "新テキスト"]
+    assert cache.stats() == {"hits": 1, "renders": 2, "entries": 1}
+
+
+def test_joined_prompts_carry_an_exact_token_estimate() -> None:
+    persona = Persona(
+        id="persona-frag",
+        name="学生A",
+        category="学生",
+        traits={"novelty": 0.8},
+        createdAt="2024-01-01",
+        updatedAt="2024-01-01",
+    )
+    prompt = simulate.build_prompt(RenderedText("タイトル: test idea"), persona)
+    batch = simulate.build_batch_prompt("タイトル: test idea", [persona, persona])
+
+    assert isinstance(prompt, RenderedText)
+    assert estimate_tokens(prompt) == estimate_tokens(str(prompt))
+    assert estimate_tokens(batch, completion_tokens=10) == estimate_tokens(str(batch), completion_tokens=10)
+    assert prompt.startswith("あなたは 学生 です。") and "タイトル: test idea" in prompt
+    assert join("abcd", RenderedText("日本")).token_weight == 3.0
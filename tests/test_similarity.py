@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from app.core.config import get_settings
+from app.data.seed import seed
+from app.schemas.idea import IdeaCreate, SimulationRequest
+from app.services import gpt_adapter, similarity, simulate, store
+
+
+def _reset() -> None:
+    store.reset_store()
+    seed()
+    similarity.index.clear()
+    gpt_adapter._cache.clear()
+
+
+def test_index_matches_edited_copies_but_not_reprices_or_other_ideas() -> None:
+    _reset()
+    original = store.get_idea("idea-video-concierge")
+    assert original is not None
+    for idea in store.list_ideas():
+        similarity.index.add(idea)
+
+    widened = original.model_copy(update={"id": "copy-1", "title": "ＡＩ動画編集コンシェルジュ"})
+    assert similarity.normalize(widened.title) == similarity.normalize(original.title)
+    match = similarity.index.nearest(widened, threshold=0.95)
+    assert match is not None and match.idea_id == original.id and match.similarity > 0.99
+
+    edited = original.model_copy(update={"id": "copy-2", "pain": "動画編集の手戻りが多くて締切に追われている。"})
+    match = similarity.index.nearest(edited, threshold=0.95)
+    assert match is not None and match.idea_id == original.id
+
+    repriced = original.model_copy(update={"id": "copy-3", "price": original.price + 1000})
+    assert similarity.index.nearest(repriced, threshold=0.5) is None
+    assert similarity.index.nearest(original, threshold=0.5) is None  # never matches itself
+
+    similarity.index.remove(original.id)
+    assert similarity.index.nearest(widened, threshold=0.95) is None
+
+
+def test_simulating_a_cloned_idea_reuses_cached_reactions() -> None:
+    _reset()
+    original_json = gpt_adapter.call_chat_json
+    original_text = gpt_adapter.call_chat_text
+    calls: List[str] = []
+
+    def _fake_json(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        # Honour the cache like the real call_chat_json does.
+        cached = gpt_adapter.get_cached(kwargs["cache_key"])
+        if cached is not None:
+            return cached
+        calls.append(kwargs["cache_key"][-1])
+        payload = {"comment": "良さそう", "intent_to_try": 0.7, "price_acceptance": 0.4}
+        gpt_adapter.put_cached(kwargs["cache_key"], payload)
+        return payload
+
+    source = store.get_idea("idea-video-concierge")
+    assert source is not None
+    clone = store.create_idea(
+        IdeaCreate(
+            **source.model_dump(include=set(IdeaCreate.model_fields) - {"projectId"}),
+            projectId="projectB",
+        )
+    )
+    sampled_clone = store.create_idea(
+        IdeaCreate(
+            **source.model_dump(include=set(IdeaCreate.model_fields) - {"projectId"}),
+            projectId="projectB",
+        )
+    )
+    settings = get_settings()
+    original_threshold = settings.duplicate_similarity_threshold
+    gpt_adapter.call_chat_json = _fake_json  # type: ignore[assignment]
+    gpt_adapter.call_chat_text = lambda *a, **k: "要約"  # type: ignore[assignment]
+    try:
+        disabled = simulate.simulate(SimulationRequest(ideaIds=[source.id]))[0]
+        assert disabled.reusedFrom is None and similarity.index.nearest(clone, 0.95) is None
+        gpt_adapter._cache.clear()
+        calls.clear()
+
+        settings.duplicate_similarity_threshold = 0.95
+        first = simulate.simulate(SimulationRequest(ideaIds=[source.id]))[0]
+        paid = len(calls)
+        second = simulate.simulate(SimulationRequest(ideaIds=[clone.id]))[0]
+        sampled = simulate.simulate(
+            SimulationRequest(ideaIds=[sampled_clone.id], sampling={"maxPersonas": 2, "seed": 1})
+        )[0]
+    finally:
+        gpt_adapter.call_chat_json = original_json  # type: ignore[assignment]
+        gpt_adapter.call_chat_text = original_text  # type: ignore[assignment]
+        settings.duplicate_similarity_threshold = original_threshold
+
+    assert first.reusedFrom is None
+    assert paid == len(store.list_personas())
+    assert len(calls) == paid
+    assert second.reusedFrom == source.id
+    assert second.reusedReactions == second.personasUsed == paid
+    assert second.psf == first.psf and second.pmf == first.pmf
+    # Only the reactions the sample actually consumed are reported as reused.
+    assert sampled.reusedFrom in {source.id, clone.id}
+    assert sampled.reusedReactions == sampled.personasUsed == 2
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from app.core.config import get_settings
+from app.data.seed import seed
+from app.schemas.idea import SamplingOptions, SimulationRequest
+from app.schemas.persona import Persona
+from app.services import gpt_adapter, sampling, simulate, store
+
+
+def _reset() -> None:
+    store.reset_store()
+    seed()
+
+
+def test_concurrent_fan_out_preserves_persona_order() -> None:
+    _reset()
+    original_json = gpt_adapter.call_chat_json
+    original_text = gpt_adapter.call_chat_text
+
+    def _slow_call_chat_json(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        time.sleep(random.uniform(0.0, 0.01))
+        persona_id = kwargs["cache_key"][-1]
+        return {"comment": persona_id, "intent_to_try": 0.6, "price_acceptance": 0.4}
+
+    gpt_adapter.call_chat_json = _slow_call_chat_json  # type: ignore[assignment]
+    gpt_adapter.call_chat_text = lambda *a, **k: "要約"  # type: ignore[assignment]
+    try:
+        results = simulate.simulate(SimulationRequest(ideaIds=["idea-video-concierge"]))
+        expected = [persona.id for persona in store.list_personas()]
+        assert [reaction.personaId for reaction in results[0].personaReactions] == expected
+        assert [reaction.comment for reaction in results[0].personaReactions] == expected
+        assert results[0].personasUsed == len(expected)
+    finally:
+        gpt_adapter.call_chat_json = original_json  # type: ignore[assignment]
+        gpt_adapter.call_chat_text = original_text  # type: ignore[assignment]
+
+
+def test_batched_mode_parses_partial_batches_and_retries_dropped_personas() -> None:
+    _reset()
+    gpt_adapter._cache.clear()
+    settings = get_settings()
+    original_batch_size = settings.simulation_batch_size
+    original_document = gpt_adapter.call_chat_document
+    original_json = gpt_adapter.call_chat_json
+    original_text = gpt_adapter.call_chat_text
+    personas = store.list_personas()
+    individual_calls: List[str] = []
+
+    def _fake_document(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        # Answer for every other persona, plus one the prompt never mentioned.
+        entries = [
+            {"personaId": persona.id, "comment": "まとめて回答", "intent_to_try": 0.9, "price_acceptance": 0.2}
+            for persona in personas[::2]
+            if persona.id in kwargs["user"]
+        ]
+        entries.append({"personaId": "persona-ghost", "comment": "x", "intent_to_try": 1, "price_acceptance": 1})
+        return {"reactions": entries}
+
+    def _fake_json(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        individual_calls.append(kwargs["cache_key"][-1])
+        return {"comment": "個別回答", "intent_to_try": 0.1, "price_acceptance": 0.8}
+
+    settings.simulation_batch_size = 3
+    gpt_adapter.call_chat_document = _fake_document  # type: ignore[assignment]
+    gpt_adapter.call_chat_json = _fake_json  # type: ignore[assignment]
+    gpt_adapter.call_chat_text = lambda *a, **k: "要約"  # type: ignore[assignment]
+    try:
+        idea = store.get_idea("idea-video-concierge")
+        assert idea is not None
+        result = simulate.simulate(SimulationRequest(ideaIds=[idea.id]))[0]
+    finally:
+        settings.simulation_batch_size = original_batch_size
+        gpt_adapter.call_chat_document = original_document  # type: ignore[assignment]
+        gpt_adapter.call_chat_json = original_json  # type: ignore[assignment]
+        gpt_adapter.call_chat_text = original_text  # type: ignore[assignment]
+
+    assert [reaction.personaId for reaction in result.personaReactions] == [p.id for p in personas]
+    assert sorted(individual_calls) == sorted(p.id for p in personas[1::2])
+    for persona in personas[::2]:
+        cached = gpt_adapter.get_cached(("persona-reaction", idea.id, idea.updatedAt, persona.id))
+        assert cached is not None and cached["comment"] == "まとめて回答"
+
+
+def _large_panel(count: int) -> List[Persona]:
+    categories = ["大企業決裁者", "VC", "学生", "主婦"]
+    return [
+        Persona(
+            id=f"persona-panel-{n}",
+            name=f"パネル{n}",
+            category=categories[n % len(categories)] if n < count // 2 else "学生",
+            createdAt="2024-01-01T00:00:00+00:00",
+            updatedAt="2024-01-01T00:00:00+00:00",
+        )
+        for n in range(count)
+    ]
+
+
+def test_stratified_order_keeps_category_shares_in_every_prefix() -> None:
+    panel = _large_panel(200)
+    order = sampling.sampling_order(panel, stratify=True, seed=7)
+    assert sorted(p.id for p in order) == sorted(p.id for p in panel)
+    shares = Counter(p.category for p in panel)
+    for size in (20, 50, 100):
+        prefix = Counter(p.category for p in order[:size])
+        for category, total in shares.items():
+            assert abs(prefix[category] - size * total / len(panel)) <= 1
+    assert sampling.sampling_order(panel, seed=7) == order
+
+
+def test_adaptive_sampling_stops_once_precise() -> None:
+    _reset()
+    gpt_adapter._cache.clear()
+    store.upsert_personas(_large_panel(200))
+    panel_size = len(store.list_personas())
+    original_json = gpt_adapter.call_chat_json
+    original_text = gpt_adapter.call_chat_text
+    calls: List[str] = []
+    rng = random.Random(3)
+
+    def _fake_json(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        calls.append(kwargs["cache_key"][-1])
+        return {"comment": "ok", "intent_to_try": rng.uniform(0.5, 0.7), "price_acceptance": rng.uniform(0.3, 0.5)}
+
+    gpt_adapter.call_chat_json = _fake_json  # type: ignore[assignment]
+    gpt_adapter.call_chat_text = lambda *a, **k: "要約"  # type: ignore[assignment]
+    try:
+        options = SamplingOptions(precision=3.0, minPersonas=10, seed=1)
+        result = simulate.simulate(SimulationRequest(ideaIds=["idea-video-concierge"], sampling=options))[0]
+        first_run_calls = len(calls)
+        capped = simulate.simulate(
+            SimulationRequest(
+                ideaIds=["idea-video-concierge"],
+                sampling=SamplingOptions(precision=0.01, maxPersonas=30, seed=1),
+            )
+        )[0]
+    finally:
+        gpt_adapter.call_chat_json = original_json  # type: ignore[assignment]
+        gpt_adapter.call_chat_text = original_text  # type: ignore[assignment]
+
+    assert 10 <= result.personasUsed < panel_size // 2
+    assert result.personasUsed == len(result.personaReactions) == first_run_calls
+    assert result.ci95 is not None and result.ci95.high - result.ci95.low <= 2 * 3.0 + 0.2
+    assert capped.personasUsed == 30
+    assert len(calls) - first_run_calls == 30
+
+
+def test_map_reduce_summary_covers_every_comment_and_reuses_chunks() -> None:
+    _reset()
+    gpt_adapter._cache.clear()
+    settings = get_settings()
+    original_budget = settings.summary_chunk_tokens
+    original_completion = gpt_adapter._chat_completion
+    prompts: List[Tuple[str, str]] = []
+
+    def _fake_completion(*, user: str, call_type: str, **kwargs: Any) -> str:
+        prompts.append((call_type, user))
+        return f"要点{len(prompts)}" if call_type == "summary_chunk" else "全体要約"
+
+    comments = [f"コメント{n}: 価格が気になるが使ってみたい。" for n in range(200)]
+    idea = store.get_idea("idea-video-concierge")
+    assert idea is not None
+    settings.summary_chunk_tokens = 400
+    gpt_adapter._chat_completion = _fake_completion  # type: ignore[assignment]
+    try:
+        chunks = simulate.chunk_comments(comments, 400)
+        assert len(chunks) > 1
+        assert [line for chunk in chunks for line in chunk] == comments
+        assert all(simulate._lines_tokens(chunk) <= 400 for chunk in chunks)
+
+        assert simulate.summarize_comments(idea, comments) == "全体要約"
+        chunk_calls = [user for call_type, user in prompts if call_type == "summary_chunk"]
+        assert len(chunk_calls) >= len(chunks)
+        assert all(any(comment in user for user in chunk_calls) for comment in comments)
+        assert prompts[-1][0] == "summary"
+
+        # Inserting a few comments re-summarises only the chunks around them.
+        prompts.clear()
+        grown = comments[:100] + ["新規コメント: 操作が難しそう。"] + comments[100:] + ["追加: 法人向けにも欲しい。"]
+        simulate.summarize_comments(idea, grown)
+        # Higher levels summarise the (fake, call-numbered) chunk summaries and always rerun.
+        first_level = [user for call_type, user in prompts if call_type == "summary_chunk" and "要点" not in user]
+        assert 0 < len(first_level) <= 4
+    finally:
+        settings.summary_chunk_tokens = original_budget
+        gpt_adapter._chat_completion = original_completion  # type: ignore[assignment]
+
+
+def test_running_aggregate_matches_full_recompute() -> None:
+    rng = random.Random(7)
+    running = simulate._RunningAggregate()
+    reactions = []
+    assert running.snapshot() == simulate._aggregate(reactions)
+    for index in range(200):
+        reaction = simulate.SimulationPersonaReaction(
+            personaId=f"persona-{index}",
+            personaName="テスト",
+            category="学生",
+            comment="良さそう",
+            intent_to_try=round(rng.random(), 4),
+            price_acceptance=round(rng.choice([0.0, 1.0, rng.random()]), 4),
+        )
+        reactions.append(reaction)
+        running.add(reaction)
+        psf, pmf, ci95, psf_ci95 = running.snapshot()
+        expected = simulate._aggregate(reactions)
+        assert (psf, pmf) == expected[:2]
+        for got, want in ((ci95, expected[2]), (psf_ci95, expected[3])):
+            assert abs(got.low - want.low) <= 0.1 and abs(got.high - want.high) <= 0.1
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from typing import Dict, Any
 
 from fastapi.testclient import TestClient
@@ -128,3 +129,66 @@ def test_simulation_endpoint() -> None:
         gpt_adapter.react = original_react  # type: ignore[assignment]
         gpt_adapter.call_chat_json = original_json  # type: ignore[assignment]
         gpt_adapter.call_chat_text = original_text  # type: ignore[assignment]
+
+
+def test_score_endpoint_batches_ideas() -> None:
+    client = get_client()
+    original = gpt_adapter.react
+    gpt_adapter.react = _dummy_react  # type: ignore[assignment]
+    try:
+        idea_ids = [idea.id for idea in store.list_ideas()]
+        response = client.post("/ideas/score", json={"ideaIds": idea_ids + ["idea-missing"]})
+        assert response.status_code == 200
+        assert [item["ideaId"] for item in response.json()] == idea_ids
+        for idea_id in idea_ids:
+            reactions = store.list_reactions(idea_id, limit=50)
+            assert any(reaction.personaId == "persona-gpt" for reaction in reactions)
+
+        stats = client.get(f"/ideas/{idea_ids[0]}/stats")
+        assert stats.status_code == 200
+        assert stats.json()["overall"]["count"] == len(store.list_reactions(idea_ids[0], limit=10_000))
+        assert client.get("/ideas/idea-missing/stats").status_code == 404
+
+        too_many = client.post("/ideas/score", json={"ideaIds": ["idea"] * 201})
+        assert too_many.status_code == 422
+    finally:
+        gpt_adapter.react = original  # type: ignore[assignment]
+
+
+def test_simulation_stream_endpoint() -> None:
+    client = get_client()
+    original_json = gpt_adapter.call_chat_json
+    original_text = gpt_adapter.call_chat_text
+    gpt_adapter.call_chat_json = lambda *a, **k: {  # type: ignore[assignment]
+        "comment": "ストリーム",
+        "intent_to_try": 0.6,
+        "price_acceptance": 0.5,
+    }
+    gpt_adapter.call_chat_text = lambda *a, **k: "ストリーム要約"  # type: ignore[assignment]
+    try:
+        response = client.post("/simulate/stream", json={"ideaIds": ["idea-video-concierge"]})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.text.splitlines() if line]
+        personas = store.list_personas()
+        assert [event["event"] for event in events] == ["reaction"] * len(personas) + ["summary"]
+        assert [event["completed"] for event in events[:-1]] == list(range(1, len(personas) + 1))
+        assert events[-1]["summaryComment"] == "ストリーム要約"
+        assert len(events[-1]["result"]["personaReactions"]) == len(personas)
+    finally:
+        gpt_adapter.call_chat_json = original_json  # type: ignore[assignment]
+        gpt_adapter.call_chat_text = original_text  # type: ignore[assignment]
+
+
+def test_ideas_cursor_pagination() -> None:
+    client = get_client()
+    everything = [idea["id"] for idea in client.get("/ideas").json()]
+
+    first = client.get("/ideas", params={"limit": 2})
+    assert [idea["id"] for idea in first.json()] == everything[:2]
+    cursor = first.headers["X-Next-Cursor"]
+    rest = client.get("/ideas", params={"limit": 100, "after": cursor})
+    assert [idea["id"] for idea in rest.json()] == everything[2:]
+    assert "X-Next-Cursor" not in rest.headers
+
+    assert client.get("/ideas", params={"after": "idea-missing"}).status_code == 400
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.services import statkit
+
+
+def test_score_arrays_matches_scalar_formulas() -> None:
+    rng = np.random.default_rng(7)
+    size = 1000
+    intent = rng.random(size)
+    price = rng.random(size)
+    friction = rng.uniform(-1, 1, size)
+    trend = rng.random(size)
+    cred = rng.random(size)
+
+    batch = statkit.score_arrays(intent, price, friction, trend, cred, rng=rng)
+
+    assert len(batch) == size
+    expected_psf = 100 * (0.5 * intent + 0.3 * price + 0.2 * (1 - np.maximum(friction, 0)))
+    np.testing.assert_allclose(batch.psf, np.round(expected_psf, 1))
+    assert np.all((batch.ci_low <= batch.pmf) & (batch.pmf <= batch.ci_high))
+    assert batch.p_apply.shape == (size, 2)
+    assert set(np.unique(batch.verdict)) <= {"Go", "Improve", "Kill"}
+    np.testing.assert_allclose(np.abs(batch.contributions).sum(axis=1), 1.0, atol=0.01)
+
+
+def test_compute_scores_builds_models_at_the_boundary() -> None:
+    insight = {"intent_to_try": 0.9, "price_acceptance": 0.8, "friction_hint": -0.2, "trend": 0.9, "credibility": 0.9}
+    (score, contribution), = statkit.compute_scores([("idea-1", insight, "projectA", "A")])
+
+    assert score.psf == 89.0
+    assert score.pmf == 87.5
+    assert score.verdict == "Go"
+    assert score.p_apply == (0.54, 0.81)
+    assert [factor.name for factor in contribution.factors] == statkit.FACTOR_LABELS
+
+
+def test_scalar_and_batch_paths_agree() -> None:
+    insights = [
+        {"intent_to_try": 0.35, "price_acceptance": 0.6, "friction_hint": 0.4, "trend": 0.5, "credibility": 0.7},
+        {"intent_to_try": 0.7, "price_acceptance": 0.2, "friction_hint": -0.5, "trend": 0.6, "credibility": 0.4},
+    ]
+    batch = statkit.compute_scores([(f"idea-{n}", insight, None, None) for n, insight in enumerate(insights)])
+    for n, insight in enumerate(insights):
+        single, _ = statkit.compute_score(f"idea-{n}", insight)
+        fields = ("psf", "pmf", "p_apply", "p_purchase", "p_d7", "verdict")
+        assert single.model_dump(include=set(fields)) == batch[n][0].model_dump(include=set(fields))
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.api.pagination import decode_cursor, encode_cursor
+from app.schemas.idea import Idea, Reaction
+from app.schemas.persona import Persona
+from app.services.reaction_columns import ReactionColumns, StringTable
+from app.services.store_backends import MemoryBackend, PageKey, SQLiteBackend
+
+
+def _idea(ident: str, project_id: str, updated_at: str) -> Idea:
+    return Idea(
+        id=ident,
+        projectId=project_id,
+        title="テスト案",
+        target="学生",
+        pain="課題の説明",
+        solution="解決策の説明",
+        price=1000,
+        channel="SNS",
+        onboarding="登録のみ",
+        createdAt=updated_at,
+        updatedAt=updated_at,
+    )
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path: Path) -> None:
+    path = tmp_path / "store.sqlite3"
+    first = SQLiteBackend(path)
+    second = SQLiteBackend(path)
+
+    first.put_ideas([_idea("idea-a", "projectA", "2024-01-01"), _idea("idea-b", "projectA", "2024-02-01")])
+    first.add_reactions(
+        [
+            Reaction(
+                id=f"reaction-{n}",
+                ideaId="idea-a",
+                projectId="projectA",
+                personaId="persona-1",
+                text="良い",
+                likelihood=0.5,
+                intent_to_try=0.4,
+                createdAt="2024-01-02",
+            )
+            for n in range(3)
+        ]
+    )
+
+    assert [idea.id for idea in second.list_ideas().items] == ["idea-b", "idea-a"]
+    assert [reaction.id for reaction in second.list_reactions("idea-a", 2)] == ["reaction-2", "reaction-1"]
+    assert {first.next_id("idea"), second.next_id("idea")} == {1000, 1001}
+
+    reopened = SQLiteBackend(path)
+    assert reopened.get_idea("idea-a") is not None
+    assert reopened.next_id("idea") == 1002
+
+
+def test_ordered_pages_match_between_backends(tmp_path: Path) -> None:
+    ideas = [
+        _idea("idea-1", "projectA", "2024-01-01"),
+        _idea("idea-2", "projectB", "2024-03-01"),
+        _idea("idea-3", "projectA", "2024-03-01"),
+        _idea("idea-4", "projectA", "2024-02-01"),
+    ]
+    for backend in (MemoryBackend(), SQLiteBackend(tmp_path / "store.sqlite3")):
+        backend.put_ideas(ideas)
+        # Moving idea-1 to the front must update both the global and project indexes.
+        backend.put_ideas([_idea("idea-1", "projectA", "2024-04-01")])
+
+        assert [i.id for i in backend.list_ideas().items] == ["idea-1", "idea-2", "idea-3", "idea-4"]
+        first = backend.list_ideas(limit=2)
+        rest = backend.list_ideas(limit=2, after=first.last_key)
+        assert [i.id for i in first.items + rest.items] == ["idea-1", "idea-2", "idea-3", "idea-4"]
+        project_first = backend.list_ideas(project_id="projectA", limit=1)
+        project_rest = backend.list_ideas(project_id="projectA", after=project_first.last_key)
+        assert [i.id for i in project_rest.items] == ["idea-3", "idea-4"]
+
+        # The cursor is a sort key: editing or deleting its record does not move the next page.
+        cursor = backend.list_ideas(limit=2).last_key
+        assert cursor is not None and cursor.id == "idea-2"
+        backend.put_ideas([_idea("idea-2", "projectB", "2024-05-01")])
+        assert [i.id for i in backend.list_ideas(after=cursor).items] == ["idea-3", "idea-4"]
+        assert backend.list_ideas(after=PageKey("2024-02-15", 0, "idea-gone")).items[0].id == "idea-4"
+
+
+def test_cursor_round_trips_and_rejects_foreign_values() -> None:
+    key = PageKey("2024-03-01T00:00:00+00:00", 7, "アイデア-1")
+    assert decode_cursor(encode_cursor(key)) == key
+    assert decode_cursor(None) is None
+    for foreign in ("idea-missing", encode_cursor(key)[:-3], "WzEsMiwzXQ"):
+        with pytest.raises(HTTPException):
+            decode_cursor(foreign)
+
+
+def test_reaction_columns_round_trip_newest_first() -> None:
+    strings = StringTable()
+    columns = ReactionColumns("idea-a", strings)
+    reactions = [
+        Reaction(
+            id=ident,
+            ideaId="idea-a",
+            projectId="projectA",
+            version=None if n % 2 else "A",
+            personaId=f"persona-{n % 3}",
+            text=f"コメント{n}",
+            likelihood=n / 10,
+            intent_to_try=1 - n / 10,
+            createdAt=created,
+            segment="学生" if n % 2 else None,
+        )
+        for n, (ident, created) in enumerate(
+            [
+                ("reaction-7", "2024-05-01T10:00:00+00:00"),
+                ("reaction-001", "2024-05-01T10:00:00.000123+00:00"),
+                ("legacy-x", "2024-05-01T19:00:00+09:00"),
+                ("reaction-9", "2024-05-02"),
+            ]
+        )
+    ]
+    columns.extend(reactions)
+
+    assert columns.newest(3) == list(reversed(reactions))[:3]
+    assert columns.newest(10) == list(reversed(reactions))
+    assert len(strings) == 6  # 3 personas, projectA, "A", 学生
+    intents = columns.intents()
+    assert intents.tolist() == [1.0, 0.9, 0.8, 0.7]
+    columns.append(reactions[0])
+    assert intents.shape == (4,) and len(columns.intents()) == 5
+
+
+def test_reaction_stats_match_batch_statistics(tmp_path: Path) -> None:
+    persona = Persona(id="persona-1", name="学生A", category="学生", createdAt="2024-01-01", updatedAt="2024-01-01")
+    intents = [0.1, 0.4, 0.35, 0.9, 0.75]
+    reactions = [
+        Reaction(
+            id=f"reaction-{n}",
+            ideaId="idea-a",
+            projectId="projectA",
+            personaId="persona-1" if n % 2 else "persona-x",
+            text="良い",
+            likelihood=intent / 2,
+            intent_to_try=intent,
+            createdAt="2024-01-02",
+            segment="学生" if n % 2 else None,
+        )
+        for n, intent in enumerate(intents)
+    ]
+
+    for backend in (MemoryBackend(), SQLiteBackend(tmp_path / "store.sqlite3")):
+        backend.put_personas([persona])
+        backend.add_reactions(reactions[:2])
+        backend.add_reactions(reactions[2:])
+        stats = backend.reaction_stats("idea-a").summary("idea-a")
+
+        assert stats.overall.count == 5
+        assert stats.overall.intent_to_try.mean == round(float(np.mean(intents)), 4)
+        assert stats.overall.intent_to_try.variance == round(float(np.var(intents)), 6)
+        assert stats.overall.likelihood.mean == round(float(np.mean(intents)) / 2, 4)
+        assert {key: group.count for key, group in stats.bySegment.items()} == {"unknown": 3, "学生": 2}
+        assert {key: group.count for key, group in stats.byCategory.items()} == {"unknown": 3, "学生": 2}
+        assert stats.byCategory["学生"].intent_to_try.mean == round((0.4 + 0.9) / 2, 4)
+        assert backend.reaction_stats("idea-missing").overall.count == 0
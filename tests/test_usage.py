@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import threading
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.data.seed import seed
+from app.main import create_app
+from app.services import gpt_adapter, store, usage
+
+
+class _CountingClient:
+    """Answers every completion with fixed JSON and a fixed token usage."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **_: Any) -> Any:
+        with self._lock:
+            self.calls += 1
+        content = json.dumps({"comment": "良さそう", "intent_to_try": 0.6, "price_acceptance": 0.4})
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20, total_tokens=120)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+
+def test_usage_is_attributed_and_budget_degrades_to_fallback() -> None:
+    store.reset_store()
+    seed()
+    client = TestClient(create_app())
+    fake = _CountingClient()
+    original = gpt_adapter.client
+    settings = get_settings()
+    original_budgets = settings.project_token_budgets
+    gpt_adapter.client = fake  # type: ignore[assignment]
+    gpt_adapter._cache.clear()
+    try:
+        response = client.post("/simulate", json={"ideaIds": ["idea-video-concierge"]})
+        assert response.status_code == 200
+        personas = len(store.list_personas())
+
+        usage = client.get("/projects/projectA/usage").json()
+        assert usage["calls"] == fake.calls == personas + 1  # persona reactions + summary
+        assert usage["totalTokens"] == 120 * fake.calls
+        assert usage["costUsd"] > 0
+        assert usage["budgetTokens"] is None
+        assert {(row["ideaId"], row["endpoint"]) for row in usage["breakdown"]} == {
+            ("idea-video-concierge", "/simulate")
+        }
+        assert client.get("/projects/projectB/usage").json()["calls"] == 0
+        assert client.get("/projects/unknown/usage").status_code == 404
+
+        settings.project_token_budgets = {"projectA": 1}
+        gpt_adapter._cache.clear()
+        calls_before = fake.calls
+        degraded = client.post("/simulate/stream", json={"ideaIds": ["idea-video-concierge"]})
+        assert degraded.status_code == 200
+        assert fake.calls == calls_before
+        usage = client.get("/projects/projectA/usage").json()
+        assert usage["remainingTokens"] == 0
+
+        settings.project_token_budgets = {}
+        client.post("/simulate/stream", json={"ideaIds": ["idea-video-concierge"]})
+        endpoints = {row["endpoint"] for row in client.get("/projects/projectA/usage").json()["breakdown"]}
+        assert endpoints == {"/simulate", "/simulate/stream"}
+    finally:
+        gpt_adapter.client = original  # type: ignore[assignment]
+        settings.project_token_budgets = original_budgets
+        gpt_adapter._cache.clear()
+
+
+def test_in_flight_calls_hold_budget_until_they_finish() -> None:
+    store.reset_store()
+    settings = get_settings()
+    original_budgets = settings.project_token_budgets
+    settings.project_token_budgets = {"projectA": 500}
+    try:
+        with usage.attribute(project_id="projectA"):
+            with usage.reserve_budget(300), usage.reserve_budget(300):
+                # Nothing is recorded yet, but the two calls in flight already hold the budget.
+                with pytest.raises(usage.BudgetExceeded):
+                    with usage.reserve_budget(10):
+                        pass
+            with usage.reserve_budget(10):
+                pass
+        assert usage._held == {}
+    finally:
+        settings.project_token_budgets = original_budgets